@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from config.db_pool import ConnectionPool, get_pool
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    """OPTIONS['pool']이 있으면 연결을 alias별 프로세스 공용 풀에서 빌리고, 닫을 때 풀로 돌려줍니다."""
+
+    pool_options = None
+    _pool = None
+    _pool_reused = False
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        pool_options = kwargs.pop('pool', None)
+        if pool_options:
+            self.pool_options = {} if pool_options is True else dict(pool_options)
+        return kwargs
+
+    def _create_pool(self, conn_params):
+        return ConnectionPool(
+            self.alias,
+            connect=partial(MySQLDatabaseWrapper.get_new_connection, self, conn_params),
+            ping=lambda connection: connection.ping(reconnect=False),
+            close=lambda connection: connection.close(),
+            **self.pool_options,
+        )
+
+    def get_new_connection(self, conn_params):
+        if self.pool_options is None:
+            return super().get_new_connection(conn_params)
+        self._pool = get_pool(self.alias, partial(self._create_pool, conn_params))
+        connection, self._pool_reused = self._pool.acquire()
+        return connection
+
+    def init_connection_state(self):
+        # 세션 설정(SQL_AUTO_IS_NULL, 격리 수준)은 연결에 남아 있으므로 재사용한 연결은 건너뜁니다.
+        if not self._pool_reused:
+            super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None or self._pool is None:
+            return super()._close()
+        # atomic 블록 안에서 닫히면 Django가 이 연결 객체를 계속 들고 있으므로 풀에 돌려주지 않습니다.
+        reusable = not self.in_atomic_block and (not self.errors_occurred or self.is_usable())
+        if reusable and not self.get_autocommit():
+            try:
+                self.connection.rollback()
+                self.connection.autocommit(self.settings_dict['AUTOCOMMIT'])
+            except Exception:
+                reusable = False
+        self._pool.release(self.connection, reusable=reusable)
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+# runserver는 요청마다 새 스레드를 쓰므로 CONN_MAX_AGE만으로는 연결이 재사용되지 않습니다.
+# alias별 프로세스 공용 풀을 두고, 요청이 끝나면 Django가 닫는 연결을 풀로 돌려받습니다.
+# ContextVar로 alias가 바뀌어도 각 alias는 자기 풀에서만 꺼내므로 연결이 섞이지 않습니다.
+
+DEFAULT_POOL_OPTIONS = {
+    'max_size': 10,
+    'timeout': 10.0,
+    'idle_timeout': 300.0,
+    'max_lifetime': 3600.0,
+    'ping_after': 10.0,
+}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at', 'released_at')
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.released_at = now
+
+
+class ConnectionPool:
+    """크기 제한, 유휴/수명 만료, 꺼낼 때 ping 검사를 하는 DB-API 연결 풀입니다."""
+
+    def __init__(self, name: str, connect: Callable, ping: Callable, close: Callable, **options):
+        options = {**DEFAULT_POOL_OPTIONS, **options}
+        self.name = name
+        self.max_size = int(options['max_size'])
+        self.timeout = float(options['timeout'])
+        self.idle_timeout = float(options['idle_timeout'])
+        self.max_lifetime = float(options['max_lifetime'])
+        self.ping_after = float(options['ping_after'])
+        self._connect = connect
+        self._ping = ping
+        self._close = close
+        self._idle = deque()
+        self._in_use: Dict[int, _Entry] = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self.pid = os.getpid()
+        self.counters = {
+            'created': 0,
+            'reused': 0,
+            'pings': 0,
+            'ping_failures': 0,
+            'expired': 0,
+            'discarded': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+        }
+
+    def _expired(self, entry, now):
+        return (
+            now - entry.released_at > self.idle_timeout
+            or now - entry.created_at > self.max_lifetime
+        )
+
+    def _destroy(self, entry):
+        try:
+            self._close(entry.connection)
+        except Exception:
+            pass
+
+    def acquire(self):
+        """연결과 재사용 여부를 돌려줍니다. 풀이 가득 차면 timeout초까지 기다립니다."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            stale = []
+            entry = None
+            with self._condition:
+                now = time.monotonic()
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if self._expired(candidate, now):
+                        self._size -= 1
+                        self.counters['expired'] += 1
+                        stale.append(candidate)
+                        continue
+                    entry = candidate
+                    break
+                if entry is None and self._size < self.max_size:
+                    self._size += 1
+                    reserved = True
+                else:
+                    reserved = False
+                if entry is None and not reserved and not stale:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(f'DB 연결 풀({self.name})이 {self.timeout}초 동안 비지 않았습니다.')
+                    self.counters['waits'] += 1
+                    self._condition.wait(remaining)
+                    continue
+            for candidate in stale:
+                self._destroy(candidate)
+            if entry is not None:
+                if time.monotonic() - entry.released_at > self.ping_after and not self._check(entry):
+                    continue
+                return self._lend(entry, reused=True), True
+            if not reserved:
+                continue
+            try:
+                entry = _Entry(self._connect())
+            except BaseException:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            return self._lend(entry, reused=False), False
+
+    def _check(self, entry):
+        with self._condition:
+            self.counters['pings'] += 1
+        try:
+            self._ping(entry.connection)
+            return True
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self.counters['ping_failures'] += 1
+                self._condition.notify()
+            self._destroy(entry)
+            return False
+
+    def _lend(self, entry, reused):
+        with self._condition:
+            self._in_use[id(entry.connection)] = entry
+            self.counters['reused' if reused else 'created'] += 1
+            self.counters['peak_in_use'] = max(self.counters['peak_in_use'], len(self._in_use))
+        return entry.connection
+
+    def release(self, connection, reusable=True):
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                # 풀에서 빌려 간 연결이 아니거나 이미 반납됨
+                return
+            if reusable and self.pid == os.getpid():
+                entry.released_at = time.monotonic()
+                self._idle.append(entry)
+                self._condition.notify()
+                return
+            self._size -= 1
+            self.counters['discarded'] += 1
+            self._condition.notify()
+        self._destroy(entry)
+
+    def close_idle(self):
+        with self._condition:
+            entries = list(self._idle)
+            self._idle.clear()
+            self._size -= len(entries)
+            self._condition.notify_all()
+        for entry in entries:
+            self._destroy(entry)
+        return len(entries)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                **self.counters,
+            }
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, factory: Callable[[], ConnectionPool]) -> ConnectionPool:
+    pool = _pools.get(alias)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            # fork된 자식 프로세스는 부모의 소켓을 쓰지 않고 새 풀을 만듭니다.
+            pool = _pools[alias] = factory()
+        return pool
+
+
+def close_pools(alias: Optional[str] = None) -> int:
+    pools = [_pools[alias]] if alias in _pools else ([] if alias else list(_pools.values()))
+    return sum(pool.close_idle() for pool in pools)
+
+
+def pool_stats() -> Dict[str, dict]:
+    return {alias: pool.stats() for alias, pool in sorted(_pools.items())}
@@ -1,14 +1,26 @@
 import os
+import time
+from contextlib import contextmanager
 from contextvars import ContextVar
-from typing import Optional, Set
+from typing import Dict, Optional, Set
+
+from django.conf import settings
+from django.db import connections
 
 _current_db_alias: ContextVar[Optional[str]] = ContextVar('current_db_alias', default=None)
+_read_routing: ContextVar[Optional['ReadRouting']] = ContextVar('read_routing', default=None)
+_primary_only: ContextVar[bool] = ContextVar('primary_only', default=False)
 
 
 def _parse_env_list(value: str) -> Set[str]:
     return {item.strip().lower() for item in value.split(',') if item.strip()}
 
 
+def _parse_env_map(value: str) -> Dict[str, str]:
+    pairs = (item.split(':', 1) for item in _parse_env_list(value) if ':' in item)
+    return {primary.strip(): replica.strip() for primary, replica in pairs}
+
+
 LOCAL_HOSTS = _parse_env_list(
     os.environ.get('LOCAL_DB_HOSTNAMES', 'localhost,127.0.0.1,192.168.0.107,local')
 )
@@ -16,6 +28,13 @@ NAS_HOSTS = _parse_env_list(
     os.environ.get('NAS_DB_HOSTNAMES', 'jakesto.synology.me,192.168.0.250')
 )
 
+# 읽기 복제본 (선택): DB_READ_REPLICAS=nas:local 이면 nas 요청의 읽기를 local 별칭으로 보냅니다.
+# 쓰기는 항상 원본(primary)으로 가며, 쓰기가 있었던 요청/세션은 DB_PRIMARY_STICKY_SECONDS 동안
+# 쿠키로 원본에 고정되어 복제 지연과 상관없이 방금 고친 내용이 보입니다.
+READ_REPLICAS = _parse_env_map(os.environ.get('DB_READ_REPLICAS', ''))
+PRIMARY_STICKY_SECONDS = int(os.environ.get('DB_PRIMARY_STICKY_SECONDS', '15'))
+PRIMARY_STICKY_COOKIE = 'db_primary_until'
+
 
 def get_current_db_alias() -> str:
     alias = _current_db_alias.get()
@@ -29,6 +48,61 @@ def get_current_db_alias() -> str:
     return os.environ.get('DEFAULT_REQUEST_DB_ALIAS', 'nas').strip().lower() or 'nas'
 
 
+@contextmanager
+def use_db_alias(alias: str):
+    token = _current_db_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_db_alias.reset(token)
+
+
+@contextmanager
+def use_primary_db():
+    """읽기도 원본에서 합니다. 세대 번호로 캐시하는 결과처럼 지연된 값이 남으면 안 되는 곳에 씁니다."""
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+class ReadRouting:
+    """요청 하나의 읽기 라우팅 상태. 쓰기가 한 번이라도 있으면 이후 읽기는 원본으로 갑니다."""
+
+    __slots__ = ('replica', 'pinned', 'wrote')
+
+    def __init__(self, replica: str, pinned: bool):
+        self.replica = replica
+        self.pinned = pinned
+        self.wrote = False
+
+
+def get_read_db_alias() -> str:
+    primary = get_current_db_alias()
+    routing = _read_routing.get()
+    if (
+        routing is None
+        or routing.pinned
+        or routing.wrote
+        or _primary_only.get()
+        or READ_REPLICAS.get(primary) != routing.replica
+        or connections[primary].in_atomic_block
+    ):
+        return primary
+    return routing.replica
+
+
+def _pinned_to_primary(request) -> bool:
+    # 쓰기 요청과 로그인 세션이 있는 요청(관리자 편집 등)은 항상 원본을 읽습니다.
+    if request.method not in ('GET', 'HEAD', 'OPTIONS') or settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return True
+    try:
+        return float(request.COOKIES.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
 class HostDatabaseMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -43,18 +117,37 @@ class HostDatabaseMiddleware:
         else:
             alias = os.environ.get('DEFAULT_REQUEST_DB_ALIAS', 'nas').strip().lower() or 'nas'
 
-        token = _current_db_alias.set(alias)
+        replica = READ_REPLICAS.get(alias)
+        if not replica:
+            with use_db_alias(alias):
+                return self.get_response(request)
+
+        routing = ReadRouting(replica, pinned=_pinned_to_primary(request))
+        token = _read_routing.set(routing)
         try:
-            return self.get_response(request)
+            with use_db_alias(alias):
+                response = self.get_response(request)
         finally:
-            _current_db_alias.reset(token)
+            _read_routing.reset(token)
+        if routing.wrote or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                PRIMARY_STICKY_COOKIE,
+                str(int(time.time()) + PRIMARY_STICKY_SECONDS),
+                max_age=PRIMARY_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
 
 
 class HostDatabaseRouter:
     def db_for_read(self, model, **hints):
-        return get_current_db_alias()
+        return get_read_db_alias()
 
     def db_for_write(self, model, **hints):
+        routing = _read_routing.get()
+        if routing is not None:
+            routing.wrote = True
         return get_current_db_alias()
 
     def allow_relation(self, obj1, obj2, **hints):
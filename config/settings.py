@@ -84,6 +84,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'portfolio.context_processors.cache_generation',
             ],
         },
     },
@@ -118,15 +119,33 @@ db_user = os.environ.get('MARIADB_USER', 'sc_garden_user')
 db_password = os.environ.get('MARIADB_PASSWORD', 'Sc_Garden!2026')
 db_port = os.environ.get('MARIADB_PORT', '3306')
 
+# DB 연결 풀: 요청이 끝나면 연결을 닫지 않고 alias별 풀에 돌려줍니다(config/db_pool.py).
+# 풀에서 꺼낼 때 ping_after초 넘게 쉬었던 연결은 ping으로 확인하고, 유휴/수명 한도를 넘은 연결은 닫습니다.
+DB_POOL_ENABLED = os.environ.get('DB_POOL_ENABLED', 'True') == 'True'
+DB_POOL_OPTIONS = {
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    'idle_timeout': float(os.environ.get('DB_POOL_IDLE_TIMEOUT', '300')),
+    'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '3600')),
+    'ping_after': float(os.environ.get('DB_POOL_PING_AFTER', '10')),
+}
+
+db_options = {
+    'charset': 'utf8mb4',
+}
+if DB_POOL_ENABLED:
+    db_options['pool'] = DB_POOL_OPTIONS
+
 db_common = {
-    'ENGINE': 'django.db.backends.mysql',
+    'ENGINE': 'config.db_backends.mysql' if DB_POOL_ENABLED else 'django.db.backends.mysql',
     'NAME': db_name,
     'USER': db_user,
     'PASSWORD': db_password,
     'PORT': db_port,
-    'OPTIONS': {
-        'charset': 'utf8mb4',
-    },
+    # 풀을 쓰면 CONN_MAX_AGE=0(요청마다 반납)이 기본이며, 풀 없이 지속 연결을 쓸 때도 재사용 전 상태를 확인합니다.
+    'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '0')),
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': db_options,
 }
 
 DATABASES = {
@@ -194,6 +213,44 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# 페이지/조각 캐시: 외부 서비스 없이 NAS 로컬 디스크에 저장합니다.
+# 웹 프로세스와 업로드 워커가 같은 폴더를 보므로 세대 번호(portfolio.cache)가 공유됩니다.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, 'django_cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '5000')),
+        },
+    }
+}
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', str(60 * 10)))
+
+# 미디어 서빙(portfolio.media.serve_media): ETag/Last-Modified, 조건부 요청, Range를 처리합니다.
+# 프록시가 파일 전송을 맡도록 하려면 둘 중 하나를 설정합니다.
+# - MEDIA_ACCEL_REDIRECT_PREFIX: nginx internal location (예: /protected-media/ -> alias MEDIA_ROOT)
+# - MEDIA_USE_SENDFILE=True: Apache mod_xsendfile 등 X-Sendfile 헤더
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', str(60 * 60 * 24)))
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_USE_SENDFILE = os.environ.get('MEDIA_USE_SENDFILE', 'False') == 'True'
+
+# 사진 저장 경로
+# - dated (기본): photos/<alias>/<yyyy>/<mm>/<파일명>
+# - hashed: photos/<alias>/<해시 앞 2자리>/<sha256>.<확장자> (1년 immutable 캐시)
+#   기존 사진은 migrate_photo_storage 명령으로 옮깁니다.
+PHOTO_STORAGE_LAYOUT = os.environ.get('PHOTO_STORAGE_LAYOUT', 'dated')
+
+# 업로드 대기열: 요청에서는 원본을 스테이징 폴더에 저장만 하고
+# process_upload_queue 워커가 리사이즈/DB 저장을 처리합니다.
+UPLOAD_STAGING_ROOT = os.environ.get('UPLOAD_STAGING_ROOT', os.path.join(BASE_DIR, 'upload_staging'))
+UPLOAD_QUEUE_WORKERS = int(os.environ.get('UPLOAD_QUEUE_WORKERS', '2'))
+
+# 이미지 디코드 메모리 제한
+# - IMAGE_MAX_DECODE_PIXELS: JPEG draft 축소 후에도 이 픽셀 수를 넘는 업로드는 거부
+# - IMAGE_DECODE_MEMORY_BUDGET_MB: 워커 스레드들이 동시에 사용할 디코드 메모리 총량
+IMAGE_MAX_DECODE_PIXELS = int(os.environ.get('IMAGE_MAX_DECODE_PIXELS', str(40_000_000)))
+IMAGE_DECODE_MEMORY_BUDGET_MB = int(os.environ.get('IMAGE_DECODE_MEMORY_BUDGET_MB', '256'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
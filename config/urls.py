@@ -14,11 +14,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from portfolio.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -28,6 +32,10 @@ urlpatterns = [
 ]
 
 # 프로덕션 환경에서도 미디어 파일 서빙 (DEBUG 상태와 무관)
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# 이미지 요청은 Accept 헤더에 맞춰 AVIF/WebP 변환본을 골라 응답하고,
+# ETag/Range/캐시 헤더를 붙이거나 설정 시 X-Accel-Redirect/X-Sendfile로 프록시에 넘깁니다.
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media),
+]
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -1,11 +1,12 @@
 from django.contrib import admin
 
-from .models import Photo, Season, Tag, Zone
+from .models import Photo, Season, SiteAsset, Tag, UploadJob, Zone
+from .search import matching_photos, query_tokens
 
 
 @admin.register(Season)
 class SeasonAdmin(admin.ModelAdmin):
-	list_display = ('name', 'order')
+	list_display = ('name', 'key', 'order')
 	prepopulated_fields = {'slug': ('name',)}
 
 
@@ -17,7 +18,7 @@ class ZoneAdmin(admin.ModelAdmin):
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-	list_display = ('name',)
+	list_display = ('name', 'initial', 'photo_count', 'orphaned_at')
 	prepopulated_fields = {'slug': ('name',)}
 
 
@@ -26,3 +27,23 @@ class PhotoAdmin(admin.ModelAdmin):
 	list_display = ('title', 'season', 'zone', 'is_featured', 'created_at')
 	list_filter = ('season', 'zone', 'is_featured', 'tags')
 	search_fields = ('title', 'description')
+
+	def get_search_results(self, request, queryset, search_term):
+		# icontains 전체 스캔 대신 검색 색인(PhotoSearchToken)을 씁니다.
+		if not query_tokens(search_term):
+			return queryset, False
+		return queryset.filter(id__in=matching_photos(search_term).values('photo_id')), False
+
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+	list_display = ('original_filename', 'status', 'attempts', 'photo', 'created_at', 'updated_at')
+	list_filter = ('status',)
+	search_fields = ('original_filename',)
+	readonly_fields = ('batch', 'staged_name', 'content_hash', 'photo', 'created_at', 'updated_at')
+
+
+@admin.register(SiteAsset)
+class SiteAssetAdmin(admin.ModelAdmin):
+	list_display = ('key', 'file', 'version', 'updated_at')
+	readonly_fields = ('version', 'updated_at')
@@ -0,0 +1,49 @@
+from django.db import transaction
+
+from config.db_routing import get_current_db_alias
+
+from .cache import bump_generation
+from .models import Photo, Tag, Zone
+from .search import index_photos
+from .taxonomy import invalidate_taxonomy, resolve_named, resolve_season, resolve_tags
+
+
+def add_tags(photo_ids, tags, using):
+	"""through 표에 한 번에 넣고, m2m_changed 대신 사용 수/검색 색인/캐시를 직접 갱신합니다."""
+	through = Photo.tags.through
+	through.objects.using(using).bulk_create(
+		[through(photo_id=photo_id, tag_id=tag.id) for photo_id in photo_ids for tag in tags],
+		ignore_conflicts=True,
+	)
+	Tag.refresh_photo_counts({tag.id for tag in tags}, using=using)
+	index_photos(photo_ids, using=using)
+	bump_generation(using)
+
+
+def apply_bulk_edit(photo_ids, season_key=None, zone_name=None, taken_at=None, tag_names=()):
+	"""선택한 사진들을 한 트랜잭션에서 일괄 수정합니다. 쿼리 수는 선택한 사진 수와 무관합니다."""
+	alias = get_current_db_alias()
+	try:
+		with transaction.atomic(using=alias):
+			photos = Photo.objects.filter(id__in=photo_ids)
+			photo_ids = list(photos.values_list('id', flat=True))
+			if not photo_ids:
+				return 0
+			changes = {}
+			if season_key:
+				changes['season'] = resolve_season(season_key)
+			if zone_name:
+				changes['zone'] = resolve_named(Zone, zone_name)
+			if taken_at:
+				changes['taken_at'] = taken_at
+			if changes:
+				# PhotoQuerySet.update가 effective_date, TimelineDay, updated_at, 캐시 세대를 함께 갱신합니다.
+				Photo.objects.filter(id__in=photo_ids).update(**changes)
+			tags = resolve_tags(tag_names)
+			if tags:
+				add_tags(photo_ids, tags, alias)
+	except Exception:
+		# 롤백되면 트랜잭션 안에서 읽어 둔 분류 표에 없는 행이 남을 수 있습니다.
+		invalidate_taxonomy(alias)
+		raise
+	return len(photo_ids)
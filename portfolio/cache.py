@@ -0,0 +1,88 @@
+import hashlib
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from config.db_routing import PRIMARY_STICKY_SECONDS, get_current_db_alias, use_primary_db
+
+# 캐시 키에 DB 별칭과 세대(generation) 번호를 넣습니다.
+# Photo/Tag/Season/Zone이 바뀌면 signals.py가 해당 별칭의 세대를 올리므로
+# 이전 세대의 페이지/조각은 더 이상 조회되지 않고 만료 시간에 맞춰 정리됩니다.
+# name으로 용도별 세대를 따로 둘 수 있습니다(예: taxonomy).
+GENERATION_KEY = 'portfolio:{name}:{alias}'
+# 세대를 올린 쓰기 직후 PRIMARY_STICKY_SECONDS 동안만 남는 표시입니다. 읽기 복제본이 아직 그 쓰기를
+# 받지 못했을 수 있으므로, 이 동안 새 세대의 캐시는 원본에서 채웁니다(고정 쿠키와 같은 지연 가정).
+CHANGED_KEY = 'portfolio:changed:{alias}'
+
+
+def _initial_generation():
+	# 세대 키가 밀려나(cull) 다시 만들어져도 예전 번호와 겹치지 않도록 시각으로 시작합니다.
+	return int(time.time() * 1000)
+
+
+def get_generation(alias=None, name='generation'):
+	key = GENERATION_KEY.format(name=name, alias=alias or get_current_db_alias())
+	generation = cache.get(key)
+	if generation is None:
+		cache.add(key, _initial_generation(), None)
+		generation = cache.get(key)
+	return generation
+
+
+def bump_generation(alias=None, name='generation'):
+	alias = alias or get_current_db_alias()
+	key = GENERATION_KEY.format(name=name, alias=alias)
+	cache.set(CHANGED_KEY.format(alias=alias), True, PRIMARY_STICKY_SECONDS)
+	try:
+		return cache.incr(key)
+	except ValueError:
+		generation = _initial_generation()
+		cache.set(key, generation, None)
+		return generation
+
+
+def cache_fill_reads(alias=None):
+	"""캐시를 채우는 읽기의 DB. 최근 쓰기가 있었으면 원본, 아니면 요청의 읽기 라우팅(복제본)을 따릅니다."""
+	if cache.get(CHANGED_KEY.format(alias=alias or get_current_db_alias())):
+		return use_primary_db()
+	return nullcontext()
+
+
+def page_cache_key(request):
+	alias = get_current_db_alias()
+	path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+	return f"portfolio:page:{alias}:{get_generation(alias)}:{request.method}:{path}"
+
+
+def _has_pending_messages(request):
+	storage = getattr(request, '_messages', None)
+	return storage is not None and len(storage) > 0
+
+
+def cached_page(view):
+	"""익명 사용자의 GET/HEAD 응답을 DB 별칭과 세대별로 캐시합니다."""
+	@wraps(view)
+	def wrapper(request, *args, **kwargs):
+		if (
+			request.method not in ('GET', 'HEAD')
+			or request.user.is_authenticated
+			or _has_pending_messages(request)
+		):
+			return view(request, *args, **kwargs)
+		key = page_cache_key(request)
+		cached = cache.get(key)
+		if cached is not None:
+			content, content_type = cached
+			return HttpResponse(content, content_type=content_type)
+		# 세대가 바뀔 때까지 남는 결과이므로 쓰기 직후에는 지연된 복제본 대신 원본에서 렌더링합니다.
+		with cache_fill_reads():
+			response = view(request, *args, **kwargs)
+		if response.status_code == 200 and not response.streaming and not response.cookies:
+			cache.set(key, (response.content, response['Content-Type']), settings.PAGE_CACHE_TIMEOUT)
+		return response
+	return wrapper
+
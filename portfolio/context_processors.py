@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from config.db_routing import get_current_db_alias
+
+from .cache import get_generation
+
+
+def cache_generation(request):
+	# 템플릿 {% cache %} 조각 키에 '별칭:세대'를 넣습니다. 조각을 쓰는 페이지에서만 캐시를 읽습니다.
+	return {
+		'cache_generation': SimpleLazyObject(lambda: f"{get_current_db_alias()}:{get_generation()}"),
+		'fragment_cache_timeout': settings.PAGE_CACHE_TIMEOUT,
+	}
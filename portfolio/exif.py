@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from django.utils import timezone
+from PIL import ExifTags
+
+EXIF_IFD_POINTER = 0x8769
+TAG_MAKE = 271
+TAG_MODEL = 272
+TAG_DATETIME = 306
+TAG_DATETIME_ORIGINAL = 36867
+TAG_LENS_MAKE = 42035
+TAG_LENS_MODEL = 42036
+TAG_PIXEL_X = 40962
+TAG_PIXEL_Y = 40963
+
+
+def _clean(value):
+	return str(value).strip().strip('\x00').strip()
+
+
+def _parse_exif_datetime(value):
+	try:
+		parsed = datetime.strptime(_clean(value)[:19], '%Y:%m:%d %H:%M:%S')
+	except ValueError:
+		return None
+	return timezone.make_aware(parsed)
+
+
+def extract_metadata(image):
+	"""열린 PIL 이미지에서 EXIF를 파싱합니다. 헤더만 읽으므로 픽셀 디코드가 일어나지 않습니다."""
+	exif = image.getexif()
+	exif_ifd = exif.get_ifd(EXIF_IFD_POINTER) if exif else {}
+
+	entries = []
+	for tags in (exif, exif_ifd):
+		for tag_id, value in tags.items():
+			if tag_id == EXIF_IFD_POINTER or isinstance(value, bytes):
+				continue
+			entries.append([ExifTags.TAGS.get(tag_id, str(tag_id)), _clean(value)])
+
+	make = _clean(exif.get(TAG_MAKE, '')) if exif else ''
+	model = _clean(exif.get(TAG_MODEL, '')) if exif else ''
+	camera = model if model.lower().startswith(make.lower()) else f'{make} {model}'.strip()
+	lens = _clean(exif_ifd.get(TAG_LENS_MODEL) or exif_ifd.get(TAG_LENS_MAKE) or '')
+	captured_raw = exif_ifd.get(TAG_DATETIME_ORIGINAL) or (exif.get(TAG_DATETIME) if exif else None)
+
+	width, height = image.size
+	return {
+		'exif': entries,
+		'camera': camera[:120],
+		'lens': lens[:120],
+		'captured_at': _parse_exif_datetime(captured_raw) if captured_raw else None,
+		'width': int(exif_ifd.get(TAG_PIXEL_X) or width),
+		'height': int(exif_ifd.get(TAG_PIXEL_Y) or height),
+	}
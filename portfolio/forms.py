@@ -1,13 +1,11 @@
 from django import forms
 
+from .models import Season, Zone
+from .taxonomy import get_taxonomy
 
-SEASON_CHOICES = [
-	('', '선택 안함'),
-	('봄', '봄'),
-	('여름', '여름'),
-	('가을', '가을'),
-	('겨울', '겨울'),
-]
+
+# 값은 Season.key입니다.
+SEASON_CHOICES = [('', '선택 안함')] + Season.KEY_CHOICES
 
 ZONE_CHOICES = [
 	('', '선택 안함'),
@@ -24,6 +22,16 @@ ZONE_CHOICES = [
 ]
 
 
+def zone_choices():
+	# 기본 목록에 '분류추가'로 등록한 구역을 더합니다(분류 캐시에서 읽음).
+	names = {name for name, _ in ZONE_CHOICES}
+	extra = [
+		(zone.name, zone.name) for zone in get_taxonomy().ordered(Zone, 'order', 'name')
+		if zone.name not in names
+	]
+	return ZONE_CHOICES + extra
+
+
 class MultiFileInput(forms.ClearableFileInput):
 	allow_multiple_selected = True
 
@@ -41,7 +49,7 @@ class PhotoEditForm(forms.Form):
 		widget=forms.Textarea(attrs={'rows': 3}),
 	)
 	season = forms.ChoiceField(choices=SEASON_CHOICES, required=False)
-	zone = forms.ChoiceField(choices=ZONE_CHOICES, required=False)
+	zone = forms.ChoiceField(choices=zone_choices, required=False)
 	tags = forms.CharField(
 		required=False,
 		help_text='쉼표로 구분해 입력',
@@ -54,7 +62,7 @@ class PhotoEditForm(forms.Form):
 
 class BulkEditForm(forms.Form):
 	season = forms.ChoiceField(choices=SEASON_CHOICES, required=False)
-	zone = forms.ChoiceField(choices=ZONE_CHOICES, required=False)
+	zone = forms.ChoiceField(choices=zone_choices, required=False)
 	tags = forms.CharField(
 		required=False,
 		help_text='쉼표로 구분해 입력 (기존 태그에 추가됩니다)',
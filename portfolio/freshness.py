@@ -0,0 +1,62 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from config.db_routing import get_current_db_alias
+
+from .cache import cache_fill_reads, get_generation
+
+# 갤러리 페이지의 조건부 GET(ETag/Last-Modified → 304).
+# 범위(전체, 계절, 태그)별 (최종 수정 시각, 사진/분류 행 수)를 캐시 세대마다 한 번만 계산하므로
+# 304 응답은 DB와 템플릿을 거치지 않습니다. 삭제는 수정 시각에 남지 않아 행 수로 구분합니다.
+
+
+def scope_state(scope, compute):
+	alias = get_current_db_alias()
+	key = f"portfolio:freshness:{alias}:{get_generation(alias)}:{scope}"
+	state = cache.get(key)
+	if state is None:
+		with cache_fill_reads(alias):
+			state = compute()
+		cache.set(key, state, settings.PAGE_CACHE_TIMEOUT)
+	return state
+
+
+def photo_state(photos, *related_models):
+	"""사진 범위와 함께 표시되는 모델(계절/구역/태그 이름 등)의 최종 수정 시각과 (사진 수, 모델별 행 수)."""
+	aggregate = photos.order_by().aggregate(last_modified=Max('updated_at'), photo_count=Count('id', distinct=True))
+	stamps = [aggregate['last_modified']]
+	counts = [aggregate['photo_count']]
+	for model in related_models:
+		# 구역/계절/태그를 지우면 사진 쪽은 SET_NULL로 updated_at 없이 바뀌므로 행 수로 구분합니다.
+		related = model.objects.order_by().aggregate(last_modified=Max('updated_at'), row_count=Count('id'))
+		stamps.append(related['last_modified'])
+		counts.append(related['row_count'])
+	stamps = [stamp for stamp in stamps if stamp]
+	return (max(stamps) if stamps else None), tuple(counts)
+
+
+def conditional_gallery(state_func):
+	"""익명 GET/HEAD 요청에 ETag/Last-Modified를 붙이고 바뀌지 않았으면 304로 답합니다."""
+	def decorator(view):
+		@wraps(view)
+		def wrapper(request, *args, **kwargs):
+			if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+				return view(request, *args, **kwargs)
+			last_modified, counts = state_func(request)
+			raw = f"{get_current_db_alias()}|{last_modified and last_modified.isoformat()}|{counts}"
+			etag = hashlib.md5(raw.encode()).hexdigest()
+			response = condition(
+				etag_func=lambda *a, **kw: etag,
+				last_modified_func=lambda *a, **kw: last_modified,
+			)(view)(request, *args, **kwargs)
+			# 브라우저가 추정 만료로 재검증 없이 쓰지 않도록 매번 확인하게 합니다.
+			patch_cache_control(response, no_cache=True)
+			return response
+		return wrapper
+	return decorator
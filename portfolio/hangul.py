@@ -0,0 +1,21 @@
+# 태그 초성 탐색용. 된소리(ㄲ, ㄸ, ㅃ, ㅆ, ㅉ)는 예사소리 묶음으로 합칩니다.
+TAG_INITIALS = ['ㄱ', 'ㄴ', 'ㄷ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅅ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+FULL_INITIALS = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+NORMALIZE_INITIAL = {
+	'ㄲ': 'ㄱ',
+	'ㄸ': 'ㄷ',
+	'ㅃ': 'ㅂ',
+	'ㅆ': 'ㅅ',
+	'ㅉ': 'ㅈ',
+}
+
+
+def get_initial(name):
+	"""한글 음절로 시작하면 초성을, 아니면 빈 문자열을 돌려줍니다."""
+	if not name:
+		return ''
+	code = ord(name[0]) - 0xAC00
+	if 0 <= code <= 11171:
+		initial = FULL_INITIALS[code // 588]
+		return NORMALIZE_INITIAL.get(initial, initial)
+	return ''
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from portfolio.models import Photo
+from portfolio.uploads import file_sha256
+
+
+def _hash_file(path):
+	# hashlib은 큰 청크를 처리하는 동안 GIL을 놓으므로 스레드로도 병렬 처리됩니다.
+	if not path or not os.path.exists(path):
+		return None
+	try:
+		return file_sha256(path)
+	except OSError:
+		return None
+
+
+class Command(BaseCommand):
+	help = (
+		'processed_hash가 비어 있는 사진의 저장 파일을 해시해 채우고, 비어 있는 original_filename도 채웁니다. '
+		'content_hash(업로드 원본 바이트 해시)는 원본이 남아 있지 않으므로 채우지 않습니다.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--workers', type=int, default=4, help='병렬 해시 스레드 수')
+		parser.add_argument('--batch-size', type=int, default=200)
+
+	def handle(self, *args, **options):
+		workers = max(1, options['workers'])
+		batch_size = max(1, options['batch_size'])
+		counts = {'hashed': 0, 'duplicate': 0, 'missing': 0}
+		seen = {}
+		last_id = 0
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			while True:
+				batch = list(
+					Photo.objects.filter(processed_hash='', id__gt=last_id)
+					.exclude(image='')
+					.order_by('id')
+					.only('id', 'image', 'original_filename', 'processed_hash')[:batch_size]
+				)
+				if not batch:
+					break
+				last_id = batch[-1].id
+
+				paths = []
+				for photo in batch:
+					try:
+						paths.append(photo.image.path)
+					except (ValueError, NotImplementedError):
+						paths.append('')
+				hashes = list(executor.map(_hash_file, paths))
+
+				changed = []
+				for photo, stored_hash in zip(batch, hashes):
+					if stored_hash is None:
+						counts['missing'] += 1
+						continue
+					if stored_hash in seen:
+						# 저장본이 같은 사진은 알려만 주고, 정리는 사람이 판단합니다.
+						counts['duplicate'] += 1
+						self.stdout.write(
+							self.style.WARNING(
+								f'[DUPLICATE] photo_id={photo.id} stores the same file as photo_id={seen[stored_hash]}'
+							)
+						)
+					seen.setdefault(stored_hash, photo.id)
+					photo.processed_hash = stored_hash
+					if not photo.original_filename:
+						photo.original_filename = os.path.basename(photo.image.name)
+					changed.append(photo)
+				if changed:
+					Photo.objects.bulk_update(changed, ['processed_hash', 'original_filename'])
+				counts['hashed'] += len(changed)
+
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"Hashed {counts['hashed']} stored files. Duplicates {counts['duplicate']}, "
+				f"missing {counts['missing']}."
+			)
+		)
@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from PIL import Image
+
+from portfolio.models import Photo
+from portfolio.renditions import IMAGE_ATTRIBUTE_FIELDS, image_attributes
+
+
+def _describe_file(path):
+	# 프로세스 풀에서 실행되므로 DB/Django 모델에 접근하지 않습니다.
+	if not path or not os.path.exists(path):
+		return None
+	try:
+		with Image.open(path) as image:
+			return image_attributes(image)
+	except (OSError, ValueError, Image.DecompressionBombError):
+		return None
+
+
+class Command(BaseCommand):
+	help = '기존 사진의 크기, 대표 색상, LQIP 미리보기를 배치 단위로 계산해 채웁니다.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='병렬 처리 프로세스 수')
+		parser.add_argument('--batch-size', type=int, default=500)
+		parser.add_argument('--force', action='store_true', help='이미 값이 있는 사진도 다시 계산')
+
+	def handle(self, *args, **options):
+		workers = max(1, options['workers'])
+		batch_size = max(1, options['batch_size'])
+		photos = Photo.objects.exclude(image='')
+		if not options['force']:
+			photos = photos.filter(width__isnull=True)
+
+		updated = 0
+		failed = 0
+		last_id = 0
+		# 포크 전에 DB 연결을 닫아 자식 프로세스가 소켓을 공유하지 않도록 합니다.
+		connections.close_all()
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			while True:
+				batch = list(photos.filter(id__gt=last_id).order_by('id').only('id', 'image')[:batch_size])
+				if not batch:
+					break
+				last_id = batch[-1].id
+
+				paths = []
+				for photo in batch:
+					try:
+						paths.append(photo.image.path)
+					except (ValueError, NotImplementedError):
+						paths.append('')
+				chunksize = max(1, len(paths) // (workers * 4))
+				changed = []
+				for photo, attributes in zip(batch, executor.map(_describe_file, paths, chunksize=chunksize)):
+					if attributes is None:
+						failed += 1
+						self.stdout.write(self.style.WARNING(f'[SKIP] photo_id={photo.id}: {photo.image.name}'))
+						continue
+					for field, value in attributes.items():
+						setattr(photo, field, value)
+					changed.append(photo)
+				if changed:
+					Photo.objects.bulk_update(changed, IMAGE_ATTRIBUTE_FIELDS)
+				updated += len(changed)
+
+		self.stdout.write(self.style.SUCCESS(f'Image attributes saved for {updated} photos. Failed {failed}.'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from PIL import Image
+
+from portfolio.exif import extract_metadata
+from portfolio.models import Photo, PhotoMetadata
+
+
+class Command(BaseCommand):
+	help = '저장된 사진 파일에서 EXIF를 읽어 PhotoMetadata를 채우고, 비어 있는 촬영일(taken_at)을 채웁니다.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--force', action='store_true', help='이미 메타데이터가 있는 사진도 다시 파싱')
+
+	def handle(self, *args, **options):
+		photos = Photo.objects.exclude(image='').order_by('id')
+		if not options['force']:
+			photos = photos.filter(metadata__isnull=True)
+
+		created = 0
+		dated = 0
+		failed = 0
+		for photo in photos.iterator():
+			try:
+				with photo.image.open('rb') as source:
+					metadata = extract_metadata(Image.open(source))
+			except (FileNotFoundError, OSError) as exc:
+				failed += 1
+				self.stdout.write(self.style.WARNING(f'[SKIP] photo_id={photo.id}: {exc}'))
+				continue
+
+			PhotoMetadata.objects.update_or_create(photo=photo, defaults=metadata)
+			created += 1
+			if not photo.taken_at and metadata['captured_at']:
+				photo.taken_at = timezone.localtime(metadata['captured_at']).date()
+				photo.save(update_fields=['taken_at'])
+				dated += 1
+
+		self.stdout.write(
+			self.style.SUCCESS(f'Metadata saved for {created} photos. taken_at filled {dated}, failed {failed}.')
+		)
@@ -0,0 +1,93 @@
+import io
+import multiprocessing
+import os
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+try:
+	import resource
+except ImportError:  # Windows
+	resource = None
+
+
+def _peak_rss_mb():
+	# Linux의 ru_maxrss는 exec 이전(부모) 값을 물려받으므로 VmHWM을 우선 사용합니다.
+	try:
+		with open('/proc/self/status', encoding='ascii') as status:
+			for line in status:
+				if line.startswith('VmHWM:'):
+					return int(line.split()[1]) / 1024
+	except OSError:
+		pass
+	if resource is None:
+		return None
+	# macOS는 byte, 그 외는 KB 단위로 보고합니다.
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak / 1024 / 1024 if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+def _run_mode(fast, sources, repeat, queue):
+	django.setup()
+	from portfolio.uploads import resize_upload
+
+	started = time.perf_counter()
+	count = 0
+	for _ in range(repeat):
+		for name, data in sources:
+			source = io.BytesIO(data)
+			source.name = name
+			resize_upload(source, fast=fast)
+			count += 1
+	elapsed = time.perf_counter() - started
+	queue.put((count, elapsed, _peak_rss_mb()))
+
+
+class Command(BaseCommand):
+	help = 'resize_upload 기존 경로(전체 디코드)와 빠른 경로(JPEG draft + reduce)의 처리량과 최대 RSS를 비교합니다.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('paths', nargs='*', help='벤치마크에 사용할 이미지 파일 (미지정 시 합성 JPEG 사용)')
+		parser.add_argument('--size', default='6000x4000', help='합성 이미지 크기 (기본 24MP)')
+		parser.add_argument('--count', type=int, default=3, help='합성 이미지 장수')
+		parser.add_argument('--repeat', type=int, default=2)
+
+	def _synthetic_sources(self, size, count):
+		try:
+			width, height = (int(value) for value in size.lower().split('x'))
+		except ValueError:
+			raise CommandError('--size는 6000x4000 형식이어야 합니다.')
+		sources = []
+		for index in range(count):
+			gradient = Image.linear_gradient('L').resize((width, height))
+			noise = Image.effect_noise((width, height), 40 + index * 10)
+			image = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+			output = io.BytesIO()
+			image.save(output, format='JPEG', quality=92)
+			sources.append((f'synthetic_{index}.jpg', output.getvalue()))
+		return sources
+
+	def handle(self, *args, **options):
+		if options['paths']:
+			sources = []
+			for path in options['paths']:
+				with open(path, 'rb') as source:
+					sources.append((os.path.basename(path), source.read()))
+		else:
+			sources = self._synthetic_sources(options['size'], options['count'])
+
+		# 모드별로 새 프로세스에서 실행해 최대 RSS가 서로 섞이지 않게 합니다.
+		context = multiprocessing.get_context('spawn')
+		for label, fast in (('legacy', False), ('fast', True)):
+			queue = context.Queue()
+			process = context.Process(target=_run_mode, args=(fast, sources, options['repeat'], queue))
+			process.start()
+			count, elapsed, peak_rss = queue.get()
+			process.join()
+			rss_text = f'{peak_rss:.1f} MB' if peak_rss is not None else 'n/a'
+			self.stdout.write(
+				f'{label:>6}: {count} images in {elapsed:.2f}s '
+				f'({count / elapsed:.2f} img/s), peak RSS {rss_text}'
+			)
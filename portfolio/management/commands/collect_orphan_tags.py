@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portfolio.models import Tag
+
+
+class Command(BaseCommand):
+	help = '사진이 모두 빠진 지 일정 시간이 지난 태그를 지웁니다. 주기적으로(cron 등) 실행하세요.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--grace-minutes', type=int, default=10, help='고아로 표시된 뒤 이 시간이 지난 태그만 삭제 (기본 10분)')
+		parser.add_argument('--batch-size', type=int, default=500)
+
+	def handle(self, *args, **options):
+		before = timezone.now() - timedelta(minutes=options['grace_minutes'])
+		deleted = Tag.collect_orphans(before, batch_size=options['batch_size'])
+		self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} orphan tags.'))
@@ -5,18 +5,21 @@ from portfolio.models import Photo, Season, Zone
 
 
 class Command(BaseCommand):
-	help = "Deduplicate seasons and zones by name, keeping the oldest record."
+	help = "Deduplicate seasons and zones by name, keeping the keyed season or else the oldest record."
 
 	@transaction.atomic
 	def handle(self, *args, **options):
+		# key가 있는 계절은 계절 페이지와 폼이 찾는 행이므로 남기고, 같은 이름이면 그 행으로 합칩니다.
 		season_map = {}
 		for season in Season.objects.order_by('id'):
-			season_map.setdefault(season.name, season)
+			keeper = season_map.get(season.name)
+			if keeper is None or (season.key and not keeper.key):
+				season_map[season.name] = season
 
 		season_deleted = 0
 		for season in Season.objects.order_by('id'):
 			keeper = season_map.get(season.name)
-			if keeper and keeper.id != season.id:
+			if keeper and keeper.id != season.id and not season.key:
 				Photo.objects.filter(season=season).update(season=keeper)
 				season.delete()
 				season_deleted += 1
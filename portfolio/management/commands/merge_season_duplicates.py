@@ -0,0 +1,92 @@
+import json
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from config.db_routing import get_current_db_alias, use_db_alias
+from portfolio.models import Photo, Season
+
+
+class Command(BaseCommand):
+	help = (
+		'key가 없고 이름이 같은 계절명으로 시작하는 계절(예: 직접 만든 "봄")의 사진을 key가 있는 계절로 옮깁니다. '
+		'원래 계절은 기록 파일에 남기며 --restore로 되돌릴 수 있습니다. 계절 행은 지우지 않습니다.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--database', choices=['local', 'nas'], help='대상 DB (기본: 현재 런타임 DB)')
+		parser.add_argument('--dry-run', action='store_true', help='옮길 사진 수만 출력')
+		parser.add_argument('--record', help='원래 계절을 기록할 JSON 경로 (기본: season_merge.<db>.<시각>.json)')
+		parser.add_argument('--restore', metavar='RECORD', help='기록 파일대로 사진의 원래 계절을 되돌림')
+
+	def handle(self, *args, **options):
+		alias = options['database'] or get_current_db_alias()
+		with use_db_alias(alias):
+			if options['restore']:
+				self._restore(alias, options['restore'])
+			else:
+				self._merge(alias, options)
+
+	def _merge(self, alias, options):
+		keepers = {season.key: season for season in Season.objects.exclude(key=None)}
+		moves = []
+		for season in Season.objects.filter(key=None).order_by('id'):
+			keeper = keepers.get(season.canonical_key)
+			if not keeper:
+				continue
+			photo_ids = list(Photo.objects.filter(season=season).order_by('id').values_list('id', flat=True))
+			self.stdout.write(f'{season.name} (id={season.id}) → {keeper.name} (id={keeper.id}): {len(photo_ids)} photos')
+			moves += [
+				{'photo_id': photo_id, 'from_season_id': season.id, 'to_season_id': keeper.id}
+				for photo_id in photo_ids
+			]
+		if options['dry_run'] or not moves:
+			self.stdout.write(self.style.SUCCESS(f'{len(moves)} photos to move (database={alias}).'))
+			return
+
+		record_path = options['record'] or os.path.join(
+			settings.BASE_DIR, f"season_merge.{alias}.{timezone.now():%Y%m%d%H%M%S}.json"
+		)
+		# DB를 바꾸기 전에 기록부터 남깁니다.
+		with open(record_path, 'w', encoding='utf-8') as record:
+			json.dump({'database': alias, 'merged_at': timezone.now().isoformat(), 'moves': moves}, record, indent=1)
+
+		by_target = defaultdict(list)
+		for move in moves:
+			by_target[move['to_season_id']].append(move['photo_id'])
+		with transaction.atomic(using=alias):
+			moved = sum(
+				Photo.objects.filter(id__in=photo_ids).update(season_id=season_id)
+				for season_id, photo_ids in by_target.items()
+			)
+		self.stdout.write(self.style.SUCCESS(f'Moved {moved} photos (database={alias}). Record: {record_path}'))
+
+	def _restore(self, alias, record_path):
+		try:
+			with open(record_path, encoding='utf-8') as record:
+				data = json.load(record)
+		except (OSError, ValueError) as exc:
+			raise CommandError(f'기록 파일을 읽을 수 없습니다: {exc}')
+		if data.get('database') != alias:
+			raise CommandError(f"기록 파일은 database={data.get('database')}용입니다 (현재 {alias}).")
+
+		by_source = defaultdict(lambda: defaultdict(list))
+		for move in data['moves']:
+			by_source[move['from_season_id']][move['to_season_id']].append(move['photo_id'])
+		existing = set(Season.objects.filter(id__in=by_source).values_list('id', flat=True))
+		restored = 0
+		with transaction.atomic(using=alias):
+			for from_season_id, targets in by_source.items():
+				if from_season_id not in existing:
+					self.stdout.write(self.style.WARNING(f'[SKIP] season_id={from_season_id} no longer exists'))
+					continue
+				for to_season_id, photo_ids in targets.items():
+					# 병합 뒤 다른 계절로 고친 사진은 건드리지 않습니다.
+					restored += Photo.objects.filter(id__in=photo_ids, season_id=to_season_id).update(
+						season_id=from_season_id
+					)
+		self.stdout.write(self.style.SUCCESS(f'Restored {restored} photos (database={alias}).'))
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from config.db_routing import get_current_db_alias
+from portfolio.models import Photo
+from portfolio.storage_layout import delete_relocated, hashed_layout_enabled, is_content_addressed, relocate_photo
+from portfolio.uploads import file_sha256
+
+
+class Command(BaseCommand):
+	help = '기존 사진 파일을 내용 해시 경로(PHOTO_STORAGE_LAYOUT=hashed)로 옮기고 Photo.image 이름을 배치 단위로 갱신합니다.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--batch-size', type=int, default=200)
+		parser.add_argument('--dry-run', action='store_true', help='옮길 대상 수만 출력')
+
+	def handle(self, *args, **options):
+		if not hashed_layout_enabled():
+			raise CommandError('PHOTO_STORAGE_LAYOUT=hashed 로 설정한 뒤 실행하세요. (새 업로드와 경로 규칙을 맞추기 위함)')
+		batch_size = max(1, options['batch_size'])
+		counts = {'moved': 0, 'current': 0, 'missing': 0, 'conflict': 0}
+		last_id = 0
+		while True:
+			batch = list(
+				Photo.objects.exclude(image='')
+				.filter(id__gt=last_id)
+				.order_by('id')
+				.only('id', 'image', 'renditions', 'processed_hash')[:batch_size]
+			)
+			if not batch:
+				break
+			last_id = batch[-1].id
+
+			changed = []
+			relocated = []
+			for photo in batch:
+				if is_content_addressed(photo.image.name):
+					counts['current'] += 1
+					continue
+				if options['dry_run']:
+					counts['moved'] += 1
+					continue
+				try:
+					# processed_hash는 reprocess/업로드 시 기록한 저장본 해시입니다. 없으면 파일을 읽어 계산합니다.
+					content_hash = photo.processed_hash or file_sha256(photo.image.path)
+					old_names = relocate_photo(photo, content_hash)
+				except FileNotFoundError:
+					counts['missing'] += 1
+					self.stdout.write(self.style.WARNING(f'[MISSING] photo_id={photo.id}: {photo.image.name}'))
+					continue
+				except FileExistsError as exc:
+					counts['conflict'] += 1
+					self.stdout.write(self.style.WARNING(f'[CONFLICT] photo_id={photo.id}: {exc} already exists'))
+					continue
+				photo.processed_hash = content_hash
+				changed.append(photo)
+				relocated += old_names
+
+			if changed:
+				# 새 경로는 하드링크로 먼저 만들어 두었으므로, DB 갱신이 실패해도 이전 파일은 그대로입니다.
+				with transaction.atomic(using=get_current_db_alias()):
+					Photo.objects.bulk_update(changed, ['image', 'renditions', 'processed_hash'])
+				delete_relocated(relocated)
+			counts['moved'] += len(changed)
+			self.stdout.write(f'... photo_id<={last_id}: moved {counts["moved"]}')
+
+		label = 'Would move' if options['dry_run'] else 'Moved'
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"{label} {counts['moved']} photos. Already hashed {counts['current']}, "
+				f"missing {counts['missing']}, conflicts {counts['conflict']}."
+			)
+		)
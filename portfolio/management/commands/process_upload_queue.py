@@ -0,0 +1,94 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from config.db_routing import get_current_db_alias, use_db_alias
+from portfolio.models import UploadJob
+from portfolio.uploads import claim_job, process_upload_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+	help = '업로드 대기열(UploadJob)을 로컬 워커 풀로 처리합니다. 외부 브로커 없이 DB 테이블만 사용합니다.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--database', choices=['local', 'nas'], help='대기열을 읽을 DB (기본: 현재 런타임 DB)')
+		parser.add_argument('--workers', type=int, default=settings.UPLOAD_QUEUE_WORKERS)
+		parser.add_argument('--poll', type=float, default=2.0, help='대기열이 비었을 때 재확인 간격(초)')
+		parser.add_argument('--once', action='store_true', help='현재 대기 중인 작업만 처리하고 종료')
+		parser.add_argument('--retry-failed', action='store_true', help='실패한 작업을 다시 대기열에 넣고 시작')
+		parser.add_argument('--stale-minutes', type=int, default=15, help='이 시간 이상 처리중인 작업은 재시도')
+
+	def _run_job(self, alias, job_id):
+		with use_db_alias(alias):
+			job = None
+			try:
+				job = UploadJob.objects.get(id=job_id)
+				job = process_upload_job(job)
+				return job.original_filename, job.status, job.error
+			except Exception as exc:
+				# 예상하지 못한 오류도 이 작업만 실패로 남기고 나머지 대기열은 계속 처리합니다.
+				logger.exception('Upload job %s failed', job_id)
+				error = f'{type(exc).__name__}: {exc}'[:1000]
+				try:
+					UploadJob.objects.filter(id=job_id).update(
+						status=UploadJob.STATUS_FAILED,
+						error=error,
+						updated_at=timezone.now(),
+					)
+				except Exception:
+					# DB 오류면 processing으로 남고 --stale-minutes 뒤 다시 처리됩니다.
+					logger.exception('Upload job %s could not be marked failed', job_id)
+				return (job.original_filename if job else f'job {job_id}'), UploadJob.STATUS_FAILED, error
+			finally:
+				close_old_connections()
+
+	def handle(self, *args, **options):
+		alias = options['database'] or get_current_db_alias()
+		workers = max(1, options['workers'])
+
+		with use_db_alias(alias):
+			stale_before = timezone.now() - timedelta(minutes=options['stale_minutes'])
+			requeued = UploadJob.objects.filter(
+				status=UploadJob.STATUS_PROCESSING,
+				updated_at__lt=stale_before,
+			).update(status=UploadJob.STATUS_PENDING)
+			if options['retry_failed']:
+				requeued += UploadJob.objects.filter(status=UploadJob.STATUS_FAILED).update(
+					status=UploadJob.STATUS_PENDING,
+				)
+			self.stdout.write(f'Upload queue: database={alias}, workers={workers}, requeued={requeued}')
+
+			processed = 0
+			with ThreadPoolExecutor(max_workers=workers) as executor:
+				while True:
+					pending_ids = list(
+						UploadJob.objects.filter(status=UploadJob.STATUS_PENDING)
+						.order_by('id')
+						.values_list('id', flat=True)[:workers * 4]
+					)
+					claimed_ids = [job_id for job_id in pending_ids if claim_job(job_id)]
+					if not claimed_ids:
+						if options['once']:
+							break
+						close_old_connections()
+						time.sleep(options['poll'])
+						continue
+
+					futures = [executor.submit(self._run_job, alias, job_id) for job_id in claimed_ids]
+					for future in futures:
+						filename, status, error = future.result()
+						processed += 1
+						if status == UploadJob.STATUS_FAILED:
+							self.stdout.write(self.style.ERROR(f'[FAILED] {filename}: {error}'))
+						else:
+							self.stdout.write(f'[{status.upper()}] {filename}')
+
+		self.stdout.write(self.style.SUCCESS(f'Processed {processed} upload jobs.'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.models import PhotoSearchToken
+from portfolio.search import rebuild_index
+
+
+class Command(BaseCommand):
+	help = '사진 제목/설명/태그의 검색 색인(PhotoSearchToken)을 처음부터 다시 만듭니다.'
+
+	def handle(self, *args, **options):
+		rebuild_index()
+		self.stdout.write(self.style.SUCCESS(f'Search index rebuilt: {PhotoSearchToken.objects.count()} tokens.'))
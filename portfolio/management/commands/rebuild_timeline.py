@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.models import TimelineDay
+
+
+class Command(BaseCommand):
+	help = 'Photo.effective_date 기준 날짜별 사진 수(TimelineDay)를 처음부터 다시 만듭니다.'
+
+	def handle(self, *args, **options):
+		TimelineDay.rebuild()
+		self.stdout.write(self.style.SUCCESS(f'Timeline rebuilt: {TimelineDay.objects.count()} days.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.models import Photo
+from portfolio.renditions import RENDITION_FIELDS, RENDITION_VERSION, generate_renditions
+
+
+class Command(BaseCommand):
+	help = "Regenerate srcset renditions for photos built with an older rendition spec."
+
+	def add_arguments(self, parser):
+		parser.add_argument('--force', action='store_true', help='버전과 무관하게 모든 렌디션을 다시 생성')
+
+	def handle(self, *args, **options):
+		force = options['force']
+		generated = 0
+		current = 0
+		failed = 0
+		for photo in Photo.objects.exclude(image='').order_by('id').iterator():
+			if not force and (photo.renditions or {}).get('version') == RENDITION_VERSION:
+				current += 1
+				continue
+			try:
+				generate_renditions(photo)
+			except (FileNotFoundError, OSError) as exc:
+				failed += 1
+				self.stdout.write(self.style.WARNING(f'[SKIP] photo_id={photo.id}: {exc}'))
+				continue
+			photo.save(update_fields=RENDITION_FIELDS)
+			generated += 1
+
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"Renditions v{RENDITION_VERSION}: generated {generated}, up to date {current}, failed {failed}."
+			)
+		)
@@ -1,62 +1,225 @@
+import json
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand
+from django.db import connections
 from PIL import Image
 
 from portfolio.models import Photo
+from portfolio.renditions import (
+	RENDITION_FIELDS,
+	RENDITION_VERSION,
+	VARIANT_EXTENSIONS,
+	generate_renditions,
+	variant_name,
+)
+from portfolio.storage_layout import (
+	content_addressed_name,
+	delete_relocated,
+	hashed_layout_enabled,
+	is_content_addressed,
+	photo_alias,
+)
+from portfolio.uploads import MAX_IMAGE_WIDTH, PROCESSING_VERSION, file_sha256
+
+
+def _reprocess_file(path, known_hash, up_to_date):
+	"""(상태, 해시 또는 오류, 새로 인코딩한 임시 파일 경로)를 돌려줍니다.
+
+	원본 파일은 덮어쓰지 않습니다. 임시 파일을 놓는 일은 DB를 보는 본 프로세스가 합니다.
+	"""
+	# 프로세스 풀에서 실행되므로 DB/Django 모델에 접근하지 않습니다.
+	if not os.path.exists(path):
+		return 'missing', '', ''
+	written_path = ''
+	try:
+		current_hash = file_sha256(path)
+		if up_to_date and current_hash == known_hash:
+			return 'skipped', current_hash, ''
+
+		image = Image.open(path)
+		width, height = image.size
+		if width <= MAX_IMAGE_WIDTH:
+			# 이미 규격에 맞는 파일은 다시 인코딩하지 않아 JPEG 화질 저하를 막습니다.
+			return 'marked', current_hash, ''
+
+		exif_bytes = image.info.get('exif')
+		image_format = (image.format or 'JPEG').upper()
+		if image.mode != 'RGB' and image_format in ['JPEG', 'JPG']:
+			image = image.convert('RGB')
+		ratio = MAX_IMAGE_WIDTH / float(width)
+		image = image.resize((MAX_IMAGE_WIDTH, int(height * ratio)), Image.LANCZOS)
+
+		save_kwargs = {'format': image_format}
+		if image_format in ['JPEG', 'JPG']:
+			save_kwargs = {
+				'format': 'JPEG',
+				'quality': 85,
+				'optimize': True,
+			}
+			if exif_bytes:
+				save_kwargs['exif'] = exif_bytes
+		# 같은 폴더(같은 파일 시스템)의 임시 파일에 써서 os.replace로 한 번에 놓을 수 있게 합니다.
+		fd, written_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.reprocess.tmp')
+		with os.fdopen(fd, 'wb') as output:
+			image.save(output, **save_kwargs)
+		return 'processed', file_sha256(written_path), written_path
+	except (OSError, ValueError, Image.DecompressionBombError) as exc:
+		# 손상되었거나 너무 큰 파일 하나 때문에 전체 실행이 멈추지 않도록 실패로 보고하고 넘어갑니다.
+		if written_path and os.path.exists(written_path):
+			os.remove(written_path)
+		return 'error', f'{type(exc).__name__}: {exc}', ''
+
+
+def _stored_names(photo):
+	names = [photo.image.name, *(photo.renditions or {}).get('files', {}).values()]
+	return names + [variant_name(name, image_format) for name in names for image_format in VARIANT_EXTENSIONS]
+
+
+def _install_file(photo, content_hash, written_path):
+	"""새로 인코딩한 파일을 제자리에 놓고 photo의 파일 이름을 바꿉니다. DB 저장 뒤 지울 이전 이름을 돌려줍니다.
+
+	내용 주소 경로(<hash>.<ext>)는 1년 immutable로 응답하므로 그 바이트는 절대 바꾸지 않고 새 해시 경로에 놓습니다.
+	"""
+	old_name = photo.image.name
+	if not (hashed_layout_enabled() or is_content_addressed(old_name)):
+		os.replace(written_path, default_storage.path(old_name))
+		return []
+	new_name = content_addressed_name(photo_alias(old_name), content_hash, old_name)
+	new_path = default_storage.path(new_name)
+	if os.path.exists(new_path):
+		# 이름이 같은 해시이므로 내용도 같습니다(예: DB 저장 전에 중단된 이전 실행이 놓아 둔 파일).
+		os.remove(written_path)
+	else:
+		os.makedirs(os.path.dirname(new_path), exist_ok=True)
+		os.replace(written_path, new_path)
+	if new_name == old_name:
+		return []
+	stale = _stored_names(photo)
+	photo.image.name = new_name
+	# 이전 렌디션은 DB 저장 뒤 stale 목록으로 지우고, 새 이름으로 다시 만듭니다.
+	photo.renditions = {}
+	return stale
 
 
 class Command(BaseCommand):
 	help = "Reprocess existing photos to max 800px width while preserving EXIF."
 
+	def add_arguments(self, parser):
+		parser.add_argument('--workers', type=int, default=1, help='병렬 처리 프로세스 수')
+		parser.add_argument('--batch-size', type=int, default=200, help='체크포인트 저장 단위')
+		parser.add_argument(
+			'--checkpoint',
+			default=os.path.join(settings.BASE_DIR, 'reprocess_photos.checkpoint.json'),
+			help='중단 후 이어서 처리하기 위한 체크포인트 파일 경로',
+		)
+		parser.add_argument('--restart', action='store_true', help='체크포인트를 무시하고 처음부터 처리')
+		parser.add_argument('--force', action='store_true', help='처리 표식(버전+해시)이 같아도 다시 검사')
+
+	def _load_checkpoint(self, path):
+		try:
+			with open(path, encoding='utf-8') as checkpoint:
+				data = json.load(checkpoint)
+		except (FileNotFoundError, ValueError):
+			return 0
+		if data.get('version') != PROCESSING_VERSION:
+			return 0
+		return int(data.get('last_id', 0))
+
+	def _save_checkpoint(self, path, last_id):
+		tmp_path = f'{path}.tmp'
+		with open(tmp_path, 'w', encoding='utf-8') as checkpoint:
+			json.dump({'version': PROCESSING_VERSION, 'last_id': last_id}, checkpoint)
+		os.replace(tmp_path, path)
+
 	def handle(self, *args, **options):
-		processed = 0
-		skipped = 0
-		missing = 0
-		for photo in Photo.objects.exclude(image=''):
-			image_field = photo.image
-			if not image_field:
-				missing += 1
-				continue
-			try:
-				path = image_field.path
-			except (ValueError, NotImplementedError):
-				skipped += 1
-				continue
-			if not os.path.exists(path):
-				missing += 1
-				continue
-
-			try:
-				image = Image.open(path)
-			except OSError:
-				skipped += 1
-				continue
-
-			exif_bytes = image.info.get('exif')
-			if image.mode != 'RGB' and (image.format or '').upper() in ['JPEG', 'JPG']:
-				image = image.convert('RGB')
-			width, height = image.size
-			if width > 800:
-				ratio = 800 / float(width)
-				image = image.resize((800, int(height * ratio)), Image.LANCZOS)
-
-			save_kwargs = {}
-			image_format = (image.format or 'JPEG').upper()
-			if image_format in ['JPEG', 'JPG']:
-				save_kwargs = {
-					'format': 'JPEG',
-					'quality': 85,
-					'optimize': True,
-				}
-				if exif_bytes:
-					save_kwargs['exif'] = exif_bytes
-
-			image.save(path, **save_kwargs) if save_kwargs else image.save(path)
-			processed += 1
+		workers = max(1, options['workers'])
+		batch_size = max(1, options['batch_size'])
+		checkpoint_path = options['checkpoint']
+		last_id = 0 if options['restart'] else self._load_checkpoint(checkpoint_path)
+		if last_id:
+			self.stdout.write(f'Resuming after photo_id={last_id} ({checkpoint_path})')
+
+		counts = {'processed': 0, 'marked': 0, 'skipped': 0, 'missing': 0, 'error': 0}
+		executor = None
+		if workers > 1:
+			# 포크 전에 DB 연결을 닫아 자식 프로세스가 소켓을 공유하지 않도록 합니다.
+			connections.close_all()
+			executor = ProcessPoolExecutor(max_workers=workers)
+
+		try:
+			while True:
+				batch = list(
+					Photo.objects.exclude(image='')
+					.filter(id__gt=last_id)
+					.order_by('id')
+					.only('id', 'image', 'processed_version', 'processed_hash', *RENDITION_FIELDS)[:batch_size]
+				)
+				if not batch:
+					break
+
+				tasks = []
+				for photo in batch:
+					try:
+						path = photo.image.path
+					except (ValueError, NotImplementedError):
+						path = ''
+					up_to_date = not options['force'] and photo.processed_version == PROCESSING_VERSION
+					tasks.append((path, photo.processed_hash, up_to_date))
+
+				if executor:
+					results = list(executor.map(_reprocess_file, *zip(*tasks)))
+				else:
+					results = [_reprocess_file(*task) for task in tasks]
+
+				changed = []
+				stale = []
+				for photo, (status, value, written_path) in zip(batch, results):
+					if status == 'processed':
+						try:
+							stale += _install_file(photo, value, written_path)
+						except OSError as exc:
+							if os.path.exists(written_path):
+								os.remove(written_path)
+							status, value = 'error', f'{type(exc).__name__}: {exc}'
+					counts[status] += 1
+					if status == 'error':
+						self.stdout.write(self.style.ERROR(f'[ERROR] photo_id={photo.id}: {value}'))
+						continue
+					if status == 'missing':
+						continue
+					stale_renditions = (photo.renditions or {}).get('version') != RENDITION_VERSION
+					if status == 'skipped' and not stale_renditions:
+						continue
+					if status == 'processed' or stale_renditions:
+						generate_renditions(photo)
+					photo.processed_version = PROCESSING_VERSION
+					photo.processed_hash = value
+					changed.append(photo)
+				if changed:
+					Photo.objects.bulk_update(
+						changed, ['image', 'processed_version', 'processed_hash'] + RENDITION_FIELDS
+					)
+				# 행이 새 이름을 가리킨 뒤에만 이전 파일을 지웁니다.
+				in_use = {name for photo in changed for name in _stored_names(photo)}
+				delete_relocated([name for name in stale if name not in in_use])
+
+				last_id = batch[-1].id
+				self._save_checkpoint(checkpoint_path, last_id)
+		finally:
+			if executor:
+				executor.shutdown()
+
+		if os.path.exists(checkpoint_path):
+			os.remove(checkpoint_path)
 
 		self.stdout.write(
 			self.style.SUCCESS(
-				f"Reprocessed {processed} photos. Skipped {skipped}, missing {missing}."
+				f"Reprocessed {counts['processed']} photos. Marked {counts['marked']}, "
+				f"skipped {counts['skipped']}, missing {counts['missing']}, errors {counts['error']}."
 			)
 		)
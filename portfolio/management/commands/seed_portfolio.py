@@ -1,17 +1,27 @@
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 
 from portfolio.models import Season, Tag, Zone
 
 
+def _free_slug(model, slug):
+    candidate = slug
+    number = 2
+    while model.objects.filter(slug=candidate).exists():
+        candidate = f"{slug}-{number}"
+        number += 1
+    return candidate
+
+
 class Command(BaseCommand):
-    help = "Seed basic seasons, zones, and tags for the portfolio."
+    help = "Seed basic seasons, zones, and tags for the portfolio. Existing rows are kept as they are."
 
     def handle(self, *args, **options):
         seasons = [
-            ("봄의 튤립", "spring-tulip", "튤립이 피어나는 봄"),
-            ("여름의 녹음", "summer-green", "짙은 녹음의 여름"),
-            ("가을의 갈대", "autumn-reed", "바람에 흔들리는 갈대"),
-            ("겨울의 설경", "winter-snow", "차분한 눈의 계절"),
+            (Season.KEY_SPRING, "봄의 튤립", "spring-tulip", "튤립이 피어나는 봄"),
+            (Season.KEY_SUMMER, "여름의 녹음", "summer-green", "짙은 녹음의 여름"),
+            (Season.KEY_AUTUMN, "가을의 갈대", "autumn-reed", "바람에 흔들리는 갈대"),
+            (Season.KEY_WINTER, "겨울의 설경", "winter-snow", "차분한 눈의 계절"),
         ]
         zones = [
             ("네덜란드 정원", "netherlands", "튤립과 풍차의 정원"),
@@ -26,19 +36,37 @@ class Command(BaseCommand):
             ("산책", "walk"),
         ]
 
-        for index, (name, slug, description) in enumerate(seasons):
-            Season.objects.update_or_create(
-                slug=slug,
-                defaults={"name": name, "description": description, "order": index + 1},
-            )
+        for index, (key, name, slug, description) in enumerate(seasons):
+            # 계절은 key로 찾으므로 이미 있는 계절(직접 만든 '봄' 등)을 중복으로 만들지 않습니다.
+            season = Season.objects.filter(key=key).first()
+            if season is None:
+                # key 도입 전에 시드한 계절은 slug로 찾아 key만 붙입니다.
+                season = Season.objects.filter(slug=slug, key__isnull=True).first()
+                if season is None:
+                    Season.objects.create(
+                        key=key,
+                        name=name,
+                        slug=_free_slug(Season, slug),
+                        description=description,
+                        order=index + 1,
+                    )
+                    continue
+                season.key = key
+                season.save(update_fields=["key"])
+            # 이미 있는 계절은 비어 있는 설명만 채우고, 사용자가 정한 이름/slug/순서는 그대로 둡니다.
+            if not season.description:
+                season.description = description
+                season.save(update_fields=["description"])
 
         for index, (name, slug, description) in enumerate(zones):
-            Zone.objects.update_or_create(
+            Zone.objects.get_or_create(
                 slug=slug,
                 defaults={"name": name, "description": description, "order": index + 1},
             )
 
         for name, slug in tags:
-            Tag.objects.update_or_create(slug=slug, defaults={"name": name})
+            # 태그 이름도 유니크이므로 같은 이름의 태그가 있으면 건너뜁니다.
+            if not Tag.objects.filter(Q(slug=slug) | Q(name=name)).exists():
+                Tag.objects.create(name=name, slug=slug)
 
         self.stdout.write(self.style.SUCCESS("Seed data created. Upload photos via admin."))
@@ -0,0 +1,27 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from config.db_routing import get_current_db_alias, use_db_alias
+from portfolio.models import SiteAsset
+
+
+class Command(BaseCommand):
+	help = '사이트 고정 파일(작가 사진 등)을 올리고 현재 버전으로 등록합니다.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('path', help='올릴 이미지 파일 경로')
+		parser.add_argument('--key', choices=[key for key, _ in SiteAsset.KEY_CHOICES], default=SiteAsset.KEY_AUTHOR_PHOTO)
+		parser.add_argument('--database', choices=['local', 'nas'], help='등록할 DB (기본: 현재 런타임 DB)')
+
+	def handle(self, *args, **options):
+		path = options['path']
+		if not os.path.isfile(path):
+			raise CommandError(f'파일이 없습니다: {path}')
+		alias = options['database'] or get_current_db_alias()
+		with use_db_alias(alias):
+			asset = SiteAsset.objects.filter(key=options['key']).first() or SiteAsset(key=options['key'])
+			with open(path, 'rb') as source:
+				asset.replace_file(os.path.basename(path), File(source))
+		self.stdout.write(self.style.SUCCESS(f'{asset.key}: {asset.url} (database={alias})'))
@@ -0,0 +1,190 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils._os import safe_join
+
+from .renditions import VARIANT_EXTENSIONS
+from .storage_layout import is_content_addressed
+
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+
+NEGOTIABLE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def _accepted_types(accept_header):
+	accepted = set()
+	for item in accept_header.split(','):
+		media_type, _, params = item.strip().partition(';')
+		quality = 1.0
+		for param in params.split(';'):
+			key, _, value = param.strip().partition('=')
+			if key == 'q':
+				try:
+					quality = float(value)
+				except ValueError:
+					quality = 0.0
+		if quality > 0:
+			accepted.add(media_type.strip().lower())
+	return accepted
+
+
+def negotiate_variant(path, accept_header):
+	"""Accept 헤더가 허용하는 변환본(AVIF/WebP) 중 원본보다 작은 가장 작은 파일 경로를 돌려줍니다."""
+	accepted = _accepted_types(accept_header)
+	try:
+		best_path = path
+		best_size = os.stat(safe_join(settings.MEDIA_ROOT, path)).st_size
+	except (OSError, ValueError):
+		return path
+	for extension in VARIANT_EXTENSIONS.values():
+		if f'image/{extension}' not in accepted:
+			continue
+		candidate = f'{path}.{extension}'
+		try:
+			size = os.stat(safe_join(settings.MEDIA_ROOT, candidate)).st_size
+		except (OSError, ValueError):
+			continue
+		if size < best_size:
+			best_path, best_size = candidate, size
+	return best_path
+
+
+class UnsatisfiableRange(ValueError):
+	pass
+
+
+def file_etag(stat_result):
+	# 파일을 읽지 않고 stat(크기+수정 시각)만으로 강한 ETag를 만듭니다.
+	return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def parse_byte_range(header, size):
+	"""단일 bytes 범위만 해석합니다. 형식이 다르거나 다중 범위면 None(전체 전송)을 돌려줍니다."""
+	match = RANGE_RE.match(header.strip())
+	if not match or match.groups() == ('', ''):
+		return None
+	first, last = match.groups()
+	if first:
+		start = int(first)
+		end = min(int(last), size - 1) if last else size - 1
+	else:
+		# bytes=-N: 마지막 N바이트
+		length = int(last)
+		if not length:
+			raise UnsatisfiableRange(header)
+		start = max(0, size - length)
+		end = size - 1
+	if start >= size or start > end:
+		raise UnsatisfiableRange(header)
+	return start, end
+
+
+def _if_range_passes(request, etag, last_modified):
+	if_range = request.META.get('HTTP_IF_RANGE')
+	if not if_range:
+		return True
+	if if_range.startswith(('"', 'W/')):
+		return if_range == etag
+	if_range_date = parse_http_date_safe(if_range)
+	return if_range_date is not None and int(last_modified) <= if_range_date
+
+
+def _read_range(fullpath, start, length):
+	with open(fullpath, 'rb') as source:
+		source.seek(start)
+		while length > 0:
+			chunk = source.read(min(STREAM_CHUNK_SIZE, length))
+			if not chunk:
+				break
+			length -= len(chunk)
+			yield chunk
+
+
+def _offload_response(path, fullpath):
+	if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+		response = HttpResponse()
+		response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(path)
+		return response
+	if settings.MEDIA_USE_SENDFILE:
+		response = HttpResponse()
+		response['X-Sendfile'] = fullpath
+		return response
+	return None
+
+
+def _file_response(request, path, fullpath, stat_result, etag):
+	size = stat_result.st_size
+	# 프록시가 파일을 보내면 Range도 프록시가 처리합니다.
+	response = _offload_response(path, fullpath)
+	if response is not None:
+		return response
+
+	byte_range = None
+	if 'HTTP_RANGE' in request.META and _if_range_passes(request, etag, stat_result.st_mtime):
+		try:
+			byte_range = parse_byte_range(request.META['HTTP_RANGE'], size)
+		except UnsatisfiableRange:
+			response = HttpResponse(status=416)
+			response['Content-Range'] = f'bytes */{size}'
+			return response
+
+	if request.method == 'HEAD':
+		response = HttpResponse()
+		response['Content-Length'] = size
+	elif byte_range:
+		start, end = byte_range
+		response = StreamingHttpResponse(_read_range(fullpath, start, end - start + 1), status=206)
+		response['Content-Length'] = end - start + 1
+		response['Content-Range'] = f'bytes {start}-{end}/{size}'
+	else:
+		response = FileResponse(open(fullpath, 'rb'))
+	return response
+
+
+def serve_media(request, path):
+	requested_path = path
+	negotiable = path.lower().endswith(NEGOTIABLE_EXTENSIONS)
+	if negotiable:
+		path = negotiate_variant(path, request.META.get('HTTP_ACCEPT', ''))
+	# 같은 URL로 변환본을 보낼 때는 변환본이 재생성될 수 있으므로 immutable로 두지 않습니다.
+	immutable = path == requested_path and is_content_addressed(path)
+	try:
+		fullpath = safe_join(settings.MEDIA_ROOT, path)
+		stat_result = os.stat(fullpath)
+	except (OSError, SuspiciousFileOperation):
+		raise Http404('파일이 없습니다.')
+	if not stat.S_ISREG(stat_result.st_mode):
+		raise Http404('파일이 없습니다.')
+
+	etag = file_etag(stat_result)
+	response = get_conditional_response(request, etag=etag, last_modified=int(stat_result.st_mtime))
+	if response is None:
+		response = _file_response(request, path, fullpath, stat_result, etag)
+
+	content_type, encoding = mimetypes.guess_type(fullpath)
+	if response.status_code in (200, 206):
+		response['Content-Type'] = content_type or 'application/octet-stream'
+		if encoding:
+			response['Content-Encoding'] = encoding
+	response['ETag'] = etag
+	response['Last-Modified'] = http_date(stat_result.st_mtime)
+	response['Accept-Ranges'] = 'bytes'
+	if immutable:
+		patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+	else:
+		patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+	if negotiable:
+		patch_vary_headers(response, ['Accept'])
+	return response
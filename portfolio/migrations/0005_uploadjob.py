@@ -0,0 +1,33 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.UUIDField(db_index=True)),
+                ('original_filename', models.CharField(max_length=255)),
+                ('staged_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', '대기'), ('processing', '처리중'), ('done', '완료'), ('duplicate', '중복'), ('failed', '실패')], default='pending', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('photo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='portfolio.photo')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='portfolio_u_status_92c392_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_uploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='processed_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='processed_version',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
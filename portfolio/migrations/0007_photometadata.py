@@ -0,0 +1,27 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_photo_processed_marker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exif', models.JSONField(blank=True, default=list)),
+                ('camera', models.CharField(blank=True, max_length=120)),
+                ('lens', models.CharField(blank=True, max_length=120)),
+                ('captured_at', models.DateTimeField(blank=True, null=True)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('photo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='metadata', to='portfolio.photo')),
+            ],
+        ),
+    ]
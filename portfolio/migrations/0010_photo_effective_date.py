@@ -0,0 +1,51 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:21
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_effective_date(apps, schema_editor):
+    Photo = apps.get_model('portfolio', 'Photo')
+    photos = Photo.objects.using(schema_editor.connection.alias).filter(effective_date__isnull=True)
+    batch = []
+    for photo in photos.only('id', 'taken_at', 'created_at').iterator():
+        photo.effective_date = photo.taken_at or timezone.localdate(photo.created_at)
+        batch.append(photo)
+        if len(batch) >= 500:
+            Photo.objects.using(schema_editor.connection.alias).bulk_update(batch, ['effective_date'])
+            batch = []
+    if batch:
+        Photo.objects.using(schema_editor.connection.alias).bulk_update(batch, ['effective_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_photo_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='effective_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_effective_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='photo',
+            name='effective_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['effective_date', 'created_at', 'id'], name='photo_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['season', 'effective_date', 'created_at'], name='photo_season_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['zone', 'effective_date', 'created_at'], name='photo_zone_timeline_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:22
+
+from django.db import migrations, models
+
+
+def build_timeline(apps, schema_editor):
+    Photo = apps.get_model('portfolio', 'Photo')
+    TimelineDay = apps.get_model('portfolio', 'TimelineDay')
+    alias = schema_editor.connection.alias
+    counts = (
+        Photo.objects.using(alias).order_by()
+        .values_list('effective_date').annotate(models.Count('id'))
+    )
+    TimelineDay.objects.using(alias).bulk_create(
+        [TimelineDay(day=day, photo_count=photo_count) for day, photo_count in counts]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_photo_effective_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('photo_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+        migrations.RunPython(build_timeline, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+from portfolio.hangul import get_initial
+
+
+def fill_tags(apps, schema_editor):
+    Tag = apps.get_model('portfolio', 'Tag')
+    Photo = apps.get_model('portfolio', 'Photo')
+    alias = schema_editor.connection.alias
+    counts = dict(
+        Photo.tags.through.objects.using(alias).order_by()
+        .values_list('tag_id').annotate(models.Count('id'))
+    )
+    tags = list(Tag.objects.using(alias).only('id', 'name'))
+    for tag in tags:
+        tag.initial = get_initial(tag.name)
+        tag.photo_count = counts.get(tag.id, 0)
+    Tag.objects.using(alias).bulk_update(tags, ['initial', 'photo_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0011_timelineday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='initial',
+            field=models.CharField(blank=True, editable=False, help_text='이름의 한글 초성(된소리는 예사소리로)', max_length=1),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['initial', 'name'], name='tag_initial_idx'),
+        ),
+        migrations.RunPython(fill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from portfolio.search import photo_token_weights
+
+
+def build_search_index(apps, schema_editor):
+    Photo = apps.get_model('portfolio', 'Photo')
+    PhotoSearchToken = apps.get_model('portfolio', 'PhotoSearchToken')
+    alias = schema_editor.connection.alias
+    photos = Photo.objects.using(alias).only('id', 'title', 'description').prefetch_related('tags')
+    tokens = []
+    for photo in photos.iterator(chunk_size=500):
+        weights = photo_token_weights(photo, [tag.name for tag in photo.tags.all()])
+        tokens.extend(
+            PhotoSearchToken(photo_id=photo.id, token=token, weight=weight)
+            for token, weight in weights.items()
+        )
+        if len(tokens) >= 5000:
+            PhotoSearchToken.objects.using(alias).bulk_create(tokens)
+            tokens = []
+    PhotoSearchToken.objects.using(alias).bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0012_tag_initial_photo_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=2)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('photo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='portfolio.photo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'photo', 'weight'], name='search_token_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+def fill_photo_updated_at(apps, schema_editor):
+    # 기존 사진은 수정 이력이 없으므로 업로드 시각으로 채웁니다.
+    Photo = apps.get_model('portfolio', 'Photo')
+    Photo.objects.using(schema_editor.connection.alias).update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0013_photosearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='zone',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['season', 'updated_at'], name='photo_season_updated_idx'),
+        ),
+        migrations.RunPython(fill_photo_updated_at, migrations.RunPython.noop),
+    ]
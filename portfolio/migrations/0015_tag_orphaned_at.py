@@ -0,0 +1,26 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:32
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_orphans(apps, schema_editor):
+    # 사용 수(0012에서 채움)가 0인 기존 태그는 다음 collect_orphan_tags 실행에서 정리됩니다.
+    Tag = apps.get_model('portfolio', 'Tag')
+    Tag.objects.using(schema_editor.connection.alias).filter(photo_count=0).update(orphaned_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0014_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='orphaned_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_orphans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+SEASON_LABELS = [('spring', '봄'), ('summer', '여름'), ('autumn', '가을'), ('winter', '겨울')]
+
+
+def map_season_keys(apps, schema_editor):
+    # 정원의 사계 페이지가 쓰던 규칙(이름이 계절명으로 시작하는 것 중 order, id 순 첫 번째)으로 key를 줍니다.
+    # 같은 계절명으로 시작하는 다른 계절의 사진은 옮기지 않습니다(merge_season_duplicates 명령 참고).
+    Season = apps.get_model('portfolio', 'Season')
+    alias = schema_editor.connection.alias
+    for key, label in SEASON_LABELS:
+        keeper = Season.objects.using(alias).filter(name__startswith=label).order_by('order', 'id').first()
+        if keeper:
+            Season.objects.using(alias).filter(id=keeper.id).update(key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0015_tag_orphaned_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='key',
+            field=models.CharField(blank=True, choices=[('spring', '봄'), ('summer', '여름'), ('autumn', '가을'), ('winter', '겨울')], max_length=10, null=True, unique=True),
+        ),
+        # 되돌릴 때는 위 AddField가 key 열을 지우므로 따로 할 일이 없습니다.
+        migrations.RunPython(map_season_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.18 on 2026-10-18 07:36
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+import portfolio.models
+
+LEGACY_AUTHOR_DIR = 'photos/local/2026/03'
+
+
+def register_legacy_author_photo(apps, schema_editor):
+    # about()가 매 요청마다 고르던 파일(author_profile*로 시작하는 가장 최근 파일)을 한 번만 찾아 등록합니다.
+    SiteAsset = apps.get_model('portfolio', 'SiteAsset')
+    alias = schema_editor.connection.alias
+    author_dir = os.path.join(settings.MEDIA_ROOT, LEGACY_AUTHOR_DIR)
+    if not os.path.isdir(author_dir):
+        return
+    candidates = [
+        name for name in os.listdir(author_dir)
+        if name.startswith('author_profile') and name.lower().endswith(('.png', '.jpg', '.jpeg'))
+    ]
+    if not candidates:
+        return
+    filename = max(candidates, key=lambda name: os.path.getmtime(os.path.join(author_dir, name)))
+    digest = hashlib.sha256()
+    with open(os.path.join(author_dir, filename), 'rb') as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+    SiteAsset.objects.using(alias).get_or_create(
+        key='author_photo',
+        defaults={'file': f'{LEGACY_AUTHOR_DIR}/{filename}', 'version': digest.hexdigest()[:12]},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0016_season_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteAsset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(choices=[('author_photo', '작가 사진')], max_length=40, unique=True)),
+                ('file', models.ImageField(upload_to=portfolio.models.site_asset_upload_path)),
+                ('version', models.CharField(blank=True, editable=False, max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['key'],
+            },
+        ),
+        migrations.RunPython(register_legacy_author_photo, migrations.RunPython.noop),
+    ]
@@ -1,20 +1,52 @@
-from django.db import models
+import hashlib
+from datetime import date
+
+from django.db import connections, models, router
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from config.db_routing import get_current_db_alias
 
+from .cache import bump_generation
+from .hangul import get_initial
+from .storage_layout import content_addressed_name, hashed_layout_enabled
+
 
 def photo_upload_path(instance, filename):
 	now = timezone.now()
 	db_alias = get_current_db_alias()
+	if hashed_layout_enabled():
+		content_hash = instance.processed_hash
+		if not content_hash:
+			# 관리자 화면 등 업로드 큐를 거치지 않은 파일
+			digest = hashlib.sha256()
+			for chunk in instance.image.chunks():
+				digest.update(chunk)
+			instance.image.seek(0)
+			content_hash = digest.hexdigest()
+		return content_addressed_name(db_alias, content_hash, filename)
 	return f"photos/{db_alias}/{now.year}/{now.month:02d}/{filename}"
 
 
 class Season(models.Model):
+	KEY_SPRING = 'spring'
+	KEY_SUMMER = 'summer'
+	KEY_AUTUMN = 'autumn'
+	KEY_WINTER = 'winter'
+	KEY_CHOICES = [
+		(KEY_SPRING, '봄'),
+		(KEY_SUMMER, '여름'),
+		(KEY_AUTUMN, '가을'),
+		(KEY_WINTER, '겨울'),
+	]
+
+	# 정원의 사계 페이지와 사진 수정 폼은 이름 대신 key로 계절을 찾습니다.
+	key = models.CharField(max_length=10, choices=KEY_CHOICES, unique=True, null=True, blank=True)
 	name = models.CharField(max_length=50)
 	slug = models.SlugField(unique=True)
 	description = models.TextField(blank=True)
 	order = models.PositiveSmallIntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
 		ordering = ['order', 'name']
@@ -22,12 +54,20 @@ class Season(models.Model):
 	def __str__(self):
 		return self.name
 
+	@property
+	def canonical_key(self):
+		"""key가 없는 계절(예: 직접 만든 '봄')은 이름이 시작하는 계절명으로 key를 추정합니다."""
+		if self.key:
+			return self.key
+		return next((key for key, label in self.KEY_CHOICES if self.name.startswith(label)), None)
+
 
 class Zone(models.Model):
 	name = models.CharField(max_length=100)
 	slug = models.SlugField(unique=True)
 	description = models.TextField(blank=True)
 	order = models.PositiveSmallIntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
 		ordering = ['order', 'name']
@@ -39,28 +79,363 @@ class Zone(models.Model):
 class Tag(models.Model):
 	name = models.CharField(max_length=50, unique=True)
 	slug = models.SlugField(unique=True)
+	initial = models.CharField(max_length=1, blank=True, editable=False, help_text='이름의 한글 초성(된소리는 예사소리로)')
+	photo_count = models.PositiveIntegerField(default=0, editable=False)
+	# 마지막 사진 연결이 빠진 시각. collect_orphan_tags가 이 값이 있는 태그만 살펴 지웁니다.
+	orphaned_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
 		ordering = ['name']
+		indexes = [
+			models.Index(fields=['initial', 'name'], name='tag_initial_idx'),
+		]
 
 	def __str__(self):
 		return self.name
 
+	def save(self, *args, **kwargs):
+		self.initial = get_initial(self.name)
+		update_fields = kwargs.get('update_fields')
+		if update_fields:
+			extra = ['updated_at']
+			if 'name' in update_fields:
+				extra.append('initial')
+			kwargs['update_fields'] = {*update_fields, *extra}
+		super().save(*args, **kwargs)
+
+	@classmethod
+	def refresh_photo_counts(cls, tag_ids, using=None):
+		# 태그 연결이 바뀐 태그만 through 표에서 다시 셉니다.
+		tag_ids = {tag_id for tag_id in tag_ids if tag_id}
+		if not tag_ids:
+			return
+		through = Photo.tags.through
+		counts = (
+			through.objects.using(using).filter(tag_id=models.OuterRef('pk'))
+			.order_by().values('tag_id').annotate(photo_count=models.Count('id')).values('photo_count')
+		)
+		now = timezone.now()
+		cls.objects.using(using).filter(id__in=tag_ids).update(
+			photo_count=Coalesce(models.Subquery(counts), 0),
+			orphaned_at=models.Case(
+				models.When(models.Exists(through.objects.filter(tag_id=models.OuterRef('pk'))), then=None),
+				default=models.Value(now),
+			),
+			updated_at=now,
+		)
+
+	@classmethod
+	def collect_orphans(cls, before, using=None, batch_size=500):
+		"""before 이전에 고아로 표시된 태그를 지웁니다. 그 사이 다시 쓰인 태그는 표시만 지웁니다.
+
+		표시 없이 사용 수가 0인 태그(표시 도입 전의 태그 등)는 이번에 표시만 하고, 유예 시간이 지난 다음 실행에서 지웁니다.
+		"""
+		through = Photo.tags.through
+		deleted = 0
+		cls.objects.using(using).filter(photo_count=0, orphaned_at__isnull=True).update(orphaned_at=timezone.now())
+		while True:
+			tag_ids = list(
+				cls.objects.using(using).filter(orphaned_at__lte=before)
+				.order_by('id').values_list('id', flat=True)[:batch_size]
+			)
+			if not tag_ids:
+				return deleted
+			in_use = set(
+				through.objects.using(using).filter(tag_id__in=tag_ids)
+				.order_by().values_list('tag_id', flat=True).distinct()
+			)
+			if in_use:
+				cls.objects.using(using).filter(id__in=in_use).update(orphaned_at=None)
+			_, per_model = cls.objects.using(using).filter(id__in=set(tag_ids) - in_use).delete()
+			deleted += per_model.get(cls._meta.label, 0)
+
+
+def photo_effective_date(taken_at, created_at):
+	# 촬영일이 없으면 업로드한 날(로컬 날짜)을 타임라인 날짜로 씁니다.
+	return taken_at or timezone.localdate(created_at)
+
+
+class PhotoQuerySet(models.QuerySet):
+	# update()/bulk_update()는 신호를 보내지 않으므로 여기서 페이지 캐시 세대를 올립니다.
+	def update(self, **kwargs):
+		kwargs.setdefault('updated_at', timezone.now())
+		rows = self._update_with_timeline(**kwargs)
+		bump_generation(self.db)
+		return rows
+
+	def bulk_update(self, objs, fields, batch_size=None):
+		objs = list(objs)
+		fields = list(fields)
+		if 'updated_at' not in fields:
+			now = timezone.now()
+			for obj in objs:
+				obj.updated_at = now
+			fields.append('updated_at')
+		rows = self._bulk_update_with_timeline(objs, fields, batch_size=batch_size)
+		bump_generation(self.db)
+		return rows
+
+	def _update_with_timeline(self, **kwargs):
+		if 'taken_at' not in kwargs or 'effective_date' in kwargs:
+			return super().update(**kwargs)
+		taken_at = kwargs['taken_at']
+		photo_ids = list(self.values_list('id', flat=True))
+		refreshed = self.model._base_manager.using(self.db).filter(id__in=photo_ids)
+		old_days = set(refreshed.order_by().values_list('effective_date', flat=True).distinct())
+		if isinstance(taken_at, date):
+			rows = super().update(effective_date=taken_at, **kwargs)
+		else:
+			# 촬영일을 지우거나 식(F 등)으로 바꾸면 갱신 후 행별로 다시 계산합니다.
+			rows = super().update(**kwargs)
+			ids_by_date = {}
+			for photo_id, taken, created_at in refreshed.values_list('id', 'taken_at', 'created_at'):
+				ids_by_date.setdefault(photo_effective_date(taken, created_at), []).append(photo_id)
+			if ids_by_date:
+				refreshed.update(effective_date=models.Case(
+					*[models.When(id__in=ids, then=models.Value(day)) for day, ids in ids_by_date.items()],
+					output_field=models.DateField(),
+				))
+		new_days = set(refreshed.order_by().values_list('effective_date', flat=True).distinct())
+		TimelineDay.refresh(old_days | new_days, using=self.db)
+		return rows
+
+	def _bulk_update_with_timeline(self, objs, fields, batch_size=None):
+		fields = list(fields)
+		if 'taken_at' not in fields or 'effective_date' in fields:
+			return super().bulk_update(objs, fields, batch_size=batch_size)
+		days = set()
+		for obj in objs:
+			# _timeline_day: 불러올 때의 effective_date (signals.remember_timeline_day)
+			days.add(getattr(obj, '_timeline_day', None))
+			obj.effective_date = photo_effective_date(obj.taken_at, obj.created_at)
+			days.add(obj.effective_date)
+		fields.append('effective_date')
+		rows = super().bulk_update(objs, fields, batch_size=batch_size)
+		TimelineDay.refresh(days, using=self.db)
+		return rows
+
 
 class Photo(models.Model):
 	title = models.CharField(max_length=120)
 	image = models.ImageField(upload_to=photo_upload_path)
-	original_filename = models.CharField(max_length=255, blank=True)
+	original_filename = models.CharField(max_length=255, blank=True, db_index=True)
+	# 업로드 원본 바이트의 SHA-256. 중복 업로드를 유니크 인덱스 한 번으로 판별합니다.
+	# 원본이 남아 있지 않은 기존 사진은 NULL입니다(저장본 해시는 processed_hash).
+	content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True)
 	description = models.TextField(blank=True)
 	season = models.ForeignKey(Season, on_delete=models.SET_NULL, null=True, blank=True)
 	zone = models.ForeignKey(Zone, on_delete=models.SET_NULL, null=True, blank=True)
 	tags = models.ManyToManyField(Tag, blank=True)
 	taken_at = models.DateField(null=True, blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True, db_index=True)
+	# taken_at 또는 created_at의 로컬 날짜. save/update/bulk_update에서 함께 갱신합니다.
+	effective_date = models.DateField(editable=False)
 	is_featured = models.BooleanField(default=False)
+	renditions = models.JSONField(default=dict, blank=True)
+	processed_version = models.PositiveSmallIntegerField(default=0)
+	processed_hash = models.CharField(max_length=64, blank=True)
+	# 레이아웃 예약과 로딩 중 표시용: 저장본 크기, 대표 색상(#rrggbb), 초소형 미리보기 data URI
+	width = models.PositiveIntegerField(null=True, blank=True)
+	height = models.PositiveIntegerField(null=True, blank=True)
+	dominant_color = models.CharField(max_length=7, blank=True)
+	placeholder = models.TextField(blank=True)
+
+	objects = PhotoQuerySet.as_manager()
 
 	class Meta:
 		ordering = ['-created_at']
+		indexes = [
+			models.Index(fields=['effective_date', 'created_at', 'id'], name='photo_timeline_idx'),
+			models.Index(fields=['season', 'effective_date', 'created_at'], name='photo_season_timeline_idx'),
+			models.Index(fields=['zone', 'effective_date', 'created_at'], name='photo_zone_timeline_idx'),
+			models.Index(fields=['season', 'updated_at'], name='photo_season_updated_idx'),
+		]
 
 	def __str__(self):
 		return self.title
+
+	def save(self, *args, **kwargs):
+		self.effective_date = photo_effective_date(self.taken_at, self.created_at or timezone.now())
+		update_fields = kwargs.get('update_fields')
+		if update_fields:
+			# auto_now 필드는 update_fields에 없으면 저장되지 않습니다.
+			extra = ['updated_at']
+			if 'taken_at' in update_fields:
+				extra.append('effective_date')
+			kwargs['update_fields'] = {*update_fields, *extra}
+		super().save(*args, **kwargs)
+
+
+class TimelineDay(models.Model):
+	"""effective_date별 사진 수. 사진관리 페이지의 연/월/일 탐색을 이 표에서 만듭니다."""
+	day = models.DateField(unique=True)
+	photo_count = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		ordering = ['day']
+
+	def __str__(self):
+		return f"{self.day} ({self.photo_count})"
+
+	@classmethod
+	def refresh(cls, days, using=None):
+		# 증감 대신 해당 날짜만 다시 세므로 동시 업로드가 있어도 값이 어긋나지 않습니다.
+		days = {day for day in days if day}
+		if not days:
+			return
+		using = using or router.db_for_write(cls)
+		counts = dict(
+			Photo.objects.using(using).filter(effective_date__in=days)
+			.order_by().values_list('effective_date').annotate(models.Count('id'))
+		)
+		# 날짜 수와 무관하게 집계 1번, upsert 1번, 삭제 1번으로 끝냅니다.
+		if counts:
+			# MySQL의 ON DUPLICATE KEY UPDATE는 충돌 대상(unique_fields)을 지정하지 않습니다.
+			target = ['day'] if connections[using].features.supports_update_conflicts_with_target else None
+			cls.objects.using(using).bulk_create(
+				[cls(day=day, photo_count=photo_count) for day, photo_count in counts.items()],
+				update_conflicts=True,
+				unique_fields=target,
+				update_fields=['photo_count'],
+			)
+		empty_days = days - set(counts)
+		if empty_days:
+			cls.objects.using(using).filter(day__in=empty_days).delete()
+
+	@classmethod
+	def rebuild(cls, using=None):
+		counts = (
+			Photo.objects.using(using).order_by()
+			.values_list('effective_date').annotate(models.Count('id'))
+		)
+		cls.objects.using(using).all().delete()
+		cls.objects.using(using).bulk_create(
+			[cls(day=day, photo_count=photo_count) for day, photo_count in counts]
+		)
+
+
+class PhotoSearchToken(models.Model):
+	"""검색용 역색인. 사진의 제목/태그/설명에서 뽑은 글자 n-gram과 가중치를 담습니다."""
+	photo = models.ForeignKey(Photo, on_delete=models.CASCADE, related_name='search_tokens')
+	token = models.CharField(max_length=2)
+	weight = models.PositiveSmallIntegerField(default=1)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['token', 'photo', 'weight'], name='search_token_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.token} → {self.photo_id}"
+
+
+class UploadJob(models.Model):
+	STATUS_PENDING = 'pending'
+	STATUS_PROCESSING = 'processing'
+	STATUS_DONE = 'done'
+	STATUS_DUPLICATE = 'duplicate'
+	STATUS_FAILED = 'failed'
+	STATUS_CHOICES = [
+		(STATUS_PENDING, '대기'),
+		(STATUS_PROCESSING, '처리중'),
+		(STATUS_DONE, '완료'),
+		(STATUS_DUPLICATE, '중복'),
+		(STATUS_FAILED, '실패'),
+	]
+	FINISHED_STATUSES = (STATUS_DONE, STATUS_DUPLICATE, STATUS_FAILED)
+
+	batch = models.UUIDField(db_index=True)
+	original_filename = models.CharField(max_length=255)
+	staged_name = models.CharField(max_length=255)
+	content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+	status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+	error = models.TextField(blank=True)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	photo = models.ForeignKey(Photo, on_delete=models.SET_NULL, null=True, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['id']
+		indexes = [
+			models.Index(fields=['status', 'id']),
+		]
+
+	def __str__(self):
+		return f"{self.original_filename} ({self.status})"
+
+
+class PhotoMetadata(models.Model):
+	photo = models.OneToOneField(Photo, on_delete=models.CASCADE, related_name='metadata')
+	exif = models.JSONField(default=list, blank=True)
+	camera = models.CharField(max_length=120, blank=True)
+	lens = models.CharField(max_length=120, blank=True)
+	captured_at = models.DateTimeField(null=True, blank=True)
+	width = models.PositiveIntegerField(null=True, blank=True)
+	height = models.PositiveIntegerField(null=True, blank=True)
+
+	def __str__(self):
+		return f"{self.photo_id} metadata"
+
+
+def site_asset_upload_path(instance, filename):
+	return f"site/{get_current_db_alias()}/{filename}"
+
+
+class SiteAsset(models.Model):
+	"""about 페이지 작가 사진처럼 화면에 고정으로 쓰는 파일의 현재 버전을 기록합니다.
+
+	버전(내용 해시)은 파일을 올릴 때 한 번 계산하므로, 화면에서는 파일 시스템을 보지 않고 URL을 만듭니다.
+	"""
+	KEY_AUTHOR_PHOTO = 'author_photo'
+	KEY_CHOICES = [
+		(KEY_AUTHOR_PHOTO, '작가 사진'),
+	]
+
+	key = models.CharField(max_length=40, choices=KEY_CHOICES, unique=True)
+	file = models.ImageField(upload_to=site_asset_upload_path)
+	version = models.CharField(max_length=64, blank=True, editable=False)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['key']
+
+	@staticmethod
+	def _content_version(content):
+		digest = hashlib.sha256()
+		for chunk in content.chunks():
+			digest.update(chunk)
+		content.seek(0)
+		return digest.hexdigest()[:12]
+
+	def replace_file(self, filename, content):
+		self.version = self._content_version(content)
+		self.file.save(filename, content, save=False)
+		self.save()
+
+	def save(self, *args, **kwargs):
+		# 관리자 화면 업로드처럼 아직 저장되지 않은 파일이면 여기서 버전을 계산합니다.
+		if self.file and (not self.file._committed or not self.version):
+			self.version = self._content_version(self.file)
+			update_fields = kwargs.get('update_fields')
+			if update_fields:
+				kwargs['update_fields'] = {*update_fields, 'version'}
+		super().save(*args, **kwargs)
+
+	@property
+	def url(self):
+		return f"{self.file.url}?v={self.version}" if self.version else self.file.url
+
+	@classmethod
+	def url_for(cls, key, default=''):
+		row = cls.objects.filter(key=key).values_list('file', 'version').first()
+		if not row or not row[0]:
+			return default
+		file_name, version = row
+		url = cls._meta.get_field('file').storage.url(file_name)
+		return f"{url}?v={version}" if version else url
+
+	def __str__(self):
+		return self.get_key_display()
@@ -0,0 +1,158 @@
+import base64
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+try:
+	import pillow_avif  # noqa: F401  선택 설치(pillow-avif-plugin) 시 AVIF 저장 지원
+except ImportError:
+	pass
+
+# 렌디션 규격이 바뀌면 버전을 올리고 regenerate_renditions 명령으로 재생성합니다.
+RENDITION_VERSION = 2
+RENDITION_WIDTHS = (240, 480, 800)
+
+# 원본/렌디션 옆에 `<파일명>.webp`, `<파일명>.avif` 변환본을 함께 저장하고
+# 미디어 서빙에서 Accept 헤더에 따라 가장 작은 파일을 골라 보냅니다.
+VARIANT_EXTENSIONS = {'AVIF': 'avif', 'WEBP': 'webp'}
+VARIANT_SAVE_KWARGS = {
+	'AVIF': {'quality': 60},
+	'WEBP': {'quality': 80, 'method': 4},
+}
+Image.init()
+VARIANT_FORMATS = tuple(fmt for fmt in VARIANT_EXTENSIONS if fmt in Image.SAVE)
+
+# 템플릿이 <img>에 바로 넣는 크기/대표 색상/LQIP. 렌디션과 함께 갱신합니다.
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_FORMAT = 'WEBP' if 'WEBP' in Image.SAVE else 'JPEG'
+IMAGE_ATTRIBUTE_FIELDS = ['width', 'height', 'dominant_color', 'placeholder']
+RENDITION_FIELDS = ['renditions'] + IMAGE_ATTRIBUTE_FIELDS
+
+
+def rendition_name(image_name, width):
+	base_name, extension = os.path.splitext(image_name)
+	return f"{base_name}_w{width}{extension}"
+
+
+def _encode(image, image_format):
+	output = io.BytesIO()
+	if image_format in ['JPEG', 'JPG']:
+		if image.mode != 'RGB':
+			image = image.convert('RGB')
+		image.save(output, format='JPEG', quality=82, optimize=True, progressive=True)
+	else:
+		image.save(output, format=image_format, optimize=True)
+	return output.getvalue()
+
+
+def variant_name(image_name, image_format):
+	return f"{image_name}.{VARIANT_EXTENSIONS[image_format]}"
+
+
+def write_variants(image_name, image):
+	if image.mode not in ('RGB', 'RGBA'):
+		image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+	written = []
+	for image_format in VARIANT_FORMATS:
+		output = io.BytesIO()
+		image.save(output, format=image_format, **VARIANT_SAVE_KWARGS[image_format])
+		name = variant_name(image_name, image_format)
+		if default_storage.exists(name):
+			default_storage.delete(name)
+		default_storage.save(name, ContentFile(output.getvalue()))
+		written.append(VARIANT_EXTENSIONS[image_format])
+	return written
+
+
+def delete_variants(image_name):
+	for image_format in VARIANT_EXTENSIONS:
+		name = variant_name(image_name, image_format)
+		if default_storage.exists(name):
+			default_storage.delete(name)
+
+
+def delete_renditions(photo):
+	for name in (photo.renditions or {}).get('files', {}).values():
+		delete_variants(name)
+		if default_storage.exists(name):
+			default_storage.delete(name)
+	if photo.image:
+		delete_variants(photo.image.name)
+
+
+def image_attributes(image):
+	width, height = image.size
+	if image.format == 'JPEG':
+		# 아직 디코드 전이면 1/8 스케일로 읽어 백필 속도를 높입니다. 이미 로드된 이미지는 영향 없음.
+		image.draft('RGB', (PLACEHOLDER_WIDTH * 8, PLACEHOLDER_WIDTH * 8))
+	if image.mode not in ('RGB', 'RGBA', 'L'):
+		image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+	tiny_height = max(1, round(height * PLACEHOLDER_WIDTH / float(width)))
+	tiny = image.resize((PLACEHOLDER_WIDTH, tiny_height), Image.BOX).convert('RGB')
+
+	quantized = tiny.quantize(colors=4)
+	_, index = max(quantized.getcolors())
+	red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+
+	output = io.BytesIO()
+	tiny.save(output, format=PLACEHOLDER_FORMAT, quality=40)
+	encoded = base64.b64encode(output.getvalue()).decode('ascii')
+	return {
+		'width': width,
+		'height': height,
+		'dominant_color': f'#{red:02x}{green:02x}{blue:02x}',
+		'placeholder': f'data:image/{PLACEHOLDER_FORMAT.lower()};base64,{encoded}',
+	}
+
+
+def generate_renditions(photo, image=None):
+	if not photo.image:
+		return {}
+	if image is None:
+		with photo.image.open('rb') as source:
+			image = Image.open(source)
+			image.load()
+	else:
+		image.load()
+	image_format = (image.format or 'JPEG').upper()
+	src_width, src_height = image.size
+	for field, value in image_attributes(image).items():
+		setattr(photo, field, value)
+
+	delete_renditions(photo)
+	formats = write_variants(photo.image.name, image)
+	files = {}
+	for width in RENDITION_WIDTHS:
+		if width >= src_width:
+			continue
+		height = max(1, round(src_height * width / float(src_width)))
+		resized = image.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+		name = rendition_name(photo.image.name, width)
+		if default_storage.exists(name):
+			default_storage.delete(name)
+		files[str(width)] = default_storage.save(name, ContentFile(_encode(resized, image_format)))
+		write_variants(files[str(width)], resized)
+
+	photo.renditions = {
+		'version': RENDITION_VERSION,
+		'width': src_width,
+		'files': files,
+		'formats': formats,
+	}
+	return photo.renditions
+
+
+def build_srcset(photo):
+	renditions = photo.renditions or {}
+	if not photo.image or not renditions.get('files'):
+		return ''
+	candidates = [
+		(int(width), default_storage.url(name))
+		for width, name in renditions['files'].items()
+	]
+	candidates.append((renditions.get('width') or max(RENDITION_WIDTHS), photo.image.url))
+	candidates.sort()
+	return ', '.join(f"{url} {width}w" for width, url in candidates)
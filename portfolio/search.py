@@ -0,0 +1,129 @@
+import re
+import unicodedata
+
+from django.db import models
+
+from .models import Photo, PhotoSearchToken
+
+# 한글은 띄어쓰기/조사 때문에 단어 단위 색인이 잘 맞지 않아 글자 n-gram으로 색인합니다.
+# 각 단어의 한 글자(unigram)와 두 글자(bigram)를 모두 넣고,
+# 검색어는 두 글자 이상이면 bigram, 한 글자면 unigram으로 찾습니다.
+FIELD_WEIGHTS = {
+	'title': 3,
+	'tags': 2,
+	'description': 1,
+}
+WORD_RE = re.compile(r'\w+')
+SEARCH_PAGE_SIZE = 40
+
+
+def _words(text):
+	return WORD_RE.findall(unicodedata.normalize('NFC', text or '').lower())
+
+
+def tokenize(text):
+	tokens = set()
+	for word in _words(text):
+		tokens.update(word)
+		tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+	return tokens
+
+
+def query_tokens(query):
+	tokens = set()
+	for word in _words(query):
+		if len(word) == 1:
+			tokens.add(word)
+		else:
+			tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+	return tokens
+
+
+def photo_token_weights(photo, tag_names=None):
+	if tag_names is None:
+		tag_names = photo.tags.values_list('name', flat=True)
+	texts = {
+		'title': photo.title,
+		'tags': ' '.join(tag_names),
+		'description': photo.description,
+	}
+	weights = {}
+	for field, text in texts.items():
+		for token in tokenize(text):
+			weights[token] = weights.get(token, 0) + FIELD_WEIGHTS[field]
+	return weights
+
+
+def index_photo(photo, using=None, tag_names=None):
+	"""사진 한 장의 색인을 지우고 다시 만듭니다."""
+	tokens = PhotoSearchToken.objects.using(using)
+	tokens.filter(photo_id=photo.pk).delete()
+	tokens.bulk_create([
+		PhotoSearchToken(photo_id=photo.pk, token=token, weight=weight)
+		for token, weight in photo_token_weights(photo, tag_names).items()
+	])
+
+
+def index_photos(photo_ids, using=None, batch_size=500):
+	"""여러 사진의 색인을 한꺼번에 다시 만듭니다. 쿼리 수는 사진 수와 무관합니다."""
+	photo_ids = list(photo_ids)
+	if not photo_ids:
+		return
+	photos = Photo.objects.using(using).filter(id__in=photo_ids).only('id', 'title', 'description')
+	tokens = [
+		PhotoSearchToken(photo_id=photo.pk, token=token, weight=weight)
+		for photo in photos.prefetch_related('tags')
+		for token, weight in photo_token_weights(photo, [tag.name for tag in photo.tags.all()]).items()
+	]
+	PhotoSearchToken.objects.using(using).filter(photo_id__in=photo_ids).delete()
+	PhotoSearchToken.objects.using(using).bulk_create(tokens, batch_size=batch_size * 10)
+
+
+def rebuild_index(using=None, batch_size=500):
+	PhotoSearchToken.objects.using(using).all().delete()
+	photos = Photo.objects.using(using).only('id', 'title', 'description').order_by('id')
+	tokens = []
+	for photo in photos.prefetch_related('tags').iterator(chunk_size=batch_size):
+		tokens.extend(
+			PhotoSearchToken(photo_id=photo.pk, token=token, weight=weight)
+			for token, weight in photo_token_weights(photo, [tag.name for tag in photo.tags.all()]).items()
+		)
+		if len(tokens) >= batch_size * 10:
+			PhotoSearchToken.objects.using(using).bulk_create(tokens)
+			tokens = []
+	PhotoSearchToken.objects.using(using).bulk_create(tokens)
+
+
+def matching_photos(query, using=None):
+	"""검색어의 모든 토큰을 가진 사진별 (photo_id, score) 집계 쿼리셋."""
+	tokens = query_tokens(query)
+	return (
+		PhotoSearchToken.objects.using(using)
+		.filter(token__in=tokens)
+		.values('photo_id')
+		.annotate(matched=models.Count('token', distinct=True), score=models.Sum('weight'))
+		.filter(matched=len(tokens))
+	)
+
+
+def search_photo_ids(query, page=1, page_size=SEARCH_PAGE_SIZE, using=None):
+	"""점수순 사진 id 한 페이지를 돌려줍니다. (id 목록, 다음 페이지 여부)"""
+	if not query_tokens(query):
+		return [], False
+	offset = (page - 1) * page_size
+	rows = (
+		matching_photos(query, using=using)
+		.order_by('-score', '-photo_id')
+		.values_list('photo_id', flat=True)
+	)[offset:offset + page_size + 1]
+	photo_ids = list(rows)
+	return photo_ids[:page_size], len(photo_ids) > page_size
+
+
+def search_photos(query, page=1, page_size=SEARCH_PAGE_SIZE, using=None):
+	photo_ids, has_next = search_photo_ids(query, page, page_size, using=using)
+	photos = (
+		Photo.objects.using(using).select_related('season', 'zone').prefetch_related('tags')
+		.in_bulk(photo_ids)
+	)
+	return [photos[photo_id] for photo_id in photo_ids if photo_id in photos], has_next
@@ -0,0 +1,108 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .models import Photo, Season, SiteAsset, Tag, TimelineDay, Zone
+from .search import index_photo, index_photos
+from .taxonomy import invalidate_taxonomy
+
+
+@receiver(post_init, sender=Photo)
+def remember_timeline_day(sender, instance, **kwargs):
+	# only()/defer()로 빠진 필드는 읽지 않습니다(추가 쿼리 방지).
+	instance._timeline_day = instance.__dict__.get('effective_date')
+
+
+@receiver(post_save, sender=Photo)
+def update_timeline_on_save(sender, instance, created, using, **kwargs):
+	if created or instance._timeline_day != instance.effective_date:
+		TimelineDay.refresh({instance._timeline_day, instance.effective_date}, using=using)
+	instance._timeline_day = instance.effective_date
+
+
+@receiver(post_delete, sender=Photo)
+def update_timeline_on_delete(sender, instance, using, **kwargs):
+	TimelineDay.refresh({instance.__dict__.get('effective_date')}, using=using)
+
+
+def _changed_tag_ids(instance, reverse, pk_set):
+	if reverse:
+		return {instance.pk}
+	return set(pk_set or ())
+
+
+@receiver(m2m_changed, sender=Photo.tags.through)
+def update_tag_counts(sender, instance, action, reverse, pk_set, using, **kwargs):
+	if action == 'pre_clear':
+		instance._cleared_tag_ids = (
+			{instance.pk} if reverse else set(instance.tags.using(using).values_list('id', flat=True))
+		)
+	elif action == 'post_clear':
+		Tag.refresh_photo_counts(getattr(instance, '_cleared_tag_ids', ()), using=using)
+	elif action in ('post_add', 'post_remove'):
+		Tag.refresh_photo_counts(_changed_tag_ids(instance, reverse, pk_set), using=using)
+
+
+@receiver(pre_delete, sender=Photo)
+def remember_photo_tags(sender, instance, using, **kwargs):
+	# 사진을 지우면 through 행이 신호 없이 함께 지워지므로 미리 태그를 기억해 둡니다.
+	instance._deleted_tag_ids = set(instance.tags.using(using).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Photo)
+def update_tag_counts_on_delete(sender, instance, using, **kwargs):
+	Tag.refresh_photo_counts(getattr(instance, '_deleted_tag_ids', ()), using=using)
+
+
+@receiver(post_save, sender=Photo)
+def update_search_on_save(sender, instance, update_fields, using, **kwargs):
+	if update_fields is None or {'title', 'description'} & set(update_fields):
+		index_photo(instance, using=using)
+
+
+@receiver(m2m_changed, sender=Photo.tags.through)
+def update_search_on_tags(sender, instance, action, reverse, pk_set, using, **kwargs):
+	if not reverse:
+		if action in ('post_add', 'post_remove', 'post_clear'):
+			index_photo(instance, using=using)
+	elif action == 'pre_clear':
+		instance._cleared_photo_ids = set(instance.photo_set.using(using).values_list('id', flat=True))
+	elif action == 'post_clear':
+		index_photos(getattr(instance, '_cleared_photo_ids', ()), using=using)
+	elif action in ('post_add', 'post_remove'):
+		index_photos(pk_set or (), using=using)
+
+
+@receiver(post_save, sender=Tag)
+def update_search_on_tag_rename(sender, instance, created, update_fields, using, **kwargs):
+	if not created and (update_fields is None or 'name' in update_fields):
+		index_photos(instance.photo_set.using(using).values_list('id', flat=True), using=using)
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_photos(sender, instance, using, **kwargs):
+	instance._deleted_photo_ids = set(instance.photo_set.using(using).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def update_search_on_tag_delete(sender, instance, using, **kwargs):
+	index_photos(getattr(instance, '_deleted_photo_ids', ()), using=using)
+
+
+def invalidate_page_cache(sender, using, **kwargs):
+	bump_generation(using)
+
+
+for model in (Photo, Tag, Season, Zone, SiteAsset):
+	post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_save_{model.__name__}')
+	post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_delete_{model.__name__}')
+m2m_changed.connect(invalidate_page_cache, sender=Photo.tags.through, dispatch_uid='page_cache_photo_tags')
+
+
+def invalidate_taxonomy_cache(sender, using, **kwargs):
+	invalidate_taxonomy(using)
+
+
+for model in (Season, Zone, Tag):
+	post_save.connect(invalidate_taxonomy_cache, sender=model, dispatch_uid=f'taxonomy_save_{model.__name__}')
+	post_delete.connect(invalidate_taxonomy_cache, sender=model, dispatch_uid=f'taxonomy_delete_{model.__name__}')
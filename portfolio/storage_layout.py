@@ -0,0 +1,91 @@
+import os
+import re
+import shutil
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from config.db_routing import get_current_db_alias
+
+from .renditions import VARIANT_EXTENSIONS, rendition_name, variant_name
+
+# PHOTO_STORAGE_LAYOUT=hashed 이면 저장 경로에 저장본의 SHA-256을 넣습니다.
+# 바이트가 바뀌면 URL도 바뀌므로 /media/는 저장본(<hash>.<ext>)만 1년 immutable 캐시로 응답합니다.
+# 렌디션(_w240)과 변환본(.webp/.avif) 이름은 저장본 해시에서 나오므로 재생성되면 같은 URL의 바이트가 바뀝니다.
+# 이들은 MEDIA_CACHE_MAX_AGE로 응답합니다.
+LAYOUT_DATED = 'dated'
+LAYOUT_HASHED = 'hashed'
+CONTENT_PATH_RE = re.compile(r'^photos/[^/]+/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$')
+
+
+def hashed_layout_enabled():
+	return settings.PHOTO_STORAGE_LAYOUT == LAYOUT_HASHED
+
+
+def content_addressed_name(alias, content_hash, filename):
+	_, extension = os.path.splitext(filename)
+	return f"photos/{alias}/{content_hash[:2]}/{content_hash}{extension.lower()}"
+
+
+def is_content_addressed(name):
+	return bool(CONTENT_PATH_RE.match(name))
+
+
+def photo_alias(name):
+	parts = name.split('/')
+	if len(parts) > 2 and parts[0] == 'photos':
+		return parts[1]
+	return get_current_db_alias()
+
+
+def _link(old_name, new_name):
+	old_path = default_storage.path(old_name)
+	new_path = default_storage.path(new_name)
+	if os.path.exists(new_path):
+		if os.path.samefile(old_path, new_path):
+			return
+		raise FileExistsError(new_name)
+	os.makedirs(os.path.dirname(new_path), exist_ok=True)
+	try:
+		os.link(old_path, new_path)
+	except OSError:
+		# 하드링크를 지원하지 않는 공유 폴더 등
+		shutil.copy2(old_path, new_path)
+
+
+def relocate_photo(photo, content_hash):
+	"""저장본과 렌디션/변환본을 내용 해시 경로에 연결하고 photo의 파일 이름을 바꿉니다.
+
+	이전 파일은 지우지 않고 목록으로 돌려주므로, DB 저장이 끝난 뒤 delete_relocated()로 정리합니다.
+	"""
+	old_name = photo.image.name
+	new_name = content_addressed_name(photo_alias(old_name), content_hash, old_name)
+	if old_name == new_name:
+		return []
+	if not default_storage.exists(old_name):
+		raise FileNotFoundError(old_name)
+
+	moves = [(old_name, new_name)]
+	renditions = dict(photo.renditions or {})
+	files = {}
+	for width, name in renditions.get('files', {}).items():
+		files[width] = rendition_name(new_name, int(width))
+		moves.append((name, files[width]))
+	for source, target in list(moves):
+		for image_format in VARIANT_EXTENSIONS:
+			moves.append((variant_name(source, image_format), variant_name(target, image_format)))
+
+	for source, target in moves:
+		if default_storage.exists(source):
+			_link(source, target)
+	if files:
+		renditions['files'] = files
+		photo.renditions = renditions
+	photo.image.name = new_name
+	return [source for source, _ in moves]
+
+
+def delete_relocated(names):
+	for name in names:
+		if default_storage.exists(name):
+			default_storage.delete(name)
@@ -0,0 +1,115 @@
+from operator import attrgetter
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from config.db_routing import get_current_db_alias
+
+from .cache import bump_generation, get_generation
+from .hangul import get_initial
+from .models import Season, Tag, Zone
+
+# Season/Zone/Tag 이름 → 객체, id → 객체 표를 프로세스 안에 DB 별칭별로 둡니다.
+# 표는 'taxonomy' 세대 번호(파일 캐시, 모든 프로세스 공유)가 바뀌면 다시 읽습니다.
+# signals.py가 세 모델의 저장/삭제 때 세대를 올리고, 신호가 없는 bulk_create는 직접 올립니다.
+TAXONOMY_MODELS = (Season, Zone, Tag)
+_taxonomies = {}
+
+
+class TagResolveError(ValueError):
+	pass
+
+
+class Taxonomy:
+	def __init__(self, alias, version):
+		self.alias = alias
+		self.version = version
+		self._maps = {}
+
+	def _load(self, model):
+		if model not in self._maps:
+			objects = model.objects.using(self.alias).order_by('id')
+			if model is Tag:
+				objects = objects.only('id', 'name', 'slug')
+			by_id = {}
+			by_name = {}
+			by_key = {}
+			for obj in objects:
+				by_id[obj.id] = obj
+				# 이름이 겹치면 먼저 만든 것(id가 작은 것)을 씁니다.
+				by_name.setdefault(obj.name, obj)
+				if getattr(obj, 'key', None):
+					by_key[obj.key] = obj
+			self._maps[model] = (by_id, by_name, by_key)
+		return self._maps[model]
+
+	def get(self, model, pk):
+		return self._load(model)[0].get(pk)
+
+	def named(self, model, name):
+		return self._load(model)[1].get(name)
+
+	def keyed(self, model, key):
+		return self._load(model)[2].get(key)
+
+	def ordered(self, model, *fields):
+		return sorted(self._load(model)[0].values(), key=attrgetter(*fields))
+
+
+def get_taxonomy(alias=None):
+	alias = alias or get_current_db_alias()
+	version = get_generation(alias, name='taxonomy')
+	taxonomy = _taxonomies.get(alias)
+	if taxonomy is None or taxonomy.version != version:
+		taxonomy = Taxonomy(alias, version)
+		_taxonomies[alias] = taxonomy
+	return taxonomy
+
+
+def invalidate_taxonomy(alias=None):
+	alias = alias or get_current_db_alias()
+	_taxonomies.pop(alias, None)
+	# 다른 프로세스는 커밋된 뒤에 다시 읽어야 새 행을 봅니다.
+	transaction.on_commit(lambda: bump_generation(alias, name='taxonomy'), using=alias)
+
+
+def resolve_named(model, name):
+	"""이름이 같은 계절/구역을 찾고, 없으면 만듭니다."""
+	instance = get_taxonomy().named(model, name)
+	if not instance:
+		instance = model.objects.create(name=name, slug=slugify(name, allow_unicode=True))
+	return instance
+
+
+def resolve_season(key):
+	"""Season.key(spring 등)로 계절을 찾고, 없으면 기본 이름으로 만듭니다."""
+	season = get_taxonomy().keyed(Season, key)
+	if not season:
+		season = Season.objects.create(key=key, name=dict(Season.KEY_CHOICES)[key], slug=key)
+	return season
+
+
+def resolve_tags(names):
+	"""태그 이름 목록을 Tag로 바꿉니다. 없는 태그만 한 번에 만듭니다."""
+	names = list(dict.fromkeys(names))
+	taxonomy = get_taxonomy()
+	missing = [name for name in names if not taxonomy.named(Tag, name)]
+	if missing:
+		# bulk_create는 save()를 거치지 않으므로 초성을 직접 채웁니다.
+		# 사진에 연결되기 전까지는 고아로 표시해 두어, 연결되지 못한 태그도 collect_orphan_tags가 지웁니다.
+		now = timezone.now()
+		Tag.objects.bulk_create(
+			[
+				Tag(name=name, slug=slugify(name, allow_unicode=True), initial=get_initial(name), orphaned_at=now)
+				for name in missing
+			],
+			ignore_conflicts=True,
+		)
+		invalidate_taxonomy()
+		taxonomy = get_taxonomy()
+	unresolved = [name for name in names if not taxonomy.named(Tag, name)]
+	if unresolved:
+		# 다른 태그와 slug가 겹치는 경우
+		raise TagResolveError(', '.join(unresolved))
+	return [taxonomy.named(Tag, name) for name in names]
@@ -0,0 +1,29 @@
+from django import template
+from django.utils.html import format_html
+
+from portfolio.renditions import build_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def photo_srcset(photo, sizes='100vw'):
+	srcset = build_srcset(photo)
+	if not srcset:
+		return ''
+	return format_html('srcset="{}" sizes="{}"', srcset, sizes)
+
+
+@register.simple_tag
+def photo_placeholder(photo):
+	# 크기를 알면 이미지가 도착하기 전에 자리를 잡고, 그동안 LQIP/대표 색상을 배경으로 보여줍니다.
+	if not photo.width or not photo.height:
+		return ''
+	style = ''
+	if photo.dominant_color:
+		style += f'background-color:{photo.dominant_color};'
+	if photo.placeholder:
+		style += f'background-image:url({photo.placeholder});background-size:cover;background-position:center;'
+	if not style:
+		return format_html('width="{}" height="{}"', photo.width, photo.height)
+	return format_html('width="{}" height="{}" style="{}"', photo.width, photo.height, style)
@@ -1,3 +1,1206 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from config.db_pool import ConnectionPool, PoolTimeout
+from config.db_routing import use_db_alias
+
+from . import taxonomy
+from .bulk_edit import apply_bulk_edit
+from .management.commands.process_upload_queue import Command as ProcessUploadQueueCommand
+from .models import Photo, Season, Tag, TimelineDay, UploadJob, Zone
+from .renditions import RENDITION_VERSION, build_srcset, generate_renditions
+from .search import search_photo_ids
+from .storage_layout import is_content_addressed
+from .timeline import TIMELINE_ORDERING, timeline_page
+from .uploads import (
+	PROCESSING_VERSION,
+	DecodeBudget,
+	ImageTooLarge,
+	batch_status,
+	claim_job,
+	file_sha256,
+	process_upload_job,
+	queue_uploads,
+	resize_upload,
+	stage_upload,
+	staging_path,
+)
+from .views import DEFAULT_AUTHOR_PHOTO_URL
+
+NAS_HOST = 'jakesto.synology.me'
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def image_bytes(size=(1000, 600), image_format='JPEG', color=(110, 150, 90), **save_kwargs):
+	output = io.BytesIO()
+	Image.new('RGB', size, color).save(output, format=image_format, **save_kwargs)
+	return output.getvalue()
+
+
+class MediaTestCase(TestCase):
+	"""임시 MEDIA_ROOT와 locmem 캐시를 쓰고, 실제 이미지 파일이 있는 사진을 nas DB에 만듭니다."""
+
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		media_root = tempfile.mkdtemp(prefix='portfolio-test-')
+		self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+		settings_override = override_settings(
+			MEDIA_ROOT=media_root,
+			UPLOAD_STAGING_ROOT=os.path.join(media_root, 'staging'),
+			CACHES=LOCMEM_CACHES,
+		)
+		settings_override.enable()
+		self.addCleanup(settings_override.disable)
+		cache.clear()
+		taxonomy._taxonomies.clear()
+
+	def create_photo(self, title='사진', size=(1000, 600), renditions=False, **fields):
+		with use_db_alias('nas'):
+			content = image_bytes(size)
+			# 업로드 워커처럼 저장본 해시를 먼저 채웁니다(hashed 레이아웃의 파일 이름).
+			photo = Photo(title=title, processed_hash=hashlib.sha256(content).hexdigest(), **fields)
+			photo.image.save(f'{title}.jpg', ContentFile(content), save=False)
+			if renditions:
+				generate_renditions(photo)
+			photo.save()
+		return photo
+
+	def queue(self, *files):
+		with use_db_alias('nas'):
+			jobs, duplicate_names = queue_uploads(
+				[SimpleUploadedFile(name, content) for name, content in files], uuid.uuid4()
+			)
+		return jobs, duplicate_names
+
+	def process(self, job):
+		with use_db_alias('nas'):
+			self.assertTrue(claim_job(job.id))
+			return process_upload_job(UploadJob.objects.get(id=job.id))
+
+	def upload(self, name, content):
+		(job,), _ = self.queue((name, content))
+		return self.process(job)
+
+
+class RenditionTests(MediaTestCase):
+	def test_generates_only_widths_smaller_than_the_stored_file(self):
+		photo = self.create_photo('정원', size=(600, 400), renditions=True)
+		self.assertEqual(photo.renditions['version'], RENDITION_VERSION)
+		self.assertEqual(photo.renditions['width'], 600)
+		self.assertEqual(sorted(photo.renditions['files']), ['240', '480'])
+		for width, name in photo.renditions['files'].items():
+			with default_storage.open(name) as rendition:
+				self.assertEqual(Image.open(rendition).size[0], int(width))
+
+	def test_srcset_lists_renditions_and_the_stored_file_by_width(self):
+		photo = self.create_photo('정원', size=(1000, 600), renditions=True)
+		widths = [int(candidate.rsplit(' ', 1)[1][:-1]) for candidate in build_srcset(photo).split(', ')]
+		self.assertEqual(widths, [240, 480, 800, 1000])
+
+	def test_gallery_template_renders_srcset(self):
+		photo = self.create_photo('정원', renditions=True)
+		response = self.client.get('/', HTTP_HOST=NAS_HOST)
+		self.assertContains(response, default_storage.url(photo.renditions['files']['240']) + ' 240w')
+
+	def test_photo_without_renditions_has_no_srcset(self):
+		self.assertEqual(build_srcset(self.create_photo('정원')), '')
+
+
+
+class VariantNegotiationTests(MediaTestCase):
+	def get_media(self, name, accept='', **extra):
+		return self.client.get(f'/media/{name}', HTTP_ACCEPT=accept, HTTP_HOST=NAS_HOST, **extra)
+
+	def test_webp_variant_is_written_and_served_when_accepted(self):
+		photo = self.create_photo('정원', renditions=True)
+		self.assertIn('webp', photo.renditions['formats'])
+		self.assertTrue(default_storage.exists(f'{photo.image.name}.webp'))
+
+		response = self.get_media(photo.image.name, accept='image/avif,image/webp,*/*')
+		self.assertEqual(response['Content-Type'], 'image/webp')
+		self.assertIn('Accept', response['Vary'])
+		response = self.get_media(photo.image.name, accept='image/*;q=0.8, image/webp;q=0')
+		self.assertEqual(response['Content-Type'], 'image/jpeg')
+		self.assertIn('Accept', response['Vary'])
+
+	def test_original_is_served_when_the_variant_is_not_smaller(self):
+		photo = self.create_photo('정원')
+		default_storage.save(f'{photo.image.name}.webp', ContentFile(b'x' * (photo.image.size + 1)))
+		response = self.get_media(photo.image.name, accept='image/webp')
+		self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+	def test_renditions_get_their_own_variants(self):
+		photo = self.create_photo('정원', renditions=True)
+		rendition = photo.renditions['files']['240']
+		response = self.get_media(rendition, accept='image/webp')
+		self.assertEqual(response['Content-Type'], 'image/webp')
+		self.assertEqual(Image.open(io.BytesIO(b''.join(response.streaming_content))).size[0], 240)
+
+
+class PhotoMetadataTests(MediaTestCase):
+	def exif_image(self):
+		exif = Image.Exif()
+		exif[0x010F] = 'Canon'
+		exif[0x0110] = 'Canon EOS R5'
+		exif[0x8769] = {0x9003: '2024:05:01 10:20:30', 0xA434: 'RF24-105mm F4'}
+		return image_bytes((1200, 800), exif=exif.tobytes())
+
+	def test_upload_stores_exif_and_fills_taken_at(self):
+		job = self.upload('장미.jpg', self.exif_image())
+		metadata = job.photo.metadata
+		self.assertEqual((metadata.camera, metadata.lens), ('Canon EOS R5', 'RF24-105mm F4'))
+		self.assertEqual((metadata.width, metadata.height), (1200, 800))
+		self.assertEqual(str(job.photo.taken_at), '2024-05-01')
+		self.assertIn(['Model', 'Canon EOS R5'], metadata.exif)
+
+	def test_edit_page_reads_exif_from_the_database(self):
+		job = self.upload('장미.jpg', self.exif_image())
+		# 파일이 없어도 저장된 메타데이터로 EXIF를 보여줍니다.
+		os.remove(job.photo.image.path)
+		response = self.client.get(f'/archive/edit/{job.photo.id}/', HTTP_HOST=NAS_HOST)
+		self.assertIn(('Model', 'Canon EOS R5'), [tuple(entry) for entry in response.context['exif_entries']])
+
+	def test_backfill_reads_stored_files_once(self):
+		photo = self.create_photo('정원')
+		with use_db_alias('nas'):
+			call_command('backfill_photo_metadata', stdout=io.StringIO())
+			self.assertEqual(Photo.objects.get(id=photo.id).metadata.width, 1000)
+			output = io.StringIO()
+			call_command('backfill_photo_metadata', stdout=output)
+		self.assertIn('Metadata saved for 0 photos', output.getvalue())
+
+
+class DuplicateUploadTests(MediaTestCase):
+	def test_same_bytes_under_another_name_are_a_duplicate(self):
+		content = image_bytes()
+		self.upload('장미.jpg', content)
+		jobs, duplicate_names = self.queue(('장미-복사본.jpg', content), ('수국.jpg', image_bytes(color=(1, 2, 3))))
+		self.assertEqual(duplicate_names, ['장미-복사본.jpg'])
+		self.assertEqual([job.original_filename for job in jobs], ['수국.jpg'])
+
+	def test_same_name_and_repeats_within_a_batch_are_duplicates(self):
+		self.upload('장미.jpg', image_bytes())
+		content = image_bytes(color=(1, 2, 3))
+		jobs, duplicate_names = self.queue(
+			('수국.jpg', content), ('수국2.jpg', content), ('장미.jpg', image_bytes(color=(4, 5, 6)))
+		)
+		self.assertEqual([job.original_filename for job in jobs], ['수국.jpg'])
+		self.assertEqual(duplicate_names, ['수국2.jpg', '장미.jpg'])
+
+	def test_concurrent_duplicate_is_settled_by_the_unique_index(self):
+		content = image_bytes()
+		first = self.upload('장미.jpg', content)
+		with use_db_alias('nas'):
+			# 사전 검사를 지나친 같은 내용의 작업(다른 워커가 동시에 처리한 경우)
+			second = stage_upload(SimpleUploadedFile('장미2.jpg', content), first.batch)
+			second.save()
+		with mock.patch('portfolio.uploads._is_duplicate', return_value=False):
+			second = self.process(second)
+		self.assertEqual(second.status, UploadJob.STATUS_DUPLICATE)
+		self.assertEqual(Photo.objects.using('nas').get().id, first.photo.id)
+		stored = [name for _, _, names in os.walk(default_storage.path('photos')) for name in names]
+		self.assertNotIn('장미2.jpg', stored)
+
+	def test_backfill_fills_processed_hash_but_not_content_hash(self):
+		photo = self.create_photo('정원')
+		with use_db_alias('nas'):
+			call_command('backfill_content_hashes', stdout=io.StringIO())
+		photo.refresh_from_db()
+		self.assertEqual(photo.processed_hash, file_sha256(photo.image.path))
+		self.assertIsNone(photo.content_hash)
+
+
+class ImagePlaceholderTests(MediaTestCase):
+	def test_renditions_store_size_dominant_colour_and_lqip(self):
+		photo = self.create_photo('정원', size=(1000, 600), renditions=True)
+		self.assertEqual((photo.width, photo.height), (1000, 600))
+		# JPEG 손실을 감안해 만든 색(110, 150, 90)에 가까운지 봅니다.
+		red, green, blue = (int(photo.dominant_color[i:i + 2], 16) for i in (1, 3, 5))
+		self.assertLess(abs(red - 110) + abs(green - 150) + abs(blue - 90), 12)
+		self.assertTrue(photo.placeholder.startswith('data:image/'))
+
+	def test_gallery_reserves_space_and_shares_one_viewer_placeholder_script(self):
+		photo = self.create_photo('정원', renditions=True)
+		response = self.client.get('/', HTTP_HOST=NAS_HOST)
+		self.assertContains(response, f'width="1000" height="600" style="background-color:{photo.dominant_color};')
+		self.assertContains(response, photo.placeholder)
+		self.assertContains(response, 'const showViewerPlaceholder = ', count=1)
+
+	def test_backfill_fills_attributes_of_existing_photos(self):
+		photo = self.create_photo('정원', size=(640, 480))
+		self.assertIsNone(photo.width)
+		with use_db_alias('nas'):
+			call_command('backfill_image_attributes', workers=1, stdout=io.StringIO())
+		photo.refresh_from_db()
+		self.assertEqual((photo.width, photo.height), (640, 480))
+		self.assertTrue(photo.placeholder)
+
+
+class MediaServingTests(MediaTestCase):
+	def setUp(self):
+		super().setUp()
+		self.name = default_storage.save('photos/nas/2024/05/bytes.bin', ContentFile(bytes(range(256)) * 4))
+
+	def get(self, **headers):
+		return self.client.get(f'/media/{self.name}', HTTP_HOST=NAS_HOST, **headers)
+
+	def body(self, response):
+		return b''.join(response.streaming_content)
+
+	def test_full_response_has_validators_and_accepts_ranges(self):
+		response = self.get()
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(self.body(response)), 1024)
+		self.assertEqual(response['Accept-Ranges'], 'bytes')
+		self.assertTrue(response['ETag'].startswith('"'))
+		self.assertIn('Last-Modified', response)
+
+	def test_matching_etag_answers_304(self):
+		etag = self.get()['ETag']
+		response = self.get(HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(response.status_code, 304)
+		self.assertEqual(response['ETag'], etag)
+
+	def test_byte_ranges_answer_206(self):
+		for header, expected, content_range in (
+			('bytes=0-9', bytes(range(10)), 'bytes 0-9/1024'),
+			('bytes=1020-', bytes(range(252, 256)), 'bytes 1020-1023/1024'),
+			('bytes=-2', bytes((254, 255)), 'bytes 1022-1023/1024'),
+			('bytes=1000-5000', bytes(range(232, 256)), 'bytes 1000-1023/1024'),
+		):
+			with self.subTest(range=header):
+				response = self.get(HTTP_RANGE=header)
+				self.assertEqual(response.status_code, 206)
+				self.assertEqual(response['Content-Range'], content_range)
+				self.assertEqual(self.body(response), expected)
+
+	def test_unsatisfiable_range_answers_416(self):
+		for header in ('bytes=1024-', 'bytes=-0', 'bytes=9-3'):
+			with self.subTest(range=header):
+				response = self.get(HTTP_RANGE=header)
+				self.assertEqual(response.status_code, 416)
+				self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+	def test_stale_if_range_sends_the_whole_file(self):
+		response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(self.body(response)), 1024)
+
+	def test_missing_file_and_traversal_are_404(self):
+		self.assertEqual(self.client.get('/media/photos/nas/none.jpg', HTTP_HOST=NAS_HOST).status_code, 404)
+		self.assertEqual(self.client.get('/media/../manage.py', HTTP_HOST=NAS_HOST).status_code, 404)
+
+	@override_settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+	def test_accel_redirect_hands_the_file_to_the_proxy(self):
+		response = self.get(HTTP_RANGE='bytes=0-9')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+		self.assertEqual(response.content, b'')
+
+
+class UploadQueueTests(MediaTestCase):
+	def test_job_moves_from_pending_to_done_and_creates_the_photo(self):
+		(job,), _ = self.queue(('장미.jpg', image_bytes((1200, 800))))
+		self.assertEqual(job.status, UploadJob.STATUS_PENDING)
+		with use_db_alias('nas'):
+			self.assertTrue(claim_job(job.id))
+			self.assertFalse(claim_job(job.id))
+			self.assertEqual(UploadJob.objects.get(id=job.id).status, UploadJob.STATUS_PROCESSING)
+			job = process_upload_job(UploadJob.objects.get(id=job.id))
+		self.assertEqual(job.status, UploadJob.STATUS_DONE)
+		self.assertEqual(job.photo.title, '장미')
+		self.assertEqual(job.photo.image.width, 800)
+		self.assertFalse(os.path.exists(staging_path(job.staged_name)))
+		with use_db_alias('nas'):
+			status = batch_status(job.batch)
+		self.assertTrue(status['finished'])
+		self.assertEqual(status['counts'][UploadJob.STATUS_DONE], 1)
+
+	def test_undecodable_file_fails_and_keeps_the_staged_file(self):
+		(job,), _ = self.queue(('깨진.jpg', b'not an image'))
+		job = self.process(job)
+		self.assertEqual(job.status, UploadJob.STATUS_FAILED)
+		self.assertTrue(job.error)
+		self.assertTrue(os.path.exists(staging_path(job.staged_name)))
+		self.assertFalse(Photo.objects.using('nas').exists())
+
+	def test_unexpected_error_marks_only_that_job_failed(self):
+		(job,), _ = self.queue(('장미.jpg', image_bytes()))
+		with use_db_alias('nas'):
+			claim_job(job.id)
+		command = ProcessUploadQueueCommand()
+		# 테스트 트랜잭션 안에서는 연결을 닫지 않습니다.
+		with mock.patch(
+			'portfolio.management.commands.process_upload_queue.process_upload_job', side_effect=KeyError('exif')
+		), mock.patch('portfolio.management.commands.process_upload_queue.close_old_connections'):
+			with self.assertLogs('portfolio.management.commands.process_upload_queue', 'ERROR'):
+				filename, status, error = command._run_job('nas', job.id)
+		self.assertEqual((filename, status), ('장미.jpg', UploadJob.STATUS_FAILED))
+		job = UploadJob.objects.using('nas').get(id=job.id)
+		self.assertEqual(job.status, UploadJob.STATUS_FAILED)
+		self.assertEqual(job.error, error)
+		self.assertIn('KeyError', error)
+
+	def test_database_error_after_saving_files_removes_them(self):
+		(job,), _ = self.queue(('장미.jpg', image_bytes((1200, 800))))
+		with use_db_alias('nas'):
+			claim_job(job.id)
+			job = UploadJob.objects.get(id=job.id)
+		with mock.patch('portfolio.uploads.PhotoMetadata.objects.create', side_effect=DatabaseError('gone')):
+			with use_db_alias('nas'), self.assertRaises(DatabaseError):
+				process_upload_job(job)
+		self.assertFalse(Photo.objects.using('nas').exists())
+		stored = [name for _, _, names in os.walk(default_storage.path('photos')) for name in names]
+		self.assertEqual(stored, [])
+
+	def test_status_endpoint_reports_batch_progress(self):
+		(job,), _ = self.queue(('장미.jpg', image_bytes()))
+		with use_db_alias('nas'):
+			User.objects.create_user('editor', password='pw')
+		self.client.login(username='editor', password='pw')
+		response = self.client.get(f'/api/uploads/{job.batch}/status/', HTTP_HOST=NAS_HOST)
+		self.assertEqual(response.json()['counts'][UploadJob.STATUS_PENDING], 1)
+		self.assertFalse(response.json()['finished'])
+
+
+class ResizeUploadTests(TestCase):
+	def resize(self, content, name='사진.jpg', **kwargs):
+		resized, stored_name = resize_upload(File(io.BytesIO(content), name=name), **kwargs)
+		return Image.open(resized), stored_name
+
+	def test_wide_jpeg_is_resized_to_the_max_width_keeping_exif(self):
+		exif = Image.Exif()
+		exif[0x0110] = 'TestCam'
+		image, stored_name = self.resize(image_bytes((3200, 2400), exif=exif.tobytes()))
+		self.assertEqual(image.size, (800, 600))
+		self.assertEqual(image.getexif()[0x0110], 'TestCam')
+		self.assertEqual(stored_name, '사진.jpg')
+
+	@override_settings(IMAGE_MAX_DECODE_PIXELS=1_000_000)
+	def test_jpeg_is_decoded_near_the_target_size(self):
+		# 3200x2400(768만 화소)도 1/4 DCT 스케일(800x600)로 디코드하므로 한도 안입니다.
+		image, _ = self.resize(image_bytes((3200, 2400)))
+		self.assertEqual(image.size, (800, 600))
+		with self.assertRaises(ImageTooLarge):
+			self.resize(image_bytes((3200, 2400)), fast=False)
+
+	@override_settings(IMAGE_MAX_DECODE_PIXELS=1_000_000)
+	def test_non_jpeg_over_the_pixel_limit_is_rejected(self):
+		with self.assertRaises(ImageTooLarge):
+			self.resize(image_bytes((1200, 1000), image_format='PNG'), name='사진.png')
+
+	def test_decode_budget_waits_until_memory_is_released(self):
+		budget = DecodeBudget(100)
+		entered = threading.Event()
+
+		def second_decode():
+			with budget.reserve(60):
+				entered.set()
+
+		with budget.reserve(60):
+			worker = threading.Thread(target=second_decode)
+			worker.start()
+			self.assertFalse(entered.wait(0.2))
+		worker.join(5)
+		self.assertTrue(entered.is_set())
+		# 한도보다 큰 이미지 하나는 다른 디코드가 없으면 단독으로 처리합니다.
+		with budget.reserve(500):
+			self.assertEqual(budget.in_use, 500)
+		self.assertEqual(budget.in_use, 0)
+
+
+class ReprocessPhotosTests(MediaTestCase):
+	def reprocess(self, **options):
+		out = io.StringIO()
+		checkpoint = os.path.join(default_storage.location, 'reprocess.checkpoint.json')
+		with use_db_alias('nas'):
+			call_command('reprocess_photos', checkpoint=checkpoint, stdout=out, **options)
+		return out.getvalue()
+
+	def test_resizes_wide_files_marks_small_ones_and_skips_on_rerun(self):
+		wide = self.create_photo('넓은', size=(1600, 900))
+		small = self.create_photo('작은', size=(600, 400))
+		small_hash = file_sha256(small.image.path)
+
+		self.assertIn('Reprocessed 1 photos. Marked 1, skipped 0', self.reprocess())
+		wide.refresh_from_db()
+		small.refresh_from_db()
+		with Image.open(wide.image.path) as image:
+			self.assertEqual(image.size, (800, 450))
+		self.assertEqual(wide.processed_hash, file_sha256(wide.image.path))
+		# 이미 규격 안인 파일은 다시 인코딩하지 않습니다.
+		self.assertEqual(file_sha256(small.image.path), small_hash)
+		self.assertEqual((small.processed_version, small.processed_hash), (PROCESSING_VERSION, small_hash))
+
+		self.assertIn('Reprocessed 0 photos. Marked 0, skipped 2', self.reprocess())
+
+	def test_undecodable_file_is_reported_and_the_run_continues(self):
+		broken = self.create_photo('깨진')
+		with open(broken.image.path, 'wb') as image:
+			image.write(b'not an image')
+		wide = self.create_photo('넓은', size=(1600, 900))
+
+		output = self.reprocess()
+		self.assertIn(f'[ERROR] photo_id={broken.id}', output)
+		self.assertIn('Reprocessed 1 photos', output)
+		wide.refresh_from_db()
+		self.assertEqual(wide.processed_version, PROCESSING_VERSION)
+
+
+@override_settings(PHOTO_STORAGE_LAYOUT='hashed')
+class ContentAddressedStorageTests(MediaTestCase):
+	def get_media(self, name, accept=''):
+		return self.client.get(f'/media/{name}', HTTP_ACCEPT=accept, HTTP_HOST=NAS_HOST)
+
+	def reprocess(self):
+		checkpoint = os.path.join(default_storage.location, 'reprocess.checkpoint.json')
+		with use_db_alias('nas'):
+			call_command('reprocess_photos', checkpoint=checkpoint, stdout=io.StringIO())
+
+	def assert_content_addressed(self, photo):
+		self.assertTrue(is_content_addressed(photo.image.name), photo.image.name)
+		self.assertIn(file_sha256(photo.image.path), photo.image.name)
+
+	def test_only_the_stored_original_is_immutable(self):
+		job = self.upload('장미.jpg', image_bytes((1200, 800)))
+		photo = job.photo
+		self.assert_content_addressed(photo)
+		self.assertIn('immutable', self.get_media(photo.image.name)['Cache-Control'])
+		for response in (
+			self.get_media(photo.renditions['files']['240']),
+			self.get_media(f'{photo.image.name}.webp'),
+			# 같은 URL이라도 변환본을 보내면 immutable이 아닙니다.
+			self.get_media(photo.image.name, accept='image/webp'),
+		):
+			self.assertEqual(response['Cache-Control'], 'public, max-age=86400')
+
+	def test_reprocess_moves_new_bytes_to_a_new_hashed_path(self):
+		photo = self.create_photo('넓은', size=(1600, 900), renditions=True)
+		old_name, old_rendition = photo.image.name, photo.renditions['files']['240']
+		self.assert_content_addressed(photo)
+
+		self.reprocess()
+		photo.refresh_from_db()
+		self.assertNotEqual(photo.image.name, old_name)
+		self.assert_content_addressed(photo)
+		self.assertEqual(photo.width, 800)
+		self.assertTrue(default_storage.exists(photo.renditions['files']['240']))
+		for name in (old_name, f'{old_name}.webp', old_rendition):
+			self.assertFalse(default_storage.exists(name), name)
+
+	def test_interrupted_reprocess_never_changes_a_hashed_file(self):
+		photo = self.create_photo('넓은', size=(1600, 900))
+		old_name, old_hash = photo.image.name, file_sha256(photo.image.path)
+
+		with mock.patch('portfolio.models.PhotoQuerySet.bulk_update', side_effect=DatabaseError('gone')):
+			with self.assertRaises(DatabaseError):
+				self.reprocess()
+		photo.refresh_from_db()
+		self.assertEqual(photo.image.name, old_name)
+		self.assertEqual(file_sha256(photo.image.path), old_hash)
+
+		# 다시 실행하면 이미 놓인 새 해시 파일을 그대로 쓰고 행을 옮깁니다.
+		self.reprocess()
+		photo.refresh_from_db()
+		self.assert_content_addressed(photo)
+		self.assertEqual(photo.width, 800)
+		self.assertFalse(default_storage.exists(old_name))
+		leftovers = [name for _, _, names in os.walk(default_storage.location) for name in names if name.endswith('.tmp')]
+		self.assertEqual(leftovers, [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ZonesPageQueryTests(TestCase):
+	"""나라별 정원 페이지는 구역 수와 상관없이 같은 수의 쿼리로 그립니다(구역별 COUNT/조회 회귀 방지)."""
+
+	databases = {'default', 'nas'}
+	# 조건부 GET 기준값(사진 + 계절/구역/태그 최종 수정 시각) 4, 구역별 사진 수 GROUP BY 1,
+	# 구역 목록(분류 캐시 적재) 1, 선택한 구역(또는 미등록) 사진 1
+	ZONES_PAGE_QUERIES = 7
+
+	def setUp(self):
+		self.zone_number = 0
+		with use_db_alias('nas'):
+			self.unregistered = Photo.objects.create(title='미등록', image='photos/nas/unregistered.jpg')
+
+	def add_zones(self, count, photos_per_zone=2):
+		zones = []
+		with use_db_alias('nas'):
+			for _ in range(count):
+				self.zone_number += 1
+				zone = Zone.objects.create(
+					name=f'구역{self.zone_number}', slug=f'zone-{self.zone_number}', order=self.zone_number
+				)
+				for index in range(photos_per_zone):
+					Photo.objects.create(
+						title=f'{zone.name}-{index}', image=f'photos/nas/{zone.slug}-{index}.jpg', zone=zone
+					)
+				zones.append(zone)
+		return zones
+
+	def get_zones_page(self, params=None):
+		# 페이지/조건부 GET/분류 캐시를 비워 매번 처음 그리는 경로의 쿼리 수를 잽니다.
+		cache.clear()
+		taxonomy._taxonomies.clear()
+		with self.assertNumQueries(self.ZONES_PAGE_QUERIES, using='nas'):
+			response = self.client.get('/zones/', params or {}, HTTP_HOST=NAS_HOST)
+		self.assertEqual(response.status_code, 200)
+		return response
+
+	def test_unfiltered_page_query_count_does_not_grow_with_zones(self):
+		self.add_zones(1)
+		response = self.get_zones_page()
+		self.assertEqual([zone['photo_count'] for zone in response.context['zones_data']], [2])
+
+		self.add_zones(9)
+		response = self.get_zones_page()
+		self.assertEqual(len(response.context['zones_data']), 10)
+		self.assertEqual({zone['photo_count'] for zone in response.context['zones_data']}, {2})
+		self.assertEqual(response.context['unregistered_count'], 1)
+		self.assertEqual(response.context['current_photos'], [self.unregistered])
+
+	def test_selected_zone_query_count_does_not_grow_with_zones(self):
+		zone = self.add_zones(1)[0]
+		self.get_zones_page({'zone': str(zone.id)})
+
+		self.add_zones(9)
+		response = self.get_zones_page({'zone': str(zone.id)})
+		self.assertEqual(response.context['current_zone'], zone)
+		self.assertEqual({photo.zone_id for photo in response.context['current_photos']}, {zone.id})
+		self.assertEqual(len(response.context['current_photos']), 2)
+
+	def test_unregistered_zone(self):
+		self.add_zones(3)
+		response = self.get_zones_page({'zone': 'unregistered'})
+		self.assertIsNone(response.context['current_zone'])
+		self.assertEqual(response.context['selected_zone_id'], 'unregistered')
+		self.assertEqual(response.context['current_photos'], [self.unregistered])
+
+	def test_invalid_zone_parameter_falls_back_to_unregistered(self):
+		self.add_zones(3)
+		for value in ('not-a-zone', '999999'):
+			with self.subTest(zone=value):
+				response = self.get_zones_page({'zone': value})
+				self.assertIsNone(response.context['current_zone'])
+				self.assertEqual(response.context['current_photos'], [self.unregistered])
+
+
+class ArchivePaginationTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		with use_db_alias('nas'):
+			# 같은 촬영일이 여러 장이어도 (effective_date, created_at, id)로 끊어 이어집니다.
+			for index, taken_at in enumerate([date(2024, 5, 1)] * 4 + [date(2023, 3, 2)] * 2 + [None]):
+				Photo.objects.create(title=f'사진{index}', image=f'photos/nas/{index}.jpg', taken_at=taken_at)
+
+	def test_cursor_pages_cover_the_timeline_once_in_order(self):
+		with use_db_alias('nas'):
+			expected = list(Photo.objects.order_by(*TIMELINE_ORDERING).values_list('id', flat=True))
+			seen, cursor = [], None
+			while True:
+				photos, cursor = timeline_page(Photo.objects.all(), cursor=cursor, page_size=3)
+				seen += [photo.id for photo in photos]
+				if not cursor:
+					break
+		self.assertEqual(seen, expected)
+
+	@override_settings(CACHES=LOCMEM_CACHES)
+	@mock.patch('portfolio.views.ARCHIVE_PAGE_SIZE', 4)
+	def test_archive_renders_the_first_page_and_the_api_continues(self):
+		response = self.client.get('/archive/', HTTP_HOST=NAS_HOST)
+		first_page = [photo.id for group in response.context['photo_groups'] for photo in group['photos']]
+		self.assertEqual(len(first_page), 4)
+		self.assertEqual(dict(response.context['year_nav'][0]), {'year': date.today().year, 'photo_count': 1})
+
+		response = self.client.get('/api/archive/', {'cursor': response.context['next_cursor']}, HTTP_HOST=NAS_HOST)
+		data = response.json()
+		self.assertIsNone(data['next_cursor'])
+		self.assertEqual([group['year'] for group in data['groups']], [2024, 2023])
+
+	def test_invalid_cursor_is_rejected(self):
+		response = self.client.get('/api/archive/', {'cursor': '!!!'}, HTTP_HOST=NAS_HOST)
+		self.assertEqual(response.status_code, 400)
+
+
+class EffectiveDateTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		with use_db_alias('nas'):
+			self.photo = Photo.objects.create(title='사진', image='photos/nas/a.jpg')
+		self.upload_day = timezone.localdate(self.photo.created_at)
+
+	def effective_date(self):
+		with use_db_alias('nas'):
+			return Photo.objects.get(id=self.photo.id).effective_date
+
+	def test_falls_back_to_the_local_upload_day(self):
+		self.assertEqual(self.effective_date(), self.upload_day)
+		with use_db_alias('nas'):
+			self.photo.taken_at = date(2021, 7, 3)
+			self.photo.save(update_fields=['taken_at'])
+		self.assertEqual(self.effective_date(), date(2021, 7, 3))
+
+	def test_queryset_update_keeps_it_in_sync(self):
+		with use_db_alias('nas'):
+			Photo.objects.filter(id=self.photo.id).update(taken_at=date(2020, 1, 2))
+			self.assertEqual(self.effective_date(), date(2020, 1, 2))
+			Photo.objects.filter(id=self.photo.id).update(taken_at=None)
+		self.assertEqual(self.effective_date(), self.upload_day)
+
+	def test_bulk_update_keeps_it_in_sync(self):
+		with use_db_alias('nas'):
+			photo = Photo.objects.get(id=self.photo.id)
+			photo.taken_at = date(2019, 9, 9)
+			Photo.objects.bulk_update([photo], ['taken_at'])
+		self.assertEqual(self.effective_date(), date(2019, 9, 9))
+
+
+class TimelineDayTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def create_photos(self, days):
+		with use_db_alias('nas'):
+			for index, day in enumerate(days):
+				Photo.objects.create(title=f'사진{index}', image=f'photos/nas/{index}.jpg', taken_at=day)
+
+	def day_counts(self):
+		with use_db_alias('nas'):
+			return dict(TimelineDay.objects.values_list('day', 'photo_count'))
+
+	def test_refresh_recounts_only_the_given_days(self):
+		self.create_photos([date(2024, 1, 1), date(2024, 1, 1), date(2024, 1, 2)])
+		with use_db_alias('nas'):
+			Photo.objects.filter(taken_at=date(2024, 1, 2)).delete()
+			TimelineDay.refresh({date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)})
+		self.assertEqual(self.day_counts(), {date(2024, 1, 1): 2})
+
+	def test_refresh_query_count_does_not_depend_on_the_number_of_days(self):
+		for day_count in (2, 30):
+			with self.subTest(day_count=day_count):
+				days = [date(2022, 1, 1) + timedelta(days=offset) for offset in range(day_count)]
+				self.create_photos(days)
+				with use_db_alias('nas'):
+					TimelineDay.objects.all().delete()
+					# 집계, upsert, 빈 날짜 삭제
+					with self.assertNumQueries(3, using='nas'):
+						TimelineDay.refresh(days + [date(2000, 1, 1)])
+				self.assertEqual(self.day_counts(), {day: 1 for day in days})
+				with use_db_alias('nas'):
+					Photo.objects.all().delete()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TagIndexTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		cache.clear()
+		with use_db_alias('nas'):
+			self.photos = [
+				Photo.objects.create(title=f'사진{index}', image=f'photos/nas/{index}.jpg') for index in range(2)
+			]
+			self.tags = {name: Tag.objects.create(name=name, slug=slug) for name, slug in [
+				('까치', 'magpie'), ('고양이', 'cat'), ('나무', 'tree'), ('sky', 'sky'),
+			]}
+
+	def photo_counts(self):
+		with use_db_alias('nas'):
+			return dict(Tag.objects.values_list('name', 'photo_count'))
+
+	def test_initial_groups_tense_consonants_with_plain_ones(self):
+		self.assertEqual(
+			{name: tag.initial for name, tag in self.tags.items()},
+			{'까치': 'ㄱ', '고양이': 'ㄱ', '나무': 'ㄴ', 'sky': ''},
+		)
+		with use_db_alias('nas'):
+			tag = self.tags['sky']
+			tag.name = '하늘'
+			tag.save(update_fields=['name'])
+			self.assertEqual(Tag.objects.get(id=tag.id).initial, 'ㅎ')
+
+	def test_photo_count_follows_tag_links_and_photo_deletes(self):
+		first, second = self.photos
+		with use_db_alias('nas'):
+			first.tags.add(self.tags['까치'], self.tags['나무'])
+			second.tags.add(self.tags['까치'])
+			self.assertEqual(self.photo_counts(), {'까치': 2, '고양이': 0, '나무': 1, 'sky': 0})
+			self.tags['나무'].photo_set.remove(first)
+			second.delete()
+			self.assertEqual(self.photo_counts(), {'까치': 1, '고양이': 0, '나무': 0, 'sky': 0})
+			first.tags.clear()
+		self.assertEqual(self.photo_counts(), {'까치': 0, '고양이': 0, '나무': 0, 'sky': 0})
+
+	def test_archive_panel_lists_used_tags_of_the_chosen_initial(self):
+		with use_db_alias('nas'):
+			self.photos[0].tags.add(self.tags['까치'], self.tags['나무'])
+		response = self.client.get('/archive/', {'initial': 'ㄱ'}, HTTP_HOST=NAS_HOST)
+		self.assertEqual([(tag.name, tag.photo_count) for tag in response.context['tags']], [('까치', 1)])
+
+
+class SearchTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		with use_db_alias('nas'):
+			self.mountain = Photo.objects.create(title='설악산 단풍', image='photos/nas/1.jpg', description='가을 산행')
+			self.valley = Photo.objects.create(title='계곡', image='photos/nas/2.jpg', description='설악산 아래 계곡')
+			self.city = Photo.objects.create(title='서울 야경', image='photos/nas/3.jpg')
+
+	def search(self, query):
+		return self.client.get('/api/search/', {'q': query}, HTTP_HOST=NAS_HOST)
+
+	def result_ids(self, query):
+		return [result['id'] for result in self.search(query).json()['results']]
+
+	def test_ranks_title_matches_above_description_matches(self):
+		self.assertEqual(self.result_ids('설악산'), [self.mountain.id, self.valley.id])
+		# 모든 검색어 토큰이 있어야 찾습니다.
+		self.assertEqual(self.result_ids('설악산 야경'), [])
+
+	def test_index_follows_title_and_tag_changes(self):
+		with use_db_alias('nas'):
+			tag = Tag.objects.create(name='밤하늘', slug='night-sky')
+			self.city.tags.add(tag)
+		self.assertEqual(self.result_ids('밤하늘'), [self.city.id])
+		with use_db_alias('nas'):
+			tag.name = '불빛'
+			tag.save()
+			self.city.title = '한강'
+			self.city.save()
+		self.assertEqual(self.result_ids('밤하늘'), [])
+		self.assertEqual(self.result_ids('서울'), [])
+		self.assertEqual(self.result_ids('불빛'), [self.city.id])
+
+	def test_pages_results_and_rejects_an_empty_query(self):
+		with use_db_alias('nas'):
+			self.assertEqual(search_photo_ids('설악산', page=1, page_size=1), ([self.mountain.id], True))
+			self.assertEqual(search_photo_ids('설악산', page=2, page_size=1), ([self.valley.id], False))
+		self.assertEqual(self.search(' ').status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PageCacheTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		cache.clear()
+		taxonomy._taxonomies.clear()
+		with use_db_alias('nas'):
+			Photo.objects.create(title='첫 사진', image='photos/nas/1.jpg')
+
+	def get_home(self):
+		response = self.client.get('/', HTTP_HOST=NAS_HOST)
+		self.assertEqual(response.status_code, 200)
+		return response
+
+	def test_anonymous_page_is_served_from_cache_until_the_generation_changes(self):
+		self.get_home()
+		with self.assertNumQueries(0, using='nas'):
+			self.assertContains(self.get_home(), '첫 사진')
+		with use_db_alias('nas'):
+			Photo.objects.create(title='새 사진', image='photos/nas/2.jpg')
+		self.assertContains(self.get_home(), '새 사진')
+
+	def test_queryset_update_invalidates_the_page(self):
+		self.get_home()
+		with use_db_alias('nas'):
+			Photo.objects.update(title='바뀐 제목')
+		self.assertContains(self.get_home(), '바뀐 제목')
+
+	def test_signed_in_pages_are_neither_served_from_nor_stored_in_the_cache(self):
+		self.get_home()
+		with use_db_alias('nas'):
+			User.objects.create_user('editor', password='pw')
+		self.client.login(username='editor', password='pw')
+		self.assertContains(self.get_home(), 'editor')
+		self.client.logout()
+		self.assertNotContains(self.get_home(), 'editor')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalGalleryTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		cache.clear()
+		taxonomy._taxonomies.clear()
+		with use_db_alias('nas'):
+			self.zone = Zone.objects.create(name='프랑스', slug='france')
+			self.tag = Tag.objects.create(name='장미', slug='rose')
+			self.photo = Photo.objects.create(title='장미 정원', image='photos/nas/1.jpg', zone=self.zone)
+			self.photo.tags.add(self.tag)
+
+	def get(self, path, etag=None):
+		headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+		return self.client.get(path, HTTP_HOST=NAS_HOST, **headers)
+
+	def test_unchanged_page_answers_304_without_queries(self):
+		etag = self.get('/zones/')['ETag']
+		with self.assertNumQueries(0, using='nas'):
+			response = self.get('/zones/', etag)
+		self.assertEqual(response.status_code, 304)
+		self.assertIn('no-cache', response['Cache-Control'])
+
+	def test_deleting_a_zone_or_tag_changes_the_etag(self):
+		for path, delete in [('/zones/', self.zone.delete), ('/archive/', self.tag.delete)]:
+			with self.subTest(path=path):
+				etag = self.get(path)['ETag']
+				with use_db_alias('nas'):
+					delete()
+				response = self.get(path, etag)
+				self.assertEqual(response.status_code, 200)
+				self.assertNotEqual(response['ETag'], etag)
+
+	def test_photo_update_changes_the_etag(self):
+		etag = self.get('/').get('ETag')
+		with use_db_alias('nas'):
+			Photo.objects.filter(id=self.photo.id).update(title='새 제목')
+		self.assertEqual(self.get('/', etag).status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BulkEditTests(TestCase):
+	"""일괄 수정은 선택한 사진 수나 촬영일 수와 상관없이 같은 수의 쿼리로 끝납니다."""
+
+	databases = {'default', 'nas'}
+	# 세이브포인트 2, 사진 id 1, 사진 id/이전 날짜/갱신/새 날짜 4, TimelineDay 집계/upsert/삭제 3,
+	# 태그 연결/사용 수 2, 검색 색인 사진/태그/삭제/넣기 4
+	BULK_EDIT_QUERIES = 16
+
+	def setUp(self):
+		cache.clear()
+		taxonomy._taxonomies.clear()
+		with use_db_alias('nas'):
+			Season.objects.create(key='autumn', name='가을', slug='autumn')
+			Zone.objects.create(name='영국', slug='uk')
+			Tag.objects.create(name='장미', slug='rose')
+
+	def create_photos(self, count):
+		with use_db_alias('nas'):
+			# 사진마다 촬영일이 달라 TimelineDay는 사진 수만큼의 날짜를 다시 셉니다.
+			# 제목은 같게 두어 SQLite의 bulk_create 매개변수 한도(999) 안에서 검색 색인을 한 번에 넣습니다.
+			return [
+				Photo.objects.create(
+					title='사진', image=f'photos/nas/{index}.jpg', taken_at=date(2020, 1, 1) + timedelta(days=index)
+				).id
+				for index in range(count)
+			]
+
+	def test_query_count_does_not_depend_on_the_number_of_photos(self):
+		for count in (5, 50):
+			with self.subTest(count=count):
+				photo_ids = self.create_photos(count)
+				with use_db_alias('nas'):
+					# 분류 표는 프로세스에 캐시되므로 미리 읽어 둡니다.
+					for model in taxonomy.TAXONOMY_MODELS:
+						taxonomy.get_taxonomy().ordered(model, 'id')
+					with self.assertNumQueries(self.BULK_EDIT_QUERIES, using='nas'):
+						updated = apply_bulk_edit(photo_ids, 'autumn', '영국', date(2024, 10, 1), ['장미'])
+				self.assertEqual(updated, count)
+				with use_db_alias('nas'):
+					self.assertEqual(
+						dict(TimelineDay.objects.values_list('day', 'photo_count')), {date(2024, 10, 1): count}
+					)
+					self.assertEqual(Tag.objects.get(name='장미').photo_count, count)
+					self.assertEqual(len(search_photo_ids('장미', page_size=100)[0]), count)
+					Photo.objects.filter(id__in=photo_ids).delete()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EditPhotoTagTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		cache.clear()
+		taxonomy._taxonomies.clear()
+		with use_db_alias('nas'):
+			User.objects.create_user('editor', password='pw')
+			Tag.objects.create(name='Rose', slug='rose')
+			self.photo = Photo.objects.create(title='정원', image='photos/nas/1.jpg')
+		self.client.login(username='editor', password='pw')
+
+	def edit(self, tags, season='autumn'):
+		return self.client.post(
+			f'/archive/edit/{self.photo.id}/', {'season': season, 'tags': tags}, HTTP_HOST=NAS_HOST
+		)
+
+	def test_failed_tag_leaves_no_new_rows_behind(self):
+		# 'rose'는 기존 태그 Rose와 slug가 겹쳐 만들 수 없습니다.
+		response = self.edit('나비, rose')
+		self.assertEqual(response.status_code, 200)
+		self.assertIn('tags', response.context['form'].errors)
+		with use_db_alias('nas'):
+			self.assertEqual(list(Tag.objects.values_list('name', flat=True)), ['Rose'])
+			self.assertFalse(Season.objects.exists())
+			self.assertIsNone(Photo.objects.get(id=self.photo.id).season_id)
+		# 롤백된 행을 분류 표에 남기지 않아 다음 저장이 사라진 계절을 가리키지 않습니다.
+		self.assertEqual(self.edit('나비').status_code, 302)
+		with use_db_alias('nas'):
+			self.assertEqual(Photo.objects.get(id=self.photo.id).season.key, 'autumn')
+
+	def test_new_tags_are_orphaned_until_linked(self):
+		with use_db_alias('nas'):
+			(unlinked,) = taxonomy.resolve_tags(['나비'])
+			self.assertIsNotNone(Tag.objects.get(id=unlinked.id).orphaned_at)
+		self.assertEqual(self.edit('나비').status_code, 302)
+		with use_db_alias('nas'):
+			self.assertIsNone(Tag.objects.get(name='나비').orphaned_at)
+
+
+class OrphanTagTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def setUp(self):
+		with use_db_alias('nas'):
+			self.photo = Photo.objects.create(title='정원', image='photos/nas/1.jpg')
+			self.kept = Tag.objects.create(name='장미', slug='rose')
+			self.dropped = Tag.objects.create(name='나비', slug='butterfly')
+			self.photo.tags.add(self.kept, self.dropped)
+
+	def collect(self):
+		with use_db_alias('nas'):
+			call_command('collect_orphan_tags', '--grace-minutes', '0', stdout=io.StringIO())
+			return set(Tag.objects.values_list('name', flat=True))
+
+	def test_removed_tags_are_collected_and_reused_ones_kept(self):
+		with use_db_alias('nas'):
+			self.photo.tags.clear()
+			self.assertIsNotNone(Tag.objects.get(id=self.dropped.id).orphaned_at)
+			# 수거 전에 다시 쓰인 태그는 표시만 지워집니다.
+			self.photo.tags.add(self.kept)
+		self.assertEqual(self.collect(), {'장미'})
+		with use_db_alias('nas'):
+			self.assertIsNone(Tag.objects.get(id=self.kept.id).orphaned_at)
+
+	def test_unmarked_unused_tags_are_marked_first_then_collected(self):
+		with use_db_alias('nas'):
+			# 표시 도입 전처럼 사용 수만 0이고 orphaned_at이 비어 있는 태그
+			Tag.objects.create(name='나무', slug='tree')
+		self.assertEqual(self.collect(), {'장미', '나비', '나무'})
+		with use_db_alias('nas'):
+			self.assertIsNotNone(Tag.objects.get(name='나무').orphaned_at)
+		self.assertEqual(self.collect(), {'장미', '나비'})
+
+
+class SeedPortfolioTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def call(self, name):
+		with use_db_alias('nas'):
+			call_command(name, stdout=io.StringIO())
+
+	def seasons(self):
+		with use_db_alias('nas'):
+			return list(Season.objects.order_by('id').values_list('key', 'name', 'slug'))
+
+	def test_seeding_twice_is_idempotent(self):
+		self.call('seed_portfolio')
+		with use_db_alias('nas'):
+			counts = (Season.objects.count(), Zone.objects.count(), Tag.objects.count())
+		self.call('seed_portfolio')
+		with use_db_alias('nas'):
+			self.assertEqual((Season.objects.count(), Zone.objects.count(), Tag.objects.count()), counts)
+		self.assertEqual(counts, (4, 4, 4))
+
+	def test_existing_keyed_season_keeps_its_name_and_slug(self):
+		with use_db_alias('nas'):
+			# 마이그레이션이 key를 사용자가 만든 '봄'에 주고, 예전 시드의 '봄의 튤립'은 key 없이 남은 경우
+			Season.objects.create(name='봄의 튤립', slug='spring-tulip')
+			Season.objects.create(key='spring', name='봄', slug='spring')
+			# key 도입 전에 시드한 여름은 slug로 찾아 key만 붙입니다.
+			Season.objects.create(name='여름', slug='summer-green')
+		self.call('seed_portfolio')
+		self.assertEqual(self.seasons(), [
+			(None, '봄의 튤립', 'spring-tulip'),
+			('spring', '봄', 'spring'),
+			('summer', '여름', 'summer-green'),
+			('autumn', '가을의 갈대', 'autumn-reed'),
+			('winter', '겨울의 설경', 'winter-snow'),
+		])
+
+	def test_dedupe_never_drops_a_keyed_season(self):
+		with use_db_alias('nas'):
+			unkeyed = Season.objects.create(name='봄', slug='spring-old')
+			keyed = Season.objects.create(key='spring', name='봄', slug='spring')
+			photo = Photo.objects.create(title='튤립', image='photos/nas/1.jpg', season=unkeyed)
+		self.call('dedupe_seasons_zones')
+		self.assertEqual(self.seasons(), [('spring', '봄', 'spring')])
+		with use_db_alias('nas'):
+			self.assertEqual(Photo.objects.get(id=photo.id).season_id, keyed.id)
+
+
+class SiteAssetTests(MediaTestCase):
+	def set_author_photo(self, content):
+		path = os.path.join(settings.MEDIA_ROOT, 'author.png')
+		with open(path, 'wb') as source:
+			source.write(content)
+		call_command('set_site_asset', path, '--database', 'nas', stdout=io.StringIO())
+		return hashlib.sha256(content).hexdigest()[:12]
+
+	def author_photo_url(self):
+		return self.client.get('/about/', HTTP_HOST=NAS_HOST).context['author_photo_url']
+
+	def test_falls_back_to_the_legacy_url_until_registered(self):
+		self.assertEqual(self.author_photo_url(), DEFAULT_AUTHOR_PHOTO_URL)
+
+	def test_about_page_uses_the_registered_version_without_touching_files(self):
+		version = self.set_author_photo(image_bytes((40, 40), 'PNG'))
+		# 미들웨어와 템플릿을 먼저 읽어 두고, 페이지 캐시는 비워 about()이 다시 그리게 합니다.
+		self.author_photo_url()
+		cache.clear()
+		with mock.patch('os.stat', side_effect=AssertionError('filesystem access')):
+			url = self.author_photo_url()
+		self.assertEqual(url, f'/media/site/nas/author.png?v={version}')
+
+	def test_replacing_the_file_changes_the_cached_page(self):
+		self.set_author_photo(image_bytes((40, 40), 'PNG'))
+		self.author_photo_url()
+		version = self.set_author_photo(image_bytes((40, 40), 'PNG', color=(10, 20, 30)))
+		response = self.client.get('/about/', HTTP_HOST=NAS_HOST)
+		self.assertContains(response, f'?v={version}')
+
+
+class FakeConnection:
+	def __init__(self, number):
+		self.number = number
+		self.alive = True
+		self.closed = False
+
+
+class ConnectionPoolTests(TestCase):
+	def make_pool(self, **options):
+		created = []
+
+		def connect():
+			created.append(FakeConnection(len(created) + 1))
+			return created[-1]
+
+		def ping(connection):
+			if not connection.alive:
+				raise DatabaseError('gone away')
+
+		def close(connection):
+			connection.closed = True
+
+		return ConnectionPool('test', connect, ping, close, **options), created
+
+	def test_released_connection_is_reused(self):
+		pool, created = self.make_pool()
+		connection, reused = pool.acquire()
+		self.assertFalse(reused)
+		pool.release(connection)
+		self.assertEqual(pool.acquire(), (connection, True))
+		self.assertEqual(len(created), 1)
+		self.assertEqual((pool.stats()['created'], pool.stats()['reused']), (1, 1))
+
+	def test_full_pool_waits_then_times_out(self):
+		pool, _ = self.make_pool(max_size=1, timeout=0.05)
+		connection, _ = pool.acquire()
+		with self.assertRaises(PoolTimeout):
+			pool.acquire()
+		# 기다리는 동안 반납되면 그 연결을 받습니다.
+		threading.Timer(0.01, pool.release, args=[connection]).start()
+		pool.timeout = 5
+		self.assertEqual(pool.acquire(), (connection, True))
+		self.assertEqual(pool.stats()['timeouts'], 1)
+
+	def test_dead_or_expired_connections_are_replaced(self):
+		pool, created = self.make_pool(ping_after=-1)
+		connection, _ = pool.acquire()
+		pool.release(connection)
+		connection.alive = False
+		replacement, reused = pool.acquire()
+		self.assertFalse(reused)
+		self.assertTrue(connection.closed)
+		pool.release(replacement)
+		pool.idle_timeout = -1
+		self.assertEqual(pool.acquire()[0], created[2])
+		self.assertTrue(replacement.closed)
+		stats = pool.stats()
+		self.assertEqual((stats['ping_failures'], stats['expired'], stats['size']), (1, 1, 1))
+
+	def test_unusable_connection_is_discarded_on_release(self):
+		pool, _ = self.make_pool()
+		connection, _ = pool.acquire()
+		pool.release(connection, reusable=False)
+		self.assertTrue(connection.closed)
+		self.assertEqual((pool.stats()['size'], pool.stats()['discarded']), (0, 1))
+
+
+class PoolStatusViewTests(TestCase):
+	databases = {'default', 'nas'}
+
+	def test_only_staff_can_read_pool_stats(self):
+		with use_db_alias('nas'):
+			User.objects.create_user('editor', password='pw')
+			User.objects.create_user('admin', password='pw', is_staff=True)
+		self.assertEqual(self.client.get('/api/db-pool/', HTTP_HOST=NAS_HOST).status_code, 302)
+		self.client.login(username='editor', password='pw')
+		self.assertEqual(self.client.get('/api/db-pool/', HTTP_HOST=NAS_HOST).status_code, 302)
+		self.client.login(username='admin', password='pw')
+		response = self.client.get('/api/db-pool/', HTTP_HOST=NAS_HOST)
+		self.assertEqual(response.status_code, 200)
+		self.assertIn('pools', response.json())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReplicaRoutingTests(TransactionTestCase):
+	"""DB_READ_REPLICAS=nas:local 일 때 익명 갤러리 페이지를 어느 DB에서 그리는지 확인합니다."""
+
+	databases = {'default', 'nas', 'local'}
+
+	def setUp(self):
+		patcher = mock.patch.dict('config.db_routing.READ_REPLICAS', {'nas': 'local'})
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		taxonomy._taxonomies.clear()
+		# 복제가 끝난 상태: 같은 사진이 원본(nas)과 복제본(local)에 모두 있습니다.
+		for alias in ('nas', 'local'):
+			with use_db_alias(alias):
+				Photo.objects.create(title='장미 정원', image=f'photos/{alias}/rose.jpg')
+		cache.clear()
+
+	def get_home(self):
+		with CaptureQueriesContext(connections['nas']) as primary, CaptureQueriesContext(connections['local']) as replica:
+			response = self.client.get('/', HTTP_HOST=NAS_HOST)
+		self.assertEqual(response.status_code, 200)
+		return response, len(primary), len(replica)
+
+	def test_gallery_render_reads_the_replica(self):
+		response, primary, replica = self.get_home()
+		self.assertContains(response, '장미 정원')
+		self.assertEqual(primary, 0)
+		self.assertGreater(replica, 0)
+
+	def test_cache_is_filled_from_the_primary_right_after_a_write(self):
+		with use_db_alias('nas'):
+			# 복제본에는 아직 반영되지 않은 쓰기
+			Photo.objects.create(title='수국 정원', image='photos/nas/hydrangea.jpg')
+		response, primary, replica = self.get_home()
+		self.assertContains(response, '수국 정원')
+		self.assertGreater(primary, 0)
+		self.assertEqual(replica, 0)
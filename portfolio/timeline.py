@@ -0,0 +1,78 @@
+import base64
+from datetime import date, datetime
+
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractYear
+
+# 타임라인은 Photo.effective_date(촬영일, 없으면 업로드일) 기준 최신순입니다.
+# 같은 날짜 안에서는 created_at, id 순으로 끊어 커서 페이지네이션이 중복/누락 없이 이어집니다.
+# (effective_date, created_at, id) 및 season/zone 복합 인덱스를 그대로 탑니다.
+TIMELINE_ORDERING = ('-effective_date', '-created_at', '-id')
+
+
+def year_counts(queryset):
+	"""연도별 사진 수 [(year, count), ...]를 최신 연도부터 돌려줍니다."""
+	rows = (
+		queryset.order_by()
+		.values(year=ExtractYear('effective_date'))
+		.annotate(photo_count=Count('id', distinct=True))
+		.order_by('-year')
+	)
+	return [(row['year'], row['photo_count']) for row in rows]
+
+
+def encode_cursor(photo):
+	raw = f"{photo.effective_date.isoformat()}|{photo.created_at.isoformat()}|{photo.id}"
+	return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+	try:
+		raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+		effective_date, created_at, photo_id = raw.split('|')
+		return date.fromisoformat(effective_date), datetime.fromisoformat(created_at), int(photo_id)
+	except (ValueError, UnicodeDecodeError):
+		return None
+
+
+def timeline_page(queryset, cursor=None, page_size=60):
+	"""커서 다음부터 page_size장을 가져옵니다. (사진 목록, 다음 커서 또는 None)을 돌려줍니다."""
+	photos = queryset.order_by(*TIMELINE_ORDERING)
+	position = decode_cursor(cursor) if cursor else None
+	if position:
+		effective_date, created_at, photo_id = position
+		photos = photos.filter(
+			Q(effective_date__lt=effective_date)
+			| Q(effective_date=effective_date, created_at__lt=created_at)
+			| Q(effective_date=effective_date, created_at=created_at, id__lt=photo_id)
+		)
+	page = list(photos[:page_size + 1])
+	next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+	return page[:page_size], next_cursor
+
+
+def group_by_year(photos):
+	groups = []
+	for photo in photos:
+		year = photo.effective_date.year
+		if not groups or groups[-1]['year'] != year:
+			groups.append({'year': year, 'photos': []})
+		groups[-1]['photos'].append(photo)
+	return groups
+
+
+def timeline_tree(days):
+	"""TimelineDay 목록(날짜순)으로 연 → 월(1~12) → 일 탐색 구조를 만듭니다."""
+	years = {}
+	for timeline_day in days:
+		day = timeline_day.day
+		year_entry = years.setdefault(day.year, {
+			'year': day.year,
+			'photo_count': 0,
+			'months': [{'month': month, 'photo_count': 0, 'days': []} for month in range(1, 13)],
+		})
+		month_entry = year_entry['months'][day.month - 1]
+		month_entry['days'].append({'day': day.day, 'date': day, 'photo_count': timeline_day.photo_count})
+		month_entry['photo_count'] += timeline_day.photo_count
+		year_entry['photo_count'] += timeline_day.photo_count
+	return [years[year] for year in sorted(years)]
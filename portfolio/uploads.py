@@ -0,0 +1,271 @@
+import hashlib
+import io
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image
+
+from config.db_routing import get_current_db_alias
+
+from .exif import extract_metadata
+from .models import Photo, PhotoMetadata, UploadJob
+from .renditions import delete_renditions, generate_renditions
+
+
+# 저장본 처리 규격(최대 폭, JPEG 품질 등)이 바뀌면 버전을 올립니다.
+# reprocess_photos는 버전과 파일 해시가 모두 같은 사진을 건너뜁니다.
+PROCESSING_VERSION = 1
+MAX_IMAGE_WIDTH = 800
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+	digest = hashlib.sha256()
+	with open(path, 'rb') as source:
+		for chunk in iter(lambda: source.read(chunk_size), b''):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+class ImageTooLarge(ValueError):
+	pass
+
+
+class DecodeBudget:
+	"""워커 스레드들이 동시에 디코드하는 픽셀 메모리 총량을 제한합니다."""
+
+	def __init__(self, limit_bytes):
+		self.limit_bytes = limit_bytes
+		self.in_use = 0
+		self._condition = threading.Condition()
+
+	@contextmanager
+	def reserve(self, nbytes):
+		with self._condition:
+			# 예산보다 큰 단일 이미지는 다른 디코드가 모두 끝난 뒤 단독으로 처리합니다.
+			self._condition.wait_for(lambda: self.in_use == 0 or self.in_use + nbytes <= self.limit_bytes)
+			self.in_use += nbytes
+		try:
+			yield
+		finally:
+			with self._condition:
+				self.in_use -= nbytes
+				self._condition.notify_all()
+
+
+decode_budget = DecodeBudget(settings.IMAGE_DECODE_MEMORY_BUDGET_MB * 1024 * 1024)
+
+
+def _estimate_decode_bytes(image, target_size):
+	bands = len(image.getbands()) if image.mode not in ('P', '1') else 4
+	decoded = image.size[0] * image.size[1] * bands
+	resized = target_size[0] * target_size[1] * bands
+	return decoded + resized
+
+
+def resize_upload(uploaded_file, max_width=MAX_IMAGE_WIDTH, fast=True):
+	# Image.open은 헤더만 읽으므로 여기까지는 픽셀 메모리를 쓰지 않습니다.
+	image = Image.open(uploaded_file)
+	exif_bytes = image.info.get('exif')
+	image_format = (image.format or 'JPEG').upper()
+	width, height = image.size
+	new_size = (width, height)
+	if width > max_width:
+		ratio = max_width / float(width)
+		new_size = (max_width, int(height * ratio))
+		if fast and image_format in ['JPEG', 'JPG']:
+			# DCT 스케일링: 목표 크기 이상인 1/2, 1/4, 1/8 해상도로 바로 디코드합니다.
+			image.draft('RGB', new_size)
+
+	decoded_pixels = image.size[0] * image.size[1]
+	if decoded_pixels > settings.IMAGE_MAX_DECODE_PIXELS:
+		raise ImageTooLarge(
+			f'이미지가 너무 큽니다 ({width}x{height}, 디코드 {decoded_pixels} 픽셀 > '
+			f'{settings.IMAGE_MAX_DECODE_PIXELS} 픽셀).'
+		)
+
+	with decode_budget.reserve(_estimate_decode_bytes(image, new_size)):
+		if image_format in ['JPEG', 'JPG'] and image.mode != 'RGB':
+			image = image.convert('RGB')
+		if image.size != new_size:
+			# reducing_gap: 정수배 축소(Image.reduce)를 먼저 적용한 뒤 LANCZOS로 마무리합니다.
+			image = image.resize(new_size, Image.LANCZOS, reducing_gap=3.0 if fast else None)
+		output = io.BytesIO()
+		base_name, extension = os.path.splitext(uploaded_file.name)
+		if image_format in ['JPEG', 'JPG']:
+			save_kwargs = {
+				'format': 'JPEG',
+				'quality': 85,
+				'optimize': True,
+			}
+			if exif_bytes:
+				save_kwargs['exif'] = exif_bytes
+			image.save(output, **save_kwargs)
+			if extension.lower() not in ['.jpg', '.jpeg']:
+				extension = '.jpg'
+		elif image_format == 'PNG':
+			image.save(output, format='PNG', optimize=True)
+		else:
+			image.save(output, format=image_format)
+		image.close()
+	output.seek(0)
+	return ContentFile(output.read()), f"{base_name}{extension}"
+
+
+def staging_path(staged_name):
+	return os.path.join(settings.UPLOAD_STAGING_ROOT, staged_name)
+
+
+def stage_upload(uploaded_file, batch):
+	# 스테이징 파일을 쓰면서 SHA-256을 함께 계산하므로 파일을 다시 읽지 않습니다.
+	_, extension = os.path.splitext(uploaded_file.name)
+	staged_name = f"{batch}/{uuid.uuid4().hex}{extension.lower()}"
+	path = staging_path(staged_name)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	digest = hashlib.sha256()
+	with open(path, 'wb') as destination:
+		for chunk in uploaded_file.chunks():
+			digest.update(chunk)
+			destination.write(chunk)
+	return UploadJob(
+		batch=batch,
+		original_filename=uploaded_file.name,
+		staged_name=staged_name,
+		content_hash=digest.hexdigest(),
+	)
+
+
+def queue_uploads(uploaded_files, batch):
+	"""업로드 파일을 스테이징하고 중복을 제외한 작업을 큐에 넣습니다. (작업 목록, 중복 파일명)을 반환합니다."""
+	staged = [stage_upload(uploaded, batch) for uploaded in uploaded_files]
+	hashes = {job.content_hash for job in staged}
+	names = {job.original_filename for job in staged}
+	known_hashes = set()
+	known_names = set()
+	# 배치 전체를 IN 조회 한 번으로 확인합니다. 파일명 일치도 기존처럼 중복으로 봅니다.
+	for content_hash, original_filename in Photo.objects.filter(
+		Q(content_hash__in=hashes) | Q(original_filename__in=names)
+	).values_list('content_hash', 'original_filename'):
+		known_hashes.add(content_hash)
+		known_names.add(original_filename)
+	for content_hash, original_filename in UploadJob.objects.filter(
+		Q(content_hash__in=hashes) | Q(original_filename__in=names),
+		status__in=[UploadJob.STATUS_PENDING, UploadJob.STATUS_PROCESSING],
+	).values_list('content_hash', 'original_filename'):
+		known_hashes.add(content_hash)
+		known_names.add(original_filename)
+
+	jobs = []
+	duplicate_names = []
+	for job in staged:
+		if job.content_hash in known_hashes or job.original_filename in known_names:
+			duplicate_names.append(job.original_filename)
+			_discard_staged_file(job)
+			continue
+		known_hashes.add(job.content_hash)
+		known_names.add(job.original_filename)
+		jobs.append(job)
+	return UploadJob.objects.bulk_create(jobs), duplicate_names
+
+
+def _discard_staged_file(job):
+	path = staging_path(job.staged_name)
+	if os.path.exists(path):
+		os.remove(path)
+	batch_dir = os.path.dirname(path)
+	if os.path.isdir(batch_dir) and not os.listdir(batch_dir):
+		os.rmdir(batch_dir)
+
+
+def _discard_photo_files(photo):
+	delete_renditions(photo)
+	photo.image.delete(save=False)
+
+
+def claim_job(job_id):
+	claimed = UploadJob.objects.filter(id=job_id, status=UploadJob.STATUS_PENDING).update(
+		status=UploadJob.STATUS_PROCESSING,
+		updated_at=timezone.now(),
+	)
+	return claimed == 1
+
+
+def _is_duplicate(job):
+	return Photo.objects.filter(
+		Q(content_hash=job.content_hash) | Q(original_filename=job.original_filename)
+	).exists()
+
+
+def process_upload_job(job):
+	job.attempts += 1
+	try:
+		if not job.content_hash:
+			# 해시 컬럼 추가 이전에 큐에 들어간 작업
+			job.content_hash = file_sha256(staging_path(job.staged_name))
+		if _is_duplicate(job):
+			job.status = UploadJob.STATUS_DUPLICATE
+		else:
+			with open(staging_path(job.staged_name), 'rb') as source:
+				metadata = extract_metadata(Image.open(source))
+				source.seek(0)
+				resized_file, stored_name = resize_upload(File(source, name=job.original_filename))
+			title = os.path.splitext(job.original_filename)[0]
+			photo = Photo(
+				title=title,
+				original_filename=job.original_filename,
+				content_hash=job.content_hash,
+				processed_version=PROCESSING_VERSION,
+				processed_hash=hashlib.sha256(resized_file.read()).hexdigest(),
+			)
+			if metadata['captured_at']:
+				photo.taken_at = timezone.localtime(metadata['captured_at']).date()
+			resized_file.seek(0)
+			photo.image.save(stored_name, resized_file, save=False)
+			try:
+				generate_renditions(photo)
+				with transaction.atomic(using=get_current_db_alias()):
+					photo.save()
+					PhotoMetadata.objects.create(photo=photo, **metadata)
+					job.photo = photo
+					job.status = UploadJob.STATUS_DONE
+			except IntegrityError:
+				# 다른 워커가 같은 내용을 먼저 저장했습니다. 유니크 인덱스가 최종 판정입니다.
+				_discard_photo_files(photo)
+				job.photo = None
+				job.status = UploadJob.STATUS_DUPLICATE
+			except Exception:
+				# 어떤 오류든 DB 행 없이 저장 파일만 남지 않도록 지운 뒤 실패 처리에 맡깁니다.
+				_discard_photo_files(photo)
+				job.photo = None
+				raise
+		job.error = ''
+	except (OSError, ValueError, Image.DecompressionBombError) as exc:
+		job.status = UploadJob.STATUS_FAILED
+		job.error = str(exc)[:1000]
+	job.save(update_fields=['status', 'error', 'attempts', 'photo', 'content_hash', 'updated_at'])
+	if job.status != UploadJob.STATUS_FAILED:
+		_discard_staged_file(job)
+	return job
+
+
+def batch_status(batch):
+	jobs = list(
+		UploadJob.objects.filter(batch=batch).values('id', 'original_filename', 'status', 'error')
+	)
+	counts = {status: 0 for status, _ in UploadJob.STATUS_CHOICES}
+	for job in jobs:
+		counts[job['status']] += 1
+	return {
+		'batch': str(batch),
+		'total': len(jobs),
+		'counts': counts,
+		'finished': all(job['status'] in UploadJob.FINISHED_STATUSES for job in jobs),
+		'jobs': jobs,
+	}
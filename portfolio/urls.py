@@ -9,11 +9,17 @@ urlpatterns = [
     path('seasons/', views.seasons, name='seasons'),
     path('zones/', views.zones, name='zones'),
     path('archive/', views.archive, name='archive'),
+    path('search/', views.search, name='search'),
     path('management/', views.management, name='management'),
+    path('management/days/<str:day>/', views.management_day, name='management_day'),
     path('api/zones/', views.get_zones, name='get_zones'),
     path('api/zones/add/', views.add_zone, name='add_zone'),
     path('api/zones/<int:zone_id>/delete/', views.delete_zone, name='delete_zone'),
     path('api/photos/bulk-edit/', views.bulk_edit_photos, name='bulk_edit_photos'),
+    path('api/uploads/<uuid:batch>/status/', views.upload_status, name='upload_status'),
+    path('api/archive/', views.archive_page, name='archive_page'),
+    path('api/search/', views.search_api, name='search_api'),
+    path('api/db-pool/', views.db_pool_status, name='db_pool_status'),
     path('archive/edit/<int:photo_id>/', views.edit_photo, name='edit_photo'),
     path('archive/delete/<int:photo_id>/', views.delete_photo, name='delete_photo'),
     path('about/', views.about, name='about'),
@@ -1,70 +1,48 @@
-import io
-import os
+import uuid
 from datetime import date
 
-from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.files.base import ContentFile
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.views.decorators.http import require_POST
-from django.db.models import Prefetch
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.text import slugify
-from PIL import ExifTags, Image
-
-from .forms import PhotoEditForm, PhotoUploadForm, SEASON_CHOICES, ZONE_CHOICES
-from .models import Photo, Season, Tag, Zone
-
-
-def _resize_upload(uploaded_file, max_width=800):
-	image = Image.open(uploaded_file)
-	exif_bytes = image.info.get('exif')
-	image_format = (image.format or 'JPEG').upper()
-	if image_format in ['JPEG', 'JPG'] and image.mode != 'RGB':
-		image = image.convert('RGB')
-	width, height = image.size
-	if width > max_width:
-		ratio = max_width / float(width)
-		new_size = (max_width, int(height * ratio))
-		image = image.resize(new_size, Image.LANCZOS)
-	output = io.BytesIO()
-	base_name, extension = os.path.splitext(uploaded_file.name)
-	if image_format in ['JPEG', 'JPG']:
-		save_kwargs = {
-			'format': 'JPEG',
-			'quality': 85,
-			'optimize': True,
-		}
-		if exif_bytes:
-			save_kwargs['exif'] = exif_bytes
-		image.save(output, **save_kwargs)
-		if extension.lower() not in ['.jpg', '.jpeg']:
-			extension = '.jpg'
-	else:
-		image.save(output, format=image_format)
-	output.seek(0)
-	return ContentFile(output.read()), f"{base_name}{extension}"
-
-
-def _get_exif_data(photo):
-	if not photo.image:
-		return []
-	try:
-		image = Image.open(photo.image.path)
-		exif = image.getexif()
-		if not exif:
-			return []
-		entries = []
-		for tag_id, value in exif.items():
-			label = ExifTags.TAGS.get(tag_id, str(tag_id))
-			entries.append((label, str(value)))
-		return entries
-	except (FileNotFoundError, OSError):
-		return []
-
 
+from config.db_pool import pool_stats
+from config.db_routing import get_current_db_alias
+
+from .bulk_edit import apply_bulk_edit
+from .cache import cached_page
+from .forms import PhotoEditForm, PhotoUploadForm, SEASON_CHOICES, zone_choices
+from .freshness import conditional_gallery, photo_state, scope_state
+from .hangul import TAG_INITIALS
+from .models import Photo, Season, SiteAsset, Tag, TimelineDay, Zone
+from .renditions import delete_renditions
+from .search import search_photos
+from .taxonomy import (
+	TagResolveError,
+	get_taxonomy,
+	invalidate_taxonomy,
+	resolve_named,
+	resolve_season,
+	resolve_tags,
+)
+from .timeline import TIMELINE_ORDERING, decode_cursor, group_by_year, timeline_page, timeline_tree, year_counts
+from .uploads import batch_status, queue_uploads
+
+
+def _all_photos_state(request):
+	return scope_state('all', lambda: photo_state(Photo.objects.all(), Season, Zone, Tag))
+
+
+@conditional_gallery(_all_photos_state)
+@cached_page
 def home(request):
 	recent_photos = Photo.objects.select_related('season', 'zone')[:50]
 	latest_photos = Photo.objects.select_related('season', 'zone')[:12]
@@ -74,88 +52,76 @@ def home(request):
 	})
 
 
-def seasons(request):
-	season_nav = [
-		{'key': 'spring', 'label': '봄', 'desc': '풀과 꽃이 피어나는 계절'},
-		{'key': 'summer', 'label': '여름', 'desc': '파도와 녹음이 짙어지는 계절'},
-		{'key': 'autumn', 'label': '가을', 'desc': '단풍이 번지는 계절'},
-		{'key': 'winter', 'label': '겨울', 'desc': '눈과 고요가 머무는 계절'},
-	]
-	key_map = {item['key']: item for item in season_nav}
+SEASON_NAV = [
+	{'key': 'spring', 'label': '봄', 'desc': '풀과 꽃이 피어나는 계절'},
+	{'key': 'summer', 'label': '여름', 'desc': '파도와 녹음이 짙어지는 계절'},
+	{'key': 'autumn', 'label': '가을', 'desc': '단풍이 번지는 계절'},
+	{'key': 'winter', 'label': '겨울', 'desc': '눈과 고요가 머무는 계절'},
+]
+
+
+def _active_season(request):
+	key_map = {item['key']: item for item in SEASON_NAV}
 	active_key = request.GET.get('season', 'spring')
 	if active_key not in key_map:
 		active_key = 'spring'
-	active = key_map[active_key]
-	season_obj = Season.objects.filter(name__startswith=active['label']).order_by('order', 'id').first()
-	photos_qs = Photo.objects.none()
-	if season_obj:
-		photos_qs = Photo.objects.filter(season=season_obj).select_related('season', 'zone')
-	photos_qs = photos_qs.order_by('-taken_at', '-created_at')
-	photo_groups = []
-	current_year = None
-	for photo in photos_qs:
-		year = photo.taken_at.year if photo.taken_at else photo.created_at.year
-		if current_year != year:
-			photo_groups.append({'year': year, 'photos': []})
-			current_year = year
-		photo_groups[-1]['photos'].append(photo)
+	return key_map[active_key]
+
+
+def _season_photos(active):
+	return Photo.objects.filter(season__key=active['key'])
+
+
+def _season_state(request):
+	active = _active_season(request)
+	return scope_state(f"season:{active['key']}", lambda: photo_state(_season_photos(active), Season, Zone))
+
+
+@conditional_gallery(_season_state)
+@cached_page
+def seasons(request):
+	active = _active_season(request)
+	photos_qs = _season_photos(active).select_related('season', 'zone')
+	photo_groups = group_by_year(photos_qs.order_by(*TIMELINE_ORDERING))
 	return render(request, 'portfolio/seasons.html', {
-		'season_nav': season_nav,
-		'active_key': active_key,
+		'season_nav': SEASON_NAV,
+		'active_key': active['key'],
 		'active_label': active['label'],
 		'active_desc': active['desc'],
 		'photo_groups': photo_groups,
 	})
 
 
+@conditional_gallery(_all_photos_state)
+@cached_page
 def zones(request):
 	selected_zone = request.GET.get('zone')
-	
-	# 모든 Zone과 그에 해당하는 사진 가져오기 (최신순)
-	zones_data = []
-	for zone in Zone.objects.all().order_by('order', 'name'):
-		photos = Photo.objects.filter(zone=zone).select_related('season', 'zone').order_by('-taken_at', '-created_at')
-		zones_data.append({
-			'id': zone.id,
-			'name': zone.name,
-			'photos': list(photos)
-		})
-	
-	# 미등록 사진 가져오기 (Zone이 None인 사진)
-	unregistered_photos = Photo.objects.filter(zone__isnull=True).select_related('season', 'zone').order_by('-taken_at', '-created_at')
-	unregistered_count = unregistered_photos.count()
-	
-	# 선택된 zone 세션 저장
+
+	# Zone별 사진 수는 GROUP BY 한 번으로 구하고, 사진은 선택된 Zone 것만 가져옵니다.
+	photo_counts = dict(
+		Photo.objects.order_by().values_list('zone_id').annotate(photo_count=Count('id'))
+	)
+	zone_list = get_taxonomy().ordered(Zone, 'order', 'name')
+	zones_data = [
+		{'id': zone.id, 'name': zone.name, 'photo_count': photo_counts.get(zone.id, 0)}
+		for zone in zone_list
+	]
+	unregistered_count = photo_counts.get(None, 0)
+
 	current_zone = None
-	current_zone_id = None
-	current_photos = []
-	current_photo_groups = []
-	
-	if selected_zone == 'unregistered':
-		current_zone = None
-		current_photos = list(unregistered_photos)
-	elif selected_zone:
-		try:
-			current_zone_id = int(selected_zone)
-			current_zone = Zone.objects.get(id=current_zone_id)
-			current_photos = list(current_zone.photo_set.select_related('season', 'zone').order_by('-taken_at', '-created_at'))
-		except (ValueError, Zone.DoesNotExist):
-			current_zone = None
-			current_photos = list(unregistered_photos)
+	if selected_zone and selected_zone != 'unregistered':
+		current_zone = next((zone for zone in zone_list if str(zone.id) == selected_zone), None)
+
+	current_photos = Photo.objects.select_related('season', 'zone').order_by(*TIMELINE_ORDERING)
+	if current_zone:
+		current_photos = list(current_photos.filter(zone=current_zone))
 	else:
 		# 기본으로 미등록 표시
-		current_zone = None
-		current_photos = list(unregistered_photos)
-
-	# 연도별 그룹 생성 (taken_at 우선, 없으면 created_at 사용)
-	current_year = None
-	for photo in current_photos:
-		year = photo.taken_at.year if photo.taken_at else photo.created_at.year
-		if current_year != year:
-			current_photo_groups.append({'year': year, 'photos': []})
-			current_year = year
-		current_photo_groups[-1]['photos'].append(photo)
-	
+		current_photos = list(current_photos.filter(zone__isnull=True))
+
+	# 연도별 그룹 (effective_date: taken_at 우선, 없으면 created_at)
+	current_photo_groups = group_by_year(current_photos)
+
 	return render(request, 'portfolio/zones.html', {
 		'zones_data': zones_data,
 		'unregistered_count': unregistered_count,
@@ -166,96 +132,115 @@ def zones(request):
 	})
 
 
+ARCHIVE_PAGE_SIZE = 60
+
+
+def _archive_photos(tag_slug):
+	photos = Photo.objects.select_related('season', 'zone')
+	if tag_slug:
+		photos = photos.filter(tags__slug=tag_slug)
+	return photos
+
+
+def _archive_state(request):
+	tag_slug = request.GET.get('tag')
+	if not tag_slug:
+		return _all_photos_state(request)
+	return scope_state(f"tag:{tag_slug}", lambda: photo_state(_archive_photos(tag_slug), Season, Zone, Tag))
+
+
+@conditional_gallery(_archive_state)
+@cached_page
 def archive(request):
 	tag_slug = request.GET.get('tag')
 	initial = request.GET.get('initial')
-	photos = Photo.objects.select_related('season', 'zone').prefetch_related('tags')
-	if tag_slug:
-		photos = photos.filter(tags__slug=tag_slug)
-	photos = photos.order_by('-taken_at', '-created_at')
-
-	photo_groups = []
-	current_year = None
-	for photo in photos:
-		year = photo.taken_at.year if photo.taken_at else photo.created_at.year
-		if current_year != year:
-			photo_groups.append({'year': year, 'photos': [], 'photo_count': 0})
-			current_year = year
-		photo_groups[-1]['photos'].append(photo)
-		photo_groups[-1]['photo_count'] += 1
-	tags = Tag.objects.all()
-	initials = ['ㄱ', 'ㄴ', 'ㄷ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅅ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-	full_initials = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-	normalize_initial = {
-		'ㄲ': 'ㄱ',
-		'ㄸ': 'ㄷ',
-		'ㅃ': 'ㅂ',
-		'ㅆ': 'ㅅ',
-		'ㅉ': 'ㅈ',
-	}
-	def get_initial(name):
-		if not name:
-			return ''
-		first = name[0]
-		code = ord(first) - 0xAC00
-		if 0 <= code <= 11171:
-			initial = full_initials[code // 588]
-			return normalize_initial.get(initial, initial)
-		return ''
-	if initial in initials:
-		tags = [tag for tag in tags if get_initial(tag.name) == initial]
+	# 첫 페이지만 렌더링하고 나머지는 스크롤 시 archive_page(JSON)로 이어 붙입니다.
+	photos, next_cursor = timeline_page(
+		_archive_photos(tag_slug).prefetch_related('tags'), page_size=ARCHIVE_PAGE_SIZE
+	)
+	photo_groups = group_by_year(photos)
+	year_nav = [
+		{'year': year, 'photo_count': photo_count}
+		for year, photo_count in year_counts(_archive_photos(tag_slug))
+	]
+	# 초성은 저장된 Tag.initial 인덱스로 거릅니다. 사진이 없는 태그는 collect_orphan_tags가 지울 때까지 숨깁니다.
+	tags = Tag.objects.filter(photo_count__gt=0).only('name', 'slug', 'photo_count')
+	if initial in TAG_INITIALS:
+		tags = tags.filter(initial=initial)
 	return render(request, 'portfolio/archive.html', {
-		'photos': photos,
 		'photo_groups': photo_groups,
+		'year_nav': year_nav,
+		'next_cursor': next_cursor,
 		'tags': tags,
 		'active_tag': tag_slug,
-		'tag_initials': initials,
+		'tag_initials': TAG_INITIALS,
 		'active_initial': initial,
 	})
 
 
-@login_required(login_url='login')
-def management(request):
-	photos = list(
-		Photo.objects.select_related('season', 'zone').prefetch_related('tags')
+@conditional_gallery(_archive_state)
+@cached_page
+def archive_page(request):
+	tag_slug = request.GET.get('tag')
+	cursor = request.GET.get('cursor')
+	if cursor and decode_cursor(cursor) is None:
+		return JsonResponse({'success': False, 'error': '잘못된 커서입니다.'}, status=400)
+	photos, next_cursor = timeline_page(
+		_archive_photos(tag_slug).prefetch_related('tags'),
+		cursor=cursor,
+		page_size=ARCHIVE_PAGE_SIZE,
 	)
-	photos.sort(key=lambda photo: (
-		photo.taken_at or photo.created_at.date(),
-		photo.created_at,
-		photo.id,
-	))
-
-	def normalize_date(photo):
-		return photo.taken_at or photo.created_at.date()
-
-	year_map = {}
-	for photo in photos:
-		photo_date = normalize_date(photo)
-		year = photo_date.year
-		month = photo_date.month
-		day = photo_date.day
-		year_entry = year_map.setdefault(year, {'months': {}})
-		month_entry = year_entry['months'].setdefault(month, {})
-		month_entry.setdefault(day, []).append(photo)
-
-	year_groups = []
-	for year in sorted(year_map.keys()):
-		months = []
-		photo_count = 0
-		month_map = year_map[year]['months']
-		for month in range(1, 13):
-			days = []
-			for day in sorted(month_map.get(month, {}).keys()):
-				day_photos = month_map[month][day]
-				photo_count += len(day_photos)
-				days.append({'day': day, 'photos': day_photos})
-			months.append({'month': month, 'days': days})
-		year_groups.append({'year': year, 'months': months, 'photo_count': photo_count})
+	groups = [
+		{
+			'year': group['year'],
+			'html': render_to_string('portfolio/_archive_photos.html', {'photos': group['photos']}, request=request),
+		}
+		for group in group_by_year(photos)
+	]
+	return JsonResponse({'groups': groups, 'next_cursor': next_cursor})
+
+
+def _search_params(request):
+	query = request.GET.get('q', '').strip()[:100]
+	try:
+		page = max(int(request.GET.get('page', 1)), 1)
+	except ValueError:
+		page = 1
+	return query, page
+
+
+def search(request):
+	query, page = _search_params(request)
+	photos, has_next = search_photos(query, page) if query else ([], False)
+	return render(request, 'portfolio/search.html', {
+		'query': query,
+		'photos': photos,
+		'next_page': page + 1 if has_next else None,
+	})
 
+
+def search_api(request):
+	query, page = _search_params(request)
+	if not query:
+		return JsonResponse({'success': False, 'error': '검색어를 입력해주세요.'}, status=400)
+	photos, has_next = search_photos(query, page)
+	return JsonResponse({
+		'results': [
+			{'id': photo.id, 'title': photo.title, 'image': photo.image.url}
+			for photo in photos
+		],
+		'html': render_to_string('portfolio/_search_photos.html', {'photos': photos}, request=request),
+		'next_page': page + 1 if has_next else None,
+	})
+
+
+@login_required(login_url='login')
+def management(request):
 	upload_form = PhotoUploadForm()
 	duplicate_names = []
 	upload_error = None
-	uploaded_count = 0
+	queued_count = 0
+	upload_batch = None
 	if request.method == 'POST':
 		upload_form = PhotoUploadForm(request.POST, request.FILES)
 		files = request.FILES.getlist('images')
@@ -264,136 +249,101 @@ def management(request):
 		elif len(files) > 50:
 			upload_error = '한번에 최대 50장까지 업로드할 수 있습니다.'
 		else:
-			existing_names = set()
-			for photo in Photo.objects.only('original_filename', 'image'):
-				if photo.original_filename:
-					existing_names.add(photo.original_filename)
-				elif photo.image:
-					existing_names.add(os.path.basename(photo.image.name))
-			for uploaded in files:
-				original_name = uploaded.name
-				if original_name in existing_names:
-					duplicate_names.append(original_name)
-					continue
-				resized_file, stored_name = _resize_upload(uploaded)
-				title = os.path.splitext(original_name)[0]
-				photo = Photo(title=title, original_filename=original_name)
-				photo.image.save(stored_name, resized_file, save=False)
-				photo.save()
-				uploaded_count += 1
-				existing_names.add(original_name)
-		if uploaded_count:
-			photos = list(
-				Photo.objects.select_related('season', 'zone').prefetch_related('tags')
-			)
-			photos.sort(key=lambda photo: (
-				photo.taken_at or photo.created_at.date(),
-				photo.created_at,
-				photo.id,
-			))
-			year_map = {}
-			for photo in photos:
-				photo_date = normalize_date(photo)
-				year = photo_date.year
-				month = photo_date.month
-				day = photo_date.day
-				year_entry = year_map.setdefault(year, {'months': {}})
-				month_entry = year_entry['months'].setdefault(month, {})
-				month_entry.setdefault(day, []).append(photo)
-			year_groups = []
-			for year in sorted(year_map.keys()):
-				months = []
-				photo_count = 0
-				month_map = year_map[year]['months']
-				for month in range(1, 13):
-					days = []
-					for day in sorted(month_map.get(month, {}).keys()):
-						day_photos = month_map[month][day]
-						photo_count += len(day_photos)
-						days.append({'day': day, 'photos': day_photos})
-					months.append({'month': month, 'days': days})
-				year_groups.append({'year': year, 'months': months, 'photo_count': photo_count})
+			upload_batch = uuid.uuid4()
+			# 리사이즈/DB 저장은 process_upload_queue 워커가 처리합니다.
+			jobs, duplicate_names = queue_uploads(files, upload_batch)
+			queued_count = len(jobs)
+			if not queued_count:
+				upload_batch = None
+	# 탐색(연/월/일 사진 수)은 TimelineDay 표에서 만들고, 각 날짜의 사진은 management_day로 불러옵니다.
+	year_groups = timeline_tree(TimelineDay.objects.all())
 	return render(request, 'portfolio/management.html', {
 		'year_groups': year_groups,
 		'upload_form': upload_form,
 		'duplicate_names': duplicate_names,
 		'upload_error': upload_error,
-		'uploaded_count': uploaded_count,
+		'queued_count': queued_count,
+		'upload_batch': upload_batch,
 	})
 
 
-def about(request):
-	author_dir = os.path.join(settings.MEDIA_ROOT, 'photos', 'local', '2026', '03')
-	default_filename = 'author_profile_attached.png'
-	filename = default_filename
-	allowed_extensions = ('.png', '.jpg', '.jpeg')
-
-	if os.path.isdir(author_dir):
-		candidate_files = [
-			name for name in os.listdir(author_dir)
-			if name.startswith('author_profile') and name.lower().endswith(allowed_extensions)
-		]
-		if candidate_files:
-			filename = max(candidate_files, key=lambda name: os.path.getmtime(os.path.join(author_dir, name)))
-
-	author_photo_path = os.path.join(author_dir, filename)
-	author_photo_url = f"/media/photos/local/2026/03/{filename}"
-	if os.path.exists(author_photo_path):
-		author_photo_url = f"{author_photo_url}?v={int(os.path.getmtime(author_photo_path))}"
+@login_required(login_url='login')
+def management_day(request, day):
+	try:
+		day = date.fromisoformat(day)
+	except ValueError:
+		raise Http404('잘못된 날짜입니다.')
+	photos = (
+		Photo.objects.filter(effective_date=day)
+		.select_related('season', 'zone')
+		.order_by('created_at', 'id')
+	)
+	return render(request, 'portfolio/_management_photos.html', {'photos': photos})
 
+
+@login_required(login_url='login')
+def upload_status(request, batch):
+	return JsonResponse(batch_status(batch))
+
+
+@staff_member_required(login_url='login')
+def db_pool_status(request):
+	# 이 프로세스의 alias별 DB 연결 풀 지표 (생성/재사용/ping 실패/대기 등)
+	return JsonResponse({'pools': pool_stats()})
+
+
+# SiteAsset이 아직 등록되지 않았을 때 쓰는 예전 고정 경로
+DEFAULT_AUTHOR_PHOTO_URL = '/media/photos/local/2026/03/author_profile_attached.png'
+
+
+@cached_page
+def about(request):
 	return render(request, 'portfolio/about.html', {
-		'author_photo_url': author_photo_url,
+		'author_photo_url': SiteAsset.url_for(SiteAsset.KEY_AUTHOR_PHOTO, default=DEFAULT_AUTHOR_PHOTO_URL),
 	})
 
 
 def edit_photo(request, photo_id):
-	photo = get_object_or_404(Photo, id=photo_id)
-	exif_entries = _get_exif_data(photo)
+	photo = get_object_or_404(Photo.objects.select_related('season', 'zone', 'metadata'), id=photo_id)
+	# EXIF는 업로드 시 PhotoMetadata에 저장된 값을 사용하므로 파일을 다시 열지 않습니다.
+	metadata = getattr(photo, 'metadata', None)
+	exif_entries = metadata.exif if metadata else []
 	back_url = request.GET.get('next') or 'portfolio:management'
 	initial_tags = ', '.join(photo.tags.values_list('name', flat=True))
-	initial_season = photo.season.name if photo.season else ''
+	initial_season = (photo.season.canonical_key or '') if photo.season else ''
 	initial_zone = photo.zone.name if photo.zone else ''
-	initial_date = photo.taken_at or date.today()
+	initial_date = photo.taken_at
+	if not initial_date and metadata and metadata.captured_at:
+		initial_date = timezone.localtime(metadata.captured_at).date()
+	initial_date = initial_date or date.today()
 	if request.method == 'POST':
 		form = PhotoEditForm(request.POST)
 		if form.is_valid():
 			photo.description = form.cleaned_data['description']
-			season_name = form.cleaned_data['season']
+			season_key = form.cleaned_data['season']
 			zone_name = form.cleaned_data['zone']
-			if season_name:
-				season = Season.objects.filter(name=season_name).order_by('id').first()
-				if not season:
-					season = Season.objects.create(
-						name=season_name,
-						slug=slugify(season_name, allow_unicode=True),
-					)
-				photo.season = season
-			else:
-				photo.season = None
-			if zone_name:
-				zone = Zone.objects.filter(name=zone_name).order_by('id').first()
-				if not zone:
-					zone = Zone.objects.create(
-						name=zone_name,
-						slug=slugify(zone_name, allow_unicode=True),
-					)
-				photo.zone = zone
-			else:
-				photo.zone = None
-			photo.taken_at = form.cleaned_data['taken_at']
-			photo.save()
 			tags_value = form.cleaned_data['tags'] or ''
 			tag_names = [t.strip() for t in tags_value.split(',') if t.strip()]
-			photo.tags.clear()
-			for name in tag_names:
-				tag, _ = Tag.objects.get_or_create(
-					name=name,
-					defaults={'slug': slugify(name, allow_unicode=True)},
-				)
-				photo.tags.add(tag)
-			Tag.objects.filter(photo__isnull=True).delete()
-			messages.success(request, '사진 정보가 저장되었습니다.')
-			return redirect(request.path + f"?next={back_url}")
+			try:
+				# 태그 하나를 만들지 못하면 함께 만든 계절/구역/태그도 남기지 않습니다.
+				with transaction.atomic(using=get_current_db_alias()):
+					# key가 없는 중복 계절에 있는 사진은 같은 계절을 고른 채 저장하면 그대로 둡니다.
+					if not (photo.season and season_key and photo.season.canonical_key == season_key):
+						photo.season = resolve_season(season_key) if season_key else None
+					photo.zone = resolve_named(Zone, zone_name) if zone_name else None
+					photo.taken_at = form.cleaned_data['taken_at']
+					tags = resolve_tags(tag_names)
+					photo.save()
+					photo.tags.set(tags)
+			except Exception as exc:
+				# 롤백되면 트랜잭션 안에서 읽어 둔 분류 표에 없는 행이 남을 수 있습니다.
+				invalidate_taxonomy()
+				if not isinstance(exc, TagResolveError):
+					raise
+				form.add_error('tags', f'태그를 만들 수 없습니다: {exc}')
+			else:
+				messages.success(request, '사진 정보가 저장되었습니다.')
+				return redirect(request.path + f"?next={back_url}")
 	else:
 		form = PhotoEditForm(initial={
 			'description': photo.description,
@@ -408,7 +358,7 @@ def edit_photo(request, photo_id):
 		'exif_entries': exif_entries,
 		'back_url': back_url,
 		'season_choices': [choice[1] for choice in SEASON_CHOICES if choice[0]],
-		'zone_choices': [choice[1] for choice in ZONE_CHOICES if choice[0]],
+		'zone_choices': [choice[1] for choice in zone_choices() if choice[0]],
 	})
 
 
@@ -416,9 +366,9 @@ def edit_photo(request, photo_id):
 def delete_photo(request, photo_id):
 	photo = get_object_or_404(Photo, id=photo_id)
 	if photo.image:
+		delete_renditions(photo)
 		photo.image.delete(save=False)
 	photo.delete()
-	Tag.objects.filter(photo__isnull=True).delete()
 	next_url = request.POST.get('next')
 	return redirect(next_url or 'portfolio:management')
 
@@ -428,7 +378,7 @@ def add_zone(request):
 	zone_name = request.POST.get('zone_name', '').strip()
 	if not zone_name:
 		return JsonResponse({'success': False, 'error': '나라 이름을 입력해주세요.'})
-	if Zone.objects.filter(name=zone_name).exists():
+	if get_taxonomy().named(Zone, zone_name):
 		return JsonResponse({'success': False, 'error': f'"{zone_name}"은(는) 이미 존재합니다.'})
 	zone = Zone.objects.create(
 		name=zone_name,
@@ -450,8 +400,8 @@ def delete_zone(request, zone_id):
 
 @login_required(login_url='login')
 def get_zones(request):
-	zones = Zone.objects.all().values('id', 'name').order_by('name')
-	return JsonResponse({'zones': list(zones)})
+	zones = [{'id': zone.id, 'name': zone.name} for zone in get_taxonomy().ordered(Zone, 'name')]
+	return JsonResponse({'zones': zones})
 
 
 @login_required(login_url='login')
@@ -459,7 +409,7 @@ def get_zones(request):
 def bulk_edit_photos(request):
 	from .forms import BulkEditForm
 	
-	photo_ids = request.POST.getlist('photo_ids[]')
+	photo_ids = [photo_id for photo_id in request.POST.getlist('photo_ids[]') if photo_id.isdigit()]
 	if not photo_ids:
 		return JsonResponse({'success': False, 'error': '사진을 선택해주세요.'})
 	
@@ -467,67 +417,22 @@ def bulk_edit_photos(request):
 	if not form.is_valid():
 		return JsonResponse({'success': False, 'error': '입력 데이터가 올바르지 않습니다.'})
 	
-	photos = Photo.objects.filter(id__in=photo_ids)
-	if not photos.exists():
-		return JsonResponse({'success': False, 'error': '선택된 사진을 찾을 수 없습니다.'})
-	
-	updated_count = 0
-	season_name = form.cleaned_data.get('season')
-	zone_name = form.cleaned_data.get('zone')
 	tags_value = form.cleaned_data.get('tags', '').strip()
-	taken_at = form.cleaned_data.get('taken_at')
-	
-	for photo in photos:
-		modified = False
-		
-		# 계절 수정
-		if season_name:
-			season = Season.objects.filter(name=season_name).order_by('id').first()
-			if not season:
-				season = Season.objects.create(
-					name=season_name,
-					slug=slugify(season_name, allow_unicode=True),
-				)
-			photo.season = season
-			modified = True
-		
-		# 구역(나라) 수정
-		if zone_name:
-			zone = Zone.objects.filter(name=zone_name).order_by('id').first()
-			if not zone:
-				zone = Zone.objects.create(
-					name=zone_name,
-					slug=slugify(zone_name, allow_unicode=True),
-				)
-			photo.zone = zone
-			modified = True
-		
-		# 날짜 수정
-		if taken_at:
-			photo.taken_at = taken_at
-			modified = True
-		
-		if modified:
-			photo.save()
-			updated_count += 1
-		
-		# 태그 추가 (기존 태그 유지)
-		if tags_value:
-			tag_names = [t.strip() for t in tags_value.split(',') if t.strip()]
-			for name in tag_names:
-				tag, _ = Tag.objects.get_or_create(
-					name=name,
-					defaults={'slug': slugify(name, allow_unicode=True)},
-				)
-				photo.tags.add(tag)
-			if tag_names:
-				updated_count += 1
-	
-	# 사용되지 않는 태그 삭제
-	Tag.objects.filter(photo__isnull=True).delete()
-	
+	try:
+		updated_count = apply_bulk_edit(
+			photo_ids,
+			season_key=form.cleaned_data.get('season'),
+			zone_name=form.cleaned_data.get('zone'),
+			taken_at=form.cleaned_data.get('taken_at'),
+			tag_names=[t.strip() for t in tags_value.split(',') if t.strip()],
+		)
+	except TagResolveError as exc:
+		return JsonResponse({'success': False, 'error': f'태그를 만들 수 없습니다: {exc}'})
+	if not updated_count:
+		return JsonResponse({'success': False, 'error': '선택된 사진을 찾을 수 없습니다.'})
+
 	return JsonResponse({
 		'success': True,
 		'updated_count': updated_count,
-		'message': f'{len(photo_ids)}장의 사진이 수정되었습니다.'
+		'message': f'{updated_count}장의 사진이 수정되었습니다.'
 	})
\ No newline at end of file
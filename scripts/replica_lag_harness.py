@@ -0,0 +1,199 @@
+"""읽기 복제본 라우팅(DB_READ_REPLICAS)과 쓰기 후 원본 고정을 SQLite 두 개로 확인합니다.
+
+nas 별칭을 원본, local 별칭을 복제본으로 두고, 복제는 마지막 쓰기 후 --lag초가 지나야
+원본 파일을 복제본에 복사하는 방식으로 흉내 냅니다. MariaDB 없이 로컬에서 실행합니다.
+
+    python scripts/replica_lag_harness.py --lag 1.5 --sticky 3
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLIC_HOST = 'jakesto.synology.me'
+
+
+class Replicator:
+    """원본 SQLite 파일을 lag초 늦게 복제본에 반영합니다."""
+
+    def __init__(self, primary_path, replica_path, lag):
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.lag = lag
+        self.last_write = None
+
+    def record_write(self):
+        self.last_write = time.monotonic()
+
+    def catch_up(self, force=False):
+        if not force and self.last_write is not None and time.monotonic() - self.last_write < self.lag:
+            return False
+        source = sqlite3.connect(self.primary_path)
+        target = sqlite3.connect(self.replica_path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.last_write = None
+        return True
+
+
+def configure(workdir, sticky_seconds):
+    os.environ['DB_READ_REPLICAS'] = 'nas:local'
+    os.environ['DB_PRIMARY_STICKY_SECONDS'] = str(sticky_seconds)
+    os.environ['DB_POOL_ENABLED'] = 'False'
+    sys.path.insert(0, BASE_DIR)
+
+    import django
+    from django.conf import settings
+
+    from config import settings as project_settings
+
+    overrides = {name: getattr(project_settings, name) for name in dir(project_settings) if name.isupper()}
+    overrides.update(
+        DATABASES={
+            alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(workdir, f'{alias}.sqlite3')}
+            for alias in ('default', 'local', 'nas')
+        },
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        ALLOWED_HOSTS=['*'],
+        MEDIA_ROOT=os.path.join(workdir, 'media'),
+        STATICFILES_DIRS=[],
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    settings.configure(**overrides)
+    django.setup()
+
+
+class Harness:
+    def __init__(self, replicator):
+        from django.test import Client
+
+        self.replicator = replicator
+        self.client_class = Client
+        self.failures = 0
+
+    def check(self, label, condition):
+        print(f"[{'ok' if condition else 'FAIL'}] {label}")
+        if not condition:
+            self.failures += 1
+
+    def search(self, query, cookies=None):
+        """익명 검색 결과 제목과 (원본, 복제본) 쿼리 수를 돌려줍니다."""
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+
+        self.replicator.catch_up()
+        client = self.client_class(HTTP_HOST=PUBLIC_HOST)
+        for name, value in (cookies or {}).items():
+            client.cookies[name] = value
+        with CaptureQueriesContext(connections['nas']) as primary, CaptureQueriesContext(connections['local']) as replica:
+            response = client.get('/api/search/', {'q': query})
+        titles = [result['title'] for result in response.json()['results']]
+        return titles, len(primary), len(replica)
+
+    def write(self, func):
+        """HostDatabaseMiddleware를 거치는 요청 안에서 func를 실행하고 응답을 돌려줍니다."""
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from config.db_routing import HostDatabaseMiddleware
+
+        request = RequestFactory(HTTP_HOST=PUBLIC_HOST).get('/')
+        result = {}
+
+        def view(request):
+            result['value'] = func()
+            return HttpResponse()
+
+        response = HostDatabaseMiddleware(view)(request)
+        self.replicator.record_write()
+        return response, result.get('value')
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='replica_lag_')
+    configure(workdir, args.sticky)
+
+    from django.core.management import call_command
+    from django.db import connections, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    from config.db_routing import PRIMARY_STICKY_COOKIE, get_read_db_alias
+    from portfolio.models import Photo
+
+    for alias in ('default', 'nas', 'local'):
+        call_command('migrate', database=alias, verbosity=0)
+    replicator = Replicator(
+        connections['nas'].settings_dict['NAME'],
+        connections['local'].settings_dict['NAME'],
+        args.lag,
+    )
+    harness = Harness(replicator)
+
+    photo = Photo.objects.using('nas').create(title='장미 정원', image='photos/nas/rose.jpg')
+    replicator.catch_up(force=True)
+    print(f'작업 폴더: {workdir} (lag={args.lag}s, sticky={args.sticky}s)')
+
+    titles, primary, replica = harness.search('장미')
+    harness.check('익명 읽기는 복제본에서 처리', titles == ['장미 정원'] and primary == 0 and replica > 0)
+
+    with CaptureQueriesContext(connections['nas']) as primary, CaptureQueriesContext(connections['local']) as replica:
+        harness.client_class(HTTP_HOST=PUBLIC_HOST).get('/')
+    harness.check('쓰기 직후 세대의 갤러리 페이지는 원본에서 채움', len(primary) > 0 and len(replica) == 0)
+
+    def rename():
+        # 복제본에서 읽은 인스턴스도 저장은 원본으로 갑니다(검색 색인은 save 신호로 갱신).
+        edited = Photo.objects.get(id=photo.id)
+        edited.title = '수국 정원'
+        edited.save(update_fields=['title'])
+        # 같은 요청 안에서 쓴 뒤의 읽기는 원본으로 갑니다.
+        after_write = get_read_db_alias()
+        with transaction.atomic(using='nas'):
+            in_atomic = get_read_db_alias()
+        return after_write, in_atomic, Photo.objects.get(id=photo.id).title
+
+    response, (after_write, in_atomic, title) = harness.write(rename)
+    harness.check('쓰기 후 같은 요청의 읽기는 원본', after_write == 'nas' and in_atomic == 'nas' and title == '수국 정원')
+    sticky = response.cookies.get(PRIMARY_STICKY_COOKIE)
+    harness.check('쓰기 응답에 원본 고정 쿠키', sticky is not None and int(sticky['max-age']) == args.sticky)
+    sticky_cookies = {PRIMARY_STICKY_COOKIE: sticky.value} if sticky else {}
+
+    titles, primary, replica = harness.search('수국', cookies=sticky_cookies)
+    harness.check('고정 쿠키가 있으면 방금 쓴 내용이 보임(원본)', titles == ['수국 정원'] and replica == 0)
+    titles, primary, replica = harness.search('수국')
+    harness.check('쿠키 없는 익명 요청은 지연된 복제본을 읽음', titles == [] and primary == 0)
+
+    time.sleep(args.lag)
+    titles, primary, replica = harness.search('수국')
+    harness.check(f'{args.lag}초 뒤 복제 반영 후 복제본에서도 보임', titles == ['수국 정원'] and primary == 0)
+
+    time.sleep(max(args.sticky - args.lag, 0) + 1)
+    titles, primary, replica = harness.search('수국', cookies=sticky_cookies)
+    harness.check('고정 기간이 지나면 다시 복제본을 읽음', titles == ['수국 정원'] and primary == 0 and replica > 0)
+
+    # 이름을 바꾼 쓰기로 세대가 올랐고, 고정 기간이 지났으므로 새 세대의 페이지는 복제본에서 채웁니다.
+    with CaptureQueriesContext(connections['nas']) as primary, CaptureQueriesContext(connections['local']) as replica:
+        response = harness.client_class(HTTP_HOST=PUBLIC_HOST).get('/')
+    harness.check(
+        '고정 기간이 지난 갤러리 페이지는 복제본에서 채움',
+        '수국 정원' in response.content.decode() and len(primary) == 0 and len(replica) > 0,
+    )
+
+    print('모두 통과' if not harness.failures else f'실패 {harness.failures}건')
+    return 1 if harness.failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lag', type=float, default=1.5, help='복제 지연(초)')
+    parser.add_argument('--sticky', type=int, default=3, help='쓰기 후 원본 고정 시간(DB_PRIMARY_STICKY_SECONDS)')
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()